@@ -13,6 +13,7 @@ import logging
 from supabase_client import get_admin_client, get_user_from_access_token  # type: ignore
 # Odds formatting utilities
 from utils.odds import format_american_odds, decimal_to_american_rounded, american_to_decimal  # type: ignore
+from utils.swr_cache import SWRCache  # type: ignore
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
@@ -113,6 +114,61 @@ def _get_admin_client():
     return get_admin_client()
 
 
+def _board_snapshot(name: str):
+    """Precomputed payload from the background board daemon (None when it is off or warming up)."""
+    try:
+        from services.board_daemon import board_payload  # type: ignore
+        return board_payload(name)
+    except Exception:
+        app.logger.exception('board snapshot lookup failed')
+        return None
+
+
+def _geo_players_version():
+    from database.geo_repo import get_data_version  # type: ignore
+    return get_data_version('geo_players')
+
+
+# simulation-priced moneyline boards, served stale-while-revalidate
+_moneyline_cache = SWRCache(version=_geo_players_version)
+
+
+def _swr_moneylines(snapshot_name, key, compute):
+    """Moneyline board with `cache` metadata ({ age, version, stale, refreshing, error }).
+
+    The daemon snapshot answers when it has the board (snapshot_name); otherwise the
+    last good result is returned at once and refreshed in the background once it is
+    older than SWR_SOFT_TTL or the geo_players data version moves.
+    """
+    hit = None
+    if snapshot_name:
+        try:
+            from services.board_daemon import board_payload_meta  # type: ignore
+            hit = board_payload_meta(snapshot_name)
+        except Exception:
+            app.logger.exception('board snapshot lookup failed')
+    value, meta = hit if hit is not None else _moneyline_cache.get(key, compute)
+    return dict(value, cache=meta)
+
+
+# cap for ?simulations= on the simulation endpoints; their memory grows with it
+MAX_SIMULATIONS = 200000
+
+
+def _simulations_arg(default: int):
+    """?simulations= clamped to MAX_SIMULATIONS, or None when it is not a positive integer."""
+    raw = request.args.get('simulations')
+    if raw is None or not raw.strip():
+        return default
+    try:
+        sims = int(raw)
+    except ValueError:
+        return None
+    if sims < 1:
+        return None
+    return min(sims, MAX_SIMULATIONS)
+
+
 def _mock_players():
     # simple mock player list
     return [
@@ -501,9 +557,89 @@ def ingest_csv():
     except Exception:
         pass
 
+    # new game data changes player stats: drop cached geo rows so pricing refetches
+    try:
+        from database.geo_repo import invalidate_geo_cache  # type: ignore
+        summary['data_version'] = invalidate_geo_cache()
+    except Exception:
+        app.logger.exception('ingest_csv: failed to invalidate geo cache')
+
     return jsonify({"summary": summary})
 
 
+@api_bp.route('/geo/cache/invalidate', methods=['POST', 'OPTIONS'])
+def geo_cache_invalidate():
+    """Drop cached geo_players / geo_countries rows after an out-of-band stats edit.
+
+    POST JSON: { table?: 'geo_players' | 'geo_countries' } (omit to drop both).
+    Requires an Authorization bearer token: every version-keyed pricing cache is
+    dropped and the tables are re-read from Supabase.
+    Returns the new data version that pricing caches key on.
+    """
+    if request.method == 'OPTIONS':
+        return ('', 200)
+    if not _get_user_from_header(request):
+        return jsonify({'error': 'unauthorized'}), 401
+    data = request.get_json(silent=True) or {}
+    table = data.get('table')
+    if table not in (None, 'geo_players', 'geo_countries'):
+        return jsonify({'error': 'unknown table'}), 400
+    try:
+        from database.geo_repo import invalidate_geo_cache  # type: ignore
+        version = invalidate_geo_cache(table)
+        return jsonify({'data_version': version}), 200
+    except Exception as e:
+        logging.exception('geo_cache_invalidate error')
+        return jsonify({'error': str(e)}), 500
+
+
+
+@api_bp.route('/pricing/reprice', methods=['POST', 'OPTIONS'])
+def pricing_reprice():
+    """Incrementally reprice after a stats edit and return the price diff.
+
+    POST JSON: { table: 'geo_players' | 'zetamac_players', row?: { player_id, ...columns } }
+    With `row` the given columns are written to that player's row (partial rows
+    keep the other columns) and merged into the repricer; otherwise the table is
+    re-read. Only markets that depend on changed rows are recomputed.
+    Requires an Authorization bearer token.
+    Returns { version, table, players, recomputed, changes: [ { market, key, before, after } ] }.
+    """
+    if request.method == 'OPTIONS':
+        return ('', 200)
+    if not _get_user_from_header(request):
+        return jsonify({'error': 'unauthorized'}), 401
+    data = request.get_json(silent=True) or {}
+    table = data.get('table')
+    if table not in ('geo_players', 'zetamac_players'):
+        return jsonify({'error': 'table must be geo_players or zetamac_players'}), 400
+    try:
+        from services.repricer import get_repricer  # type: ignore
+        repricer = get_repricer()
+        if data.get('row'):
+            from database.geo_repo import update_player_row  # type: ignore
+            if data['row'].get('player_id') is None:
+                return jsonify({'error': 'row.player_id required'}), 400
+            try:
+                stored = update_player_row(table, data['row'])
+            except LookupError as e:
+                return jsonify({'error': str(e), 'changes': []}), 404
+            diff = repricer.update(table, stored)
+        elif table == 'geo_players':
+            from database.geo_repo import get_geo_players, invalidate_geo_cache  # type: ignore
+            invalidate_geo_cache('geo_players')
+            diff = repricer.sync(table, get_geo_players() or [])
+        else:
+            from database.geo_repo import get_zetamac_players  # type: ignore
+            diff = repricer.sync(table, get_zetamac_players() or [])
+        if diff['changes']:
+            from services.board_daemon import request_refresh  # type: ignore
+            request_refresh()
+        return jsonify(diff), 200
+    except Exception as e:
+        logging.exception('pricing_reprice error')
+        return jsonify({'error': str(e), 'changes': []}), 500
+
 
 @api_bp.route('/analytics/player/<int:player_id>/lines', methods=['GET', 'OPTIONS'])
 def player_lines(player_id: int):
@@ -583,7 +719,11 @@ def pricing_lines():
     try:
         from services.pricing_service import price_for_thresholds  # type: ignorp
         print(f"The margin bps here is: {margin_bps}")
-        results = price_for_thresholds(player_ids, thresholds, model=model, margin_bps=margin_bps+200)
+        snap = _board_snapshot('pricing_lines') if margin_bps == 0 else None
+        if snap and all(pid in snap and all(t in snap[pid] for t in thresholds) for pid in player_ids):
+            results = {pid: {t: snap[pid][t] for t in thresholds} for pid in player_ids}
+        else:
+            results = price_for_thresholds(player_ids, thresholds, model=model, margin_bps=margin_bps+200)
         print(f"✓ pricing_lines: computed prices for {len(player_ids)} players x {len(thresholds)} thresholds")
         
         # normalize keys to strings for frontend
@@ -663,7 +803,8 @@ def pricing_country_props():
 
     try:
         from services.pricing_service import price_country_props  # type: ignore
-        results = price_country_props(threshold_rounds=rounds, margin_bps=margin_bps) or {}
+        snap = _board_snapshot('country_props') if (rounds, margin_bps) == (5, 700) else None
+        results = (snap if snap is not None else price_country_props(threshold_rounds=rounds, margin_bps=margin_bps)) or {}
 
         # normalize to list for frontend convenience
         out_list = []
@@ -702,7 +843,8 @@ def pricing_continent_props():
     try:
         rounds = int(request.args.get('rounds', 5) or 5)
         from services.pricing_service import continent_markets  # type: ignore
-        res = continent_markets(rounds=rounds)
+        snap = _board_snapshot('continents') if rounds == 5 else None
+        res = snap if snap is not None else continent_markets(rounds=rounds)
         # Ensure we return a stable JSON shape expected by frontend: { config, continents }
         return jsonify(res), 200
     except Exception as e:
@@ -716,28 +858,55 @@ def pricing_moneyline():
         return ('', 200)
     try:
         rounds = int(request.args.get('rounds', 5) or 5)
+        method = (request.args.get('method') or 'mc').lower()
+        if method not in ('mc', 'analytic'):
+            return jsonify({'error': 'method must be mc or analytic'}), 400
         # reuse existing service helper price_moneylines
         from services.pricing_service import price_moneylines  # type: ignore
-        res = price_moneylines(simulations=5000, margin_bps=800)
+        adaptive = (request.args.get('adaptive') or '').lower() in ('1', 'true', 'yes')
+        sampler = (request.args.get('sampler') or 'pseudo').lower()
+        if sampler not in ('pseudo', 'sobol'):
+            return jsonify({'error': 'sampler must be pseudo or sobol'}), 400
+        snapshot_name = 'pricing_moneyline' if (method, adaptive, sampler) == ('mc', False, 'pseudo') else None
+        res = _swr_moneylines(snapshot_name, ('pricing_moneyline', method, adaptive, sampler),
+                              lambda: price_moneylines(simulations=5000, margin_bps=800, method=method, adaptive=adaptive, sampler=sampler))
         return jsonify(res), 200
     except Exception as e:
         logging.exception('pricing_moneyline error')
         return jsonify({'error': str(e), 'classic': [], 'firstRound': [], 'lastRound': []}), 500
 
 
+def _read_priced_specials(client):
+    """Rows of the specials table with formula rows repriced by services.specials_dsl.
+
+    Concurrent requests share one table read and pricing pass (utils.singleflight).
+    """
+    from utils.singleflight import do  # type: ignore
+    return do(('specials',), _fetch_priced_specials, client)
+
+
+def _fetch_priced_specials(client):
+    try:
+        rc = client.table('specials').select('betid,outcome,odds,formula').order('betid').execute()
+    except Exception:
+        # formula column not migrated yet (sql/002_add_specials_formula.sql)
+        rc = client.table('specials').select('betid,outcome,odds').order('betid').execute()
+    rows = rc.data if hasattr(rc, 'data') else (rc.get('data') if isinstance(rc, dict) else None)
+    from services.specials_pricing import price_special_rows  # type: ignore
+    return price_special_rows(rows or [])
+
+
 @api_bp.route('/pricing/specials', methods=['GET', 'OPTIONS'])
 def pricing_specials():
     if request.method == 'OPTIONS':
         return ('', 200)
     try:
-        # read specials table and return rows
+        # read specials table; rows carrying a formula are priced on the fly
         client = _get_admin_client()
         markets = []
         if client:
             try:
-                rc = client.table('specials').select('betid,outcome,odds').order('betid').execute()
-                rows = rc.data if hasattr(rc, 'data') else (rc.get('data') if isinstance(rc, dict) else None)
-                markets = rows or []
+                markets = _read_priced_specials(client)
             except Exception:
                 app.logger.exception('pricing_specials: failed to read specials table')
                 markets = []
@@ -755,7 +924,8 @@ def markets_continents():
     try:
         from services.pricing_service import continent_markets  # type: ignore
         rounds = int(request.args.get('rounds', 5) or 5)
-        res = continent_markets(rounds=rounds)
+        snap = _board_snapshot('continents') if rounds == 5 else None
+        res = snap if snap is not None else continent_markets(rounds=rounds)
         return jsonify(res), 200
     except Exception as e:
         logging.exception('markets_continents error')
@@ -823,7 +993,8 @@ def zetamac_totals():
         
         # Call pricing service
         from services.pricing_service import price_zetamac_totals  # type: ignore
-        result = price_zetamac_totals(player_ids=player_ids, hooks=hooks, margin_bps=margin_bps)
+        snap = _board_snapshot('zetamac_totals') if (player_ids, hooks, margin_bps) == (None, None, 700) else None
+        result = snap if snap is not None else price_zetamac_totals(player_ids=player_ids, hooks=hooks, margin_bps=margin_bps)
         
         return jsonify(result), 200
     except Exception as e:
@@ -849,7 +1020,8 @@ def zetamac_moneylines():
         
         # Call pricing service
         from services.pricing_service import price_zetamac_moneylines  # type: ignore
-        result = price_zetamac_moneylines(margin_bps=margin_bps)
+        snap = _board_snapshot('zetamac_moneylines') if margin_bps == 700 else None
+        result = snap if snap is not None else price_zetamac_moneylines(margin_bps=margin_bps)
         
         return jsonify(result), 200
     except Exception as e:
@@ -857,6 +1029,30 @@ def zetamac_moneylines():
         return jsonify({'matchups': [], 'error': str(e)}), 500
 
 
+@api_bp.route('/zetamac/outright', methods=['GET', 'OPTIONS'])
+def zetamac_outright():
+    """Price the Zetamac outright winner market (every player in one book).
+
+    Query params:
+    - margin_bps: margin in basis points (default 700)
+    - include_locked: 1 to also list players whose lock column is set
+
+    Returns: { config, players: [ { player_id, name, mean, std_dev, lock, fair_prob, prob, decimal, american } ] }
+    """
+    if request.method == 'OPTIONS':
+        return ('', 200)
+    try:
+        margin_bps = int(request.args.get('margin_bps', 700))
+        include_locked = (request.args.get('include_locked') or '').lower() in ('1', 'true', 'yes')
+        from services.pricing_service import price_zetamac_outright  # type: ignore
+        snap = _board_snapshot('zetamac_outright') if (margin_bps, include_locked) == (700, False) else None
+        result = snap if snap is not None else price_zetamac_outright(margin_bps=margin_bps, include_locked=include_locked)
+        return jsonify(result), 200
+    except Exception as e:
+        logging.exception('zetamac_outright error')
+        return jsonify({'players': [], 'error': str(e)}), 500
+
+
 @api_bp.route('/locks', methods=['GET', 'OPTIONS'])
 def locks_status():
     """Return current lock status for master and markets.
@@ -1897,7 +2093,9 @@ def geoguessr_totals():
     and an initial pricing for that threshold (over/under odds and probabilities).
     Uses Supabase client (supabase-py) to fetch from geo_players.
     """
-    thresholds = list(range(7500, 23001, 500))
+    snap = _board_snapshot('geoguessr_totals')
+    if snap is not None:
+        return jsonify(snap)
 
     # Strictly use the Supabase geo_players table. Do not fall back to hardcoded
     # mock players so frontend always sees the real DB players and their stats.
@@ -1906,69 +2104,19 @@ def geoguessr_totals():
     # Log DB access for debugging
     app.logger.info(f"geoguessr_totals: fetched {len(rows)} rows from geo_players")
 
-    players = []
-    # import pricing helpers
-    from services.pricing_service import normal_cdf, apply_margin, prob_to_decimal, decimal_to_american
-
-    for r in rows:
-        pid = int(r.get('player_id') or 0)
-        name = r.get('name', '')
-        screen = r.get('screenname', '')
-        mu = float(r.get('mean_score') or 0) if r.get('mean_score') is not None else None
-        sigma = float(r.get('stddev_score') or 0) if r.get('stddev_score') is not None else 0.0
-
-        # Guard against degenerate sigma (0 or very small) which causes step-function CDFs
-        if sigma <= 0:
-            sigma = max(1.0, abs(mu or 0) * 0.05) if mu else 1.0
-
-        # default threshold = nearest multiple of 500 to mean
-        if mu is None:
-            default_thresh = 10000
-        else:
-            default_thresh = int(round(mu / 500.0) * 500)
-            default_thresh = max(min(default_thresh, thresholds[-1]), thresholds[0])
-
-        # compute pricing for default threshold using the same math as before
-        if mu is None:
-            p_over = 0.5
-        else:
-            cdf = normal_cdf(default_thresh, mu, sigma)
-            p_over = max(0.0, 1.0 - cdf)
-        p_under = 1.0 - p_over
-        p_over_adj, p_under_adj = apply_margin(p_over, p_under, margin_bps=500)
-        d_over = prob_to_decimal(p_over_adj)
-        d_under = prob_to_decimal(p_under_adj)
-        a_over = decimal_to_american(d_over, prob=p_over_adj)
-        a_under = decimal_to_american(d_under, prob=p_under_adj)
-
-        players.append({
-            'player_id': pid,
-            'name': name,
-            'screenname': screen,
-            'mean_score': mu,
-            'stddev_score': sigma,
-            'default_threshold': default_thresh,
-            'initial': {
-                'threshold': default_thresh,
-                'prob_over': float(p_over_adj),
-                'prob_under': float(p_under_adj),
-                'odds_over_decimal': float(d_over),
-                'odds_under_decimal': float(d_under),
-                'odds_over_american': str(a_over),
-                'odds_under_american': str(a_under),
-            }
-        })
+    from services.pricing_service import geoguessr_totals_board  # type: ignore
+    board = geoguessr_totals_board(rows)
 
     # include raw_rows for debugging so frontend can show DB contents
-    return jsonify({'thresholds': thresholds, 'players': players, 'raw_rows': rows, 'db_ok': True})
+    return jsonify({'thresholds': board['thresholds'], 'players': board['players'], 'raw_rows': rows, 'db_ok': True})
 
 
 @api_bp.route('/geoguessr/price', methods=['POST', 'OPTIONS'])
 def geoguessr_price():
     """
-    Compute price for a single player and threshold. POST JSON: { playerId: int, threshold: int, marginBps?: int }
+    Compute price for a single player and threshold. POST JSON: { playerId: int, threshold: int, marginBps?: int, market?: 'total' | 'first_guess' }
     Returns over/under odds and probabilities.
-    Uses Supabase client to fetch player data.
+    Served from the precomputed price grid (services.price_grid); off-grid thresholds and margins are priced on the fly.
     """
     if request.method == 'OPTIONS':
         return ('', 200)
@@ -1977,54 +2125,46 @@ def geoguessr_price():
     player_id = int(data.get('playerId') or 0)
     threshold = int(data.get('threshold') or 0)
     margin_bps = int(data.get('marginBps') or 700)
+    market = str(data.get('market') or 'total').replace('-', '_')
 
     if not player_id or not threshold:
         return jsonify({'error': 'playerId and threshold required'}), 400
 
     try:
-        from database.geo_repo import get_geo_players  # type: ignore
-        all_players = get_geo_players()
-        # find player by player_id
-        player_row = next((p for p in all_players if p.get('player_id') == player_id), None)
-        if not player_row:
-            print(f"⚠ geoguessr_price: player {player_id} not found in geo_players")
+        from services.price_grid import LADDERS, quote  # type: ignore
+        if market not in LADDERS:
+            return jsonify({'error': f"market must be one of: {', '.join(LADDERS)}"}), 400
+        entry = quote(player_id, threshold, margin_bps=margin_bps, market=market)
+        if entry is None:
             return jsonify({'error': 'player not found'}), 404
-        
-        r = player_row
-        mu = float(r.get('mean_score') or 0) if r.get('mean_score') is not None else None
-        sigma = float(r.get('stddev_score') or 0) if r.get('stddev_score') is not None else 0.0
+        return jsonify(dict(playerId=player_id, threshold=threshold, **entry))
+    except Exception as e:
+        logging.exception('geoguessr_price error')
+        return jsonify({'error': str(e)}), 500
 
-        from services.pricing_service import normal_cdf, apply_margin, prob_to_decimal, decimal_to_american
 
-        if mu is None:
-            p_over = 0.5
-        else:
-            cdf = normal_cdf(threshold, mu, sigma)
-            p_over = max(0.0, 1.0 - cdf)
-        p_under = 1.0 - p_over
-        p_over_adj, p_under_adj = apply_margin(p_over, p_under, margin_bps=margin_bps)
-        d_over = prob_to_decimal(p_over_adj)
-        d_under = prob_to_decimal(p_under_adj)
-        a_over = decimal_to_american(d_over, prob=p_over_adj)
-        a_under = decimal_to_american(d_under, prob=p_under_adj)
+@api_bp.route('/geoguessr/h2h', methods=['GET', 'OPTIONS'])
+def geoguessr_h2h():
+    """Price GeoGuessr head-to-heads (higher 5-round total) for every pair of geo players.
 
-        print(f"✓ geoguessr_price: player {player_id} ({r.get('name')}) threshold {threshold} => O:{a_over} U:{a_under}")
+    Query params:
+    - method: exact (beta-mixture totals, default) or normal
+    - margin_bps: margin in basis points (default 700)
 
-        return jsonify({
-            'playerId': player_id,
-            'threshold': threshold,
-            'prob_over': float(p_over_adj),
-            'prob_under': float(p_under_adj),
-            'odds_over_decimal': float(d_over),
-            'odds_under_decimal': float(d_under),
-            'odds_over_american': str(a_over),
-            'odds_under_american': str(a_under),
-        })
-    except Exception:
-        import traceback
-        err = traceback.format_exc()
-        print(f"✗ geoguessr_price ERROR: {err}")
-        return jsonify({'error': 'internal error', 'trace': err}), 500
+    Returns: { config, matchups: [ { player1_*, player2_*, player1_fair } ] }
+    """
+    if request.method == 'OPTIONS':
+        return ('', 200)
+    try:
+        method = (request.args.get('method') or 'exact').lower()
+        if method not in ('exact', 'normal'):
+            return jsonify({'error': 'method must be exact or normal'}), 400
+        margin_bps = int(request.args.get('margin_bps', 700))
+        from services.matchups import geoguessr_matchups  # type: ignore
+        return jsonify(geoguessr_matchups(margin_bps=margin_bps, method=method)), 200
+    except Exception as e:
+        logging.exception('geoguessr_h2h error')
+        return jsonify({'error': str(e), 'matchups': []}), 500
 
 
 @api_bp.route('/moneylines/prices', methods=['GET', 'OPTIONS'])
@@ -2032,16 +2172,94 @@ def moneylines_prices():
     if request.method == 'OPTIONS':
         return ('', 200)
     try:
+        method = (request.args.get('method') or 'mc').lower()
+        if method not in ('mc', 'analytic'):
+            return jsonify({'error': 'method must be mc or analytic'}), 400
         from services.pricing_service import price_moneylines  # type: ignore
-        app.logger.info('[BOOKIE-HUB] moneylines pricing: starting simulation')
-        res = price_moneylines(simulations=5000, margin_bps=850)
-        app.logger.info('[BOOKIE-HUB] moneylines pricing: finished simulation')
+        app.logger.info('[BOOKIE-HUB] moneylines pricing: starting (%s)', method)
+        adaptive = (request.args.get('adaptive') or '').lower() in ('1', 'true', 'yes')
+        sampler = (request.args.get('sampler') or 'pseudo').lower()
+        if sampler not in ('pseudo', 'sobol'):
+            return jsonify({'error': 'sampler must be pseudo or sobol'}), 400
+        # the default board is served from the warm daemon snapshot when it runs
+        snapshot_name = 'moneylines' if (method, adaptive, sampler) == ('mc', False, 'pseudo') else None
+        res = _swr_moneylines(snapshot_name, ('moneylines', method, adaptive, sampler),
+                              lambda: price_moneylines(simulations=5000, margin_bps=850, method=method, adaptive=adaptive, sampler=sampler))
+        app.logger.info('[BOOKIE-HUB] moneylines pricing: finished (age %.1fs)', res['cache']['age'])
         return jsonify(res), 200
     except Exception as e:
         logging.exception('moneylines_prices error')
         return jsonify({'error': str(e)}), 500
 
 
+@api_bp.route('/specials/round-counts', methods=['GET', 'OPTIONS'])
+def specials_round_counts():
+    """Round-count markets (exactly/at least k round wins, first+last, first+last+overall).
+
+    Query params:
+    - margin_bps: margin in basis points (default 800)
+    """
+    if request.method == 'OPTIONS':
+        return ('', 200)
+    try:
+        margin_bps = int(request.args.get('margin_bps', 800))
+        from services.round_markets import round_count_markets  # type: ignore
+        return jsonify(round_count_markets(margin_bps=margin_bps)), 200
+    except Exception as e:
+        logging.exception('specials_round_counts error')
+        return jsonify({'error': str(e), 'players': []}), 500
+
+
+@api_bp.route('/duels/prices', methods=['GET', 'OPTIONS'])
+def duels_prices():
+    """Price 1v1 health-bar duels for every pair of geo players.
+
+    Query params:
+    - simulations: duels simulated per matchup (default 20000, at most MAX_SIMULATIONS)
+    - margin_bps: margin in basis points (default 700)
+
+    Returns: { config, matchups: [ { player1_*, player2_*, rounds, expected_rounds, ... } ] }
+    """
+    if request.method == 'OPTIONS':
+        return ('', 200)
+    sims = _simulations_arg(20000)
+    if sims is None:
+        return jsonify({'error': 'simulations must be a positive integer', 'matchups': []}), 400
+    try:
+        margin_bps = int(request.args.get('margin_bps', 700))
+        from services.duel_pricing import price_duels  # type: ignore
+        res = price_duels(simulations=sims, margin_bps=margin_bps)
+        return jsonify(res), 200
+    except Exception as e:
+        logging.exception('duels_prices error')
+        return jsonify({'error': str(e), 'matchups': []}), 500
+
+
+@api_bp.route('/duels/teams/prices', methods=['GET', 'OPTIONS'])
+def team_duels_prices():
+    """Price every 2v2 team duel partition of the geo roster in one run.
+
+    Query params:
+    - simulations: duels simulated per partition (default 20000, at most MAX_SIMULATIONS)
+    - margin_bps: margin in basis points (default 700)
+
+    Returns: { config, matchups: [ { team1, team2, team1_prob, team2_prob, ... } ] }
+    """
+    if request.method == 'OPTIONS':
+        return ('', 200)
+    sims = _simulations_arg(20000)
+    if sims is None:
+        return jsonify({'error': 'simulations must be a positive integer', 'matchups': []}), 400
+    try:
+        margin_bps = int(request.args.get('margin_bps', 700))
+        from services.duel_pricing import price_team_duels  # type: ignore
+        res = price_team_duels(simulations=sims, margin_bps=margin_bps)
+        return jsonify(res), 200
+    except Exception as e:
+        logging.exception('team_duels_prices error')
+        return jsonify({'error': str(e), 'matchups': []}), 500
+
+
 @api_bp.route('/specials/prices', methods=['GET', 'OPTIONS'])
 def specials_prices():
     if request.method == 'OPTIONS':
@@ -2072,19 +2290,25 @@ def specials_prices():
             combined_pct = None
             per_round_p = None
 
-        # Instead of running simulations, read the `specials` table (betid, outcome, odds)
+        # Read the `specials` table (betid, outcome, odds[, formula]); formula rows are priced in bulk
         client = _get_admin_client()
         if client:
             try:
-                rc = client.table('specials').select('betid,outcome,odds').order('betid').execute()
-                rows = rc.data if hasattr(rc, 'data') else (rc.get('data') if isinstance(rc, dict) else None)
-                markets = rows or []
+                markets = _read_priced_specials(client)
             except Exception:
                 app.logger.exception('failed to read specials table, falling back to computed markets')
                 markets = []
         else:
             markets = []
 
+        # model-priced round-count markets (wins 3+/4+ rounds, first+last+overall)
+        if (request.args.get('round_counts') or '1') != '0':
+            try:
+                from services.round_markets import round_count_specials  # type: ignore
+                markets = list(markets) + round_count_specials()
+            except Exception:
+                app.logger.exception('failed to price round-count specials')
+
         app.logger.info('[BOOKIE-HUB] specials pricing: finished (db-backed)')
         resp = {'markets': markets, 'debug': {'worldcup_combined_freq_pct': combined_pct, 'worldcup_per_round_p': per_round_p, 'source': 'db'}}
         return jsonify(resp), 200
@@ -2093,6 +2317,55 @@ def specials_prices():
         return jsonify({'error': str(e)}), 500
 
 
+@api_bp.route('/board/snapshot', methods=['GET', 'OPTIONS'])
+def board_snapshot_status():
+    """Status of the background board daemon: snapshot age, data versions, markets and errors."""
+    if request.method == 'OPTIONS':
+        return ('', 200)
+    from services.board_daemon import get_daemon  # type: ignore
+    daemon = get_daemon()
+    snap = daemon.snapshot if daemon is not None else None
+    if snap is None:
+        return jsonify({'running': daemon is not None, 'ready': False}), 200
+    return jsonify({
+        'running': True,
+        'ready': True,
+        'age_seconds': round(snap.age(), 3),
+        'versions': list(snap.versions),
+        'markets': sorted(snap.markets),
+        'errors': snap.errors,
+    }), 200
+
+
+@api_bp.route('/board/prices', methods=['GET', 'OPTIONS'])
+def board_prices():
+    """Price the whole GeoGuessr board from one batch of simulated games.
+
+    Query params:
+    - simulations: games simulated (default 20000, at most MAX_SIMULATIONS)
+    - margin_bps: margin in basis points (default 800)
+    - markets: comma-separated market names (default: every registered market)
+
+    Returns: { config, markets: { name: [ { group, key, label, fair_prob, prob, decimal, american } ] } }
+    """
+    if request.method == 'OPTIONS':
+        return ('', 200)
+    sims = _simulations_arg(20000)
+    if sims is None:
+        return jsonify({'error': 'simulations must be a positive integer', 'markets': {}}), 400
+    try:
+        from services.game_simulator import MARKETS, price_board  # type: ignore
+        margin_bps = int(request.args.get('margin_bps', 800))
+        names = [m.strip() for m in (request.args.get('markets') or '').split(',') if m.strip()]
+        unknown = [m for m in names if m not in MARKETS]
+        if unknown:
+            return jsonify({'error': f"unknown markets: {', '.join(unknown)}", 'available': list(MARKETS)}), 400
+        return jsonify(price_board(markets=names or None, sims=sims, margin_bps=margin_bps)), 200
+    except Exception as e:
+        logging.exception('board_prices error')
+        return jsonify({'error': str(e), 'markets': {}}), 500
+
+
 @api_bp.route('/antes', methods=['GET', 'OPTIONS'])
 def antes_list():
     """Return rows from Geo_Antes table ordered by ante_id.
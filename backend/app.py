@@ -104,8 +104,14 @@ if __name__ == '__main__':
         # DB not configured or other error; continue without seeding
         pass
 
+    # keep a warm, fully priced board (PRICING_DAEMON=1) in the reloader child
+    # that serves requests, not in the watching parent
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from services.board_daemon import start_daemon_if_enabled
+        start_daemon_if_enabled()
+
     port = int(os.getenv('PORT', 4000))
     app.run(host='0.0.0.0', port=port, debug=True)
 
-# Expose app for gunicorn
+# Expose app for gunicorn (gunicorn.conf.py starts the board daemon per worker)
 app = create_app()
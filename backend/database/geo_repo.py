@@ -1,8 +1,100 @@
 # backend/database/geo_repo.py
+import os
+import threading
+import time
 from typing import List, Dict
 from .supabase_client import get_supabase_client
+from utils.singleflight import do as _coalesce, singleflight  # type: ignore
 
-def get_geo_players() -> List[Dict]:
+# Read-through cache for the small, hot reference tables (geo_players,
+# geo_countries). Pricing requests read these on every call; with the cache a
+# warm request does no network I/O. Entries expire after GEO_CACHE_TTL seconds
+# and can be dropped explicitly via invalidate_geo_cache() (ingest / stats
+# updates). Every content change bumps a monotonically increasing data version
+# that downstream pricing caches can key on. Concurrent misses for the same
+# table share one fetch (utils.singleflight), so an expiry under load costs a
+# single round trip.
+GEO_CACHE_TTL = float(os.getenv('GEO_CACHE_TTL', '60'))
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Dict] = {}
+_table_versions: Dict[str, int] = {}
+# bumped by invalidate_geo_cache; a fetch that straddles an invalidation is not cached
+_generations: Dict[str, int] = {}
+_data_version = 0
+
+
+def _bump_version(table: str) -> None:
+    # caller holds _cache_lock
+    global _data_version
+    _data_version += 1
+    _table_versions[table] = _data_version
+
+
+def _refresh_rows(table: str, fetch) -> List[Dict]:
+    with _cache_lock:
+        generation = _generations.get(table, 0)
+    rows = fetch()
+    with _cache_lock:
+        if _generations.get(table, 0) != generation:
+            # invalidated while fetching: these rows may predate the write, so
+            # hand them to this caller only and let the next read fetch again
+            return rows
+        prev = _cache.get(table)
+        if prev is None or prev['rows'] != rows:
+            _bump_version(table)
+        _cache[table] = {'rows': rows, 'fetched_at': time.monotonic()}
+    return rows
+
+
+def _fresh_rows(table: str, fetch) -> List[Dict]:
+    # the cached rows themselves (not copies), re-fetched first if the entry expired
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(table)
+        if entry is not None and now - entry['fetched_at'] < GEO_CACHE_TTL:
+            return entry['rows']
+    return _coalesce(('geo_repo', table), _refresh_rows, table, fetch)
+
+
+def _cached_rows(table: str, fetch) -> List[Dict]:
+    # hand out copies so callers cannot mutate the cached rows
+    return [dict(r) for r in _fresh_rows(table, fetch)]
+
+
+def invalidate_geo_cache(table: str = None) -> int:
+    """Drop cached rows for `table` (or every table) and return the new data version."""
+    with _cache_lock:
+        tables = [table] if table else list(_cache.keys()) or ['geo_players', 'geo_countries']
+        for t in tables:
+            _cache.pop(t, None)
+            _generations[t] = _generations.get(t, 0) + 1
+            _bump_version(t)
+        return _data_version
+
+
+def get_data_version(table: str = None) -> int:
+    """Monotonic version of cached geo data (overall, or for a single table)."""
+    with _cache_lock:
+        if table:
+            return _table_versions.get(table, 0)
+        return _data_version
+
+
+def current_version(table: str) -> int:
+    """Version of `table` after re-fetching an expired cache entry; no rows are copied.
+
+    Lets version-keyed caches honour GEO_CACHE_TTL without reading the rows
+    themselves. Raises ValueError for a table that is not cached here.
+    """
+    fetchers = {'geo_players': _fetch_geo_players, 'geo_countries': _fetch_geo_countries}
+    if table not in fetchers:
+        raise ValueError(f"unknown table: {table}")
+    _fresh_rows(table, fetchers[table])
+    return get_data_version(table)
+
+
+def _fetch_geo_players() -> List[Dict]:
     client = get_supabase_client()
     res = client.table("geo_players")\
         .select("player_id,name,screenname,mean_score,stddev_score")\
@@ -10,19 +102,73 @@ def get_geo_players() -> List[Dict]:
         .execute()
     return res.data or []
 
+
+def get_geo_players() -> List[Dict]:
+    return _cached_rows('geo_players', _fetch_geo_players)
+
+@singleflight
+def get_zetamac_players() -> List[Dict]:
+    """Rows of zetamac_players (player_id, name, mean, std_dev, lock); not cached."""
+    client = get_supabase_client()
+    res = client.table("zetamac_players")\
+        .select("player_id,name,mean,std_dev,lock")\
+        .order("player_id")\
+        .execute()
+    return res.data or []
+
+# columns a stats edit may write through update_player_row (/api/pricing/reprice)
+PLAYER_COLUMNS = {
+    'geo_players': ('name', 'screenname', 'mean_score', 'stddev_score'),
+    'zetamac_players': ('name', 'mean', 'std_dev', 'lock'),
+}
+
+
+def update_player_row(table: str, row: Dict) -> Dict:
+    """Write the editable columns present in `row` to the player's row and return the stored row.
+
+    Raises LookupError if no row has that player_id. A geo_players edit also
+    drops the cached rows, so the next read and every version-keyed cache see it.
+    """
+    if table not in PLAYER_COLUMNS:
+        raise ValueError(f"unknown table: {table}")
+    pid = row.get('player_id')
+    if pid is None:
+        raise ValueError('row needs a player_id')
+    fields = {k: row[k] for k in PLAYER_COLUMNS[table] if k in row}
+    client = get_supabase_client()
+    rows = None
+    if fields:
+        upd = client.table(table).update(fields).eq('player_id', pid).execute()
+        rows = upd.data if hasattr(upd, 'data') else (upd.get('data') if isinstance(upd, dict) else None)
+    if not rows:
+        # no representation returned (or nothing to write): read the row back
+        res = client.table(table).select('*').eq('player_id', pid).limit(1).execute()
+        rows = res.data if hasattr(res, 'data') else (res.get('data') if isinstance(res, dict) else None)
+    if not rows:
+        raise LookupError(f"player {pid} not found in {table}")
+    if table == 'geo_players' and fields:
+        invalidate_geo_cache('geo_players')
+    return rows[0]
+
+
+@singleflight
 def get_games() -> List[Dict]:
     client = get_supabase_client()
     res = client.table("games").select("*").order("game_id").execute()
     return res.data or []
 
 
-def get_geo_countries() -> List[Dict]:
-    """Return rows from geo_countries table with at least: id, country, freq, continent"""
+def _fetch_geo_countries() -> List[Dict]:
     client = get_supabase_client()
     res = client.table("geo_countries").select("id,country,freq,continent").order("id").execute()
     return res.data or []
 
 
+def get_geo_countries() -> List[Dict]:
+    """Return rows from geo_countries table with at least: id, country, freq, continent"""
+    return _cached_rows('geo_countries', _fetch_geo_countries)
+
+
 def get_locks(market: str = None) -> Dict:
     """Fetch lock rows from the existing `locks` table and return a mapping.
 
@@ -0,0 +1,7 @@
+"""Gunicorn hooks for the pricing backend (picked up from the working directory)."""
+
+
+def post_fork(server, worker):
+    # each worker serves its own in-memory board snapshot (PRICING_DAEMON=1)
+    from services.board_daemon import start_daemon_if_enabled
+    start_daemon_if_enabled()
@@ -42,6 +42,9 @@ def ingest_csv():
                 except Exception:
                     pass
         session.commit()
+        # stats changed: make pricing refetch geo rows on the next request
+        from database.geo_repo import invalidate_geo_cache
+        invalidate_geo_cache('geo_players')
     except Exception as e:
         session.rollback()
         errors.append(str(e))
@@ -0,0 +1,72 @@
+"""Benchmark Sobol (quasi-Monte Carlo) against pseudo-random moneyline sampling.
+
+Run this from the backend folder:
+  python scripts/benchmark_qmc.py [--replicates 16] [--target 0.003]
+
+For each sample size the moneyline simulation is repeated with independent
+seeds and the RMSE of the classic/first-round win probabilities is measured
+against the analytic (numerical-integration) prices. The summary reports the
+simulations each sampler needs to reach the target RMSE.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Ensure backend root is on sys.path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services.analytic_pricing import analytic_moneyline_probs  # noqa: E402
+from services.sim_context import SimulationContext  # noqa: E402
+from services.simulation import build_round_models, simulate_moneyline_counts  # noqa: E402
+
+PLAYERS = [
+    {'player_id': 1, 'name': 'Pam', 'mean_score': 14800.0, 'stddev_score': 2900.0},
+    {'player_id': 2, 'name': 'Pritesh', 'mean_score': 13950.0, 'stddev_score': 3200.0},
+    {'player_id': 3, 'name': 'Sohan', 'mean_score': 17450.0, 'stddev_score': 4000.0},
+    {'player_id': 4, 'name': 'Naresh', 'mean_score': 12850.0, 'stddev_score': 5000.0},
+]
+SIZES = [1024, 2048, 4096, 8192, 16384, 32768, 65536]
+MARKETS = ('classic', 'firstRound')
+
+
+def rmse(models, exact, sims, sampler, replicates):
+    errs = {m: [] for m in MARKETS}
+    for r in range(replicates):
+        rng = SimulationContext(seed=1000 + r).stream('benchmark')
+        counts = simulate_moneyline_counts(models, sims, rng=rng, sampler=sampler)
+        for m in MARKETS:
+            errs[m].append(counts[m] / float(sims) - exact[m])
+    return {m: float(np.sqrt(np.mean(np.square(errs[m])))) for m in MARKETS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--replicates', type=int, default=16)
+    parser.add_argument('--target', type=float, default=0.003, help='target RMSE per win probability')
+    args = parser.parse_args()
+
+    models = build_round_models(PLAYERS)
+    exact = analytic_moneyline_probs(models)
+    needed = {}
+    print(f"{'sims':>7} {'sampler':>7} {'rmse classic':>13} {'rmse first':>11} {'secs':>6}")
+    for sampler in ('pseudo', 'sobol'):
+        for sims in SIZES:
+            start = time.perf_counter()
+            err = rmse(models, exact, sims, sampler, args.replicates)
+            secs = (time.perf_counter() - start) / args.replicates
+            print(f"{sims:>7} {sampler:>7} {err['classic']:>13.5f} {err['firstRound']:>11.5f} {secs:>6.3f}")
+            if sampler not in needed and max(err.values()) <= args.target:
+                needed[sampler] = sims
+
+    print(f"\nsims to reach RMSE <= {args.target}:")
+    for sampler in ('pseudo', 'sobol'):
+        print(f"  {sampler:>7}: {needed.get(sampler, f'> {SIZES[-1]}')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Adaptive Monte Carlo: simulate in batches until the quoted prices settle.
+
+A fixed simulation count is too many for lopsided markets and too few for
+tight ones. Here every outcome's hit rate gets a Wilson score interval after
+each batch; the interval ends are pushed through the same margin and odds
+conversion used for quoting, and the run stops once, for every outcome, both
+ends round to prices no further apart than the rounding tier that
+format_american_odds applies at that price (1, 5, 10 or 100 points). Longshots
+pinned at the +5000 cap settle after the first batch; coin-flip markets keep
+sampling up to `max_sims`.
+"""
+from typing import Callable, Dict
+
+import numpy as np
+
+DEFAULT_BATCH = 10000
+DEFAULT_MIN_SIMS = 10000
+DEFAULT_MAX_SIMS = 400000
+# two-sided 95% normal quantile
+DEFAULT_Z = 1.96
+
+
+def wilson_interval(hits, n: int, z: float = DEFAULT_Z):
+    """Wilson score interval (lo, hi) for hit counts out of n trials."""
+    hits = np.asarray(hits, dtype=float)
+    n = float(n)
+    if n <= 0:
+        return np.zeros_like(hits), np.ones_like(hits)
+    p = hits / n
+    z2 = z * z
+    denom = 1.0 + z2 / n
+    center = (p + z2 / (2.0 * n)) / denom
+    half = z * np.sqrt(p * (1.0 - p) / n + z2 / (4.0 * n * n)) / denom
+    return np.clip(center - half, 0.0, 1.0), np.clip(center + half, 0.0, 1.0)
+
+
+def quoted_american(prob, scale: float = 1.0) -> np.ndarray:
+    """Integer American price quoted for fair probability `prob` after scaling by the margin."""
+    from services.pricing_service import prob_to_decimal_array  # type: ignore
+    from utils.odds import decimal_to_american_array  # type: ignore
+
+    adj = np.asarray(prob, dtype=float) * float(scale)
+    return decimal_to_american_array(prob_to_decimal_array(adj), prob=adj)
+
+
+def prices_stable(hits, n: int, scale: float = 1.0, z: float = DEFAULT_Z, tolerance: float = 1.0) -> np.ndarray:
+    """Per outcome: does the whole Wilson interval quote within one rounding tier?"""
+    from utils.odds import american_distance_array, american_tier_array  # type: ignore
+
+    lo, hi = wilson_interval(hits, n, z)
+    a_lo, a_hi = quoted_american(lo, scale), quoted_american(hi, scale)
+    a_mid = quoted_american(np.asarray(hits, dtype=float) / max(float(n), 1.0), scale)
+    return american_distance_array(a_lo, a_hi) <= tolerance * american_tier_array(a_mid)
+
+
+def run_adaptive(batch_fn: Callable[[int], Dict[str, np.ndarray]], scale: float = 1.0, batch_size: int = DEFAULT_BATCH,
+                 min_sims: int = DEFAULT_MIN_SIMS, max_sims: int = DEFAULT_MAX_SIMS, z: float = DEFAULT_Z,
+                 tolerance: float = 1.0) -> Dict:
+    """Call batch_fn(size) -> {market: hit counts} until every price is stable.
+
+    Returns { 'counts': {market: ndarray}, 'sims': int, 'converged': bool }.
+    """
+    counts: Dict[str, np.ndarray] = {}
+    sims = 0
+    converged = False
+    while sims < int(max_sims):
+        size = min(int(batch_size), int(max_sims) - sims)
+        batch = batch_fn(size)
+        for k, v in batch.items():
+            counts[k] = counts.get(k, 0) + np.asarray(v, dtype=np.int64)
+        sims += size
+        if sims < int(min_sims):
+            continue
+        if all(prices_stable(v, sims, scale=scale, z=z, tolerance=tolerance).all() for v in counts.values()):
+            converged = True
+            break
+    return {'counts': counts, 'sims': sims, 'converged': converged}
@@ -0,0 +1,94 @@
+"""Deterministic (numerical-integration) winner pricing for GeoGuessr moneylines.
+
+Uses the same per-round mixture as services.simulation (uniform easy round,
+uniform catastrophe, Beta on [0, 5000]) but integrates instead of sampling:
+
+  - Round winner: P(i has the round max) = integral of f_i(x) * prod_j F_j(x),
+    evaluated on a fine score grid from exact per-bin mixture masses.
+  - Game winner: each player's 5-round total is the 5-fold convolution of the
+    discretized round density (done with an FFT), then the same max rule is
+    applied to the total pmfs.
+
+Results carry no sampling noise and cost milliseconds, so first/last-round and
+classic winner markets can be priced deterministically on every request.
+"""
+from typing import Dict
+
+import numpy as np
+from scipy.special import betainc
+
+from services.simulation import MAX_SCORE, ROUNDS, RoundModels, simulate_moneyline_counts
+
+# round-score grid step (points) for round-winner integration
+ROUND_STEP = 1.0
+# coarser step for the 5-round total convolution (keeps the FFT at ~16k points)
+TOTAL_STEP = 2.0
+
+
+def round_cdf(models: RoundModels, x: np.ndarray) -> np.ndarray:
+    """Mixture CDF of every player's round score at points x -> (players, len(x))."""
+    x = np.asarray(x, dtype=float)[None, :]
+    easy = np.clip((x - 4950.0) / 50.0, 0.0, 1.0)
+    cat = np.clip(x / 2000.0, 0.0, 1.0)
+    beta = betainc(models.a[:, None], models.b[:, None], np.clip(x / MAX_SCORE, 0.0, 1.0))
+    p_norm = 1.0 - models.p_easy - models.p_cat
+    return models.p_easy * easy + models.p_cat * cat + p_norm * beta
+
+
+def round_pmf(models: RoundModels, step: float = ROUND_STEP) -> np.ndarray:
+    """Exact probability mass of each score bin [k*step, (k+1)*step) -> (players, bins)."""
+    edges = np.arange(0.0, MAX_SCORE + step, step)
+    edges[-1] = MAX_SCORE
+    return np.diff(round_cdf(models, edges), axis=1)
+
+
+def win_probs_from_pmf(pmf: np.ndarray) -> np.ndarray:
+    """P(player i has the max) from per-player pmfs on a shared grid.
+
+    Within a bin the players are treated as uniformly ordered, i.e. an
+    opponent beats i inside the same bin half the time.
+    """
+    below = np.cumsum(pmf, axis=1) - pmf
+    beaten = below + 0.5 * pmf
+    n = pmf.shape[0]
+    out = np.empty(n)
+    for i in range(n):
+        others = np.prod(np.delete(beaten, i, axis=0), axis=0) if n > 1 else 1.0
+        out[i] = float(np.sum(pmf[i] * others))
+    total = out.sum()
+    return out / total if total > 0 else np.full(n, 1.0 / max(n, 1))
+
+
+def total_pmf(models: RoundModels, rounds: int = ROUNDS, step: float = TOTAL_STEP) -> np.ndarray:
+    """pmf of each player's `rounds`-round total on a grid of width `step`."""
+    pmf = round_pmf(models, step)
+    size = pmf.shape[1] * rounds
+    nfft = 1 << int(np.ceil(np.log2(size)))
+    spectrum = np.fft.rfft(pmf, n=nfft, axis=1) ** rounds
+    out = np.fft.irfft(spectrum, n=nfft, axis=1)[:, :size]
+    # FFT round-off leaves tiny negative masses; clip and renormalize
+    np.clip(out, 0.0, None, out=out)
+    out /= out.sum(axis=1, keepdims=True)
+    return out
+
+
+def round_win_probs(models: RoundModels, step: float = ROUND_STEP) -> np.ndarray:
+    """Per-round win probability of every player (rounds are i.i.d.)."""
+    return win_probs_from_pmf(round_pmf(models, step))
+
+
+def analytic_moneyline_probs(models: RoundModels, rounds: int = ROUNDS) -> Dict[str, np.ndarray]:
+    """Fair classic/firstRound/lastRound win probabilities, aligned with models."""
+    per_round = round_win_probs(models)
+    return {
+        'classic': win_probs_from_pmf(total_pmf(models, rounds)),
+        'firstRound': per_round,
+        'lastRound': per_round.copy(),
+    }
+
+
+def cross_check(models: RoundModels, sims: int = 100000, rounds: int = ROUNDS, rng: np.random.Generator = None) -> Dict[str, float]:
+    """Max absolute gap per market between the analytic and Monte Carlo engines."""
+    exact = analytic_moneyline_probs(models, rounds)
+    counts = simulate_moneyline_counts(models, sims, rounds=rounds, rng=rng)
+    return {k: float(np.max(np.abs(exact[k] - counts[k] / float(sims)))) for k in exact}
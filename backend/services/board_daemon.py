@@ -0,0 +1,225 @@
+"""Background pricing daemon that keeps a warm, fully priced board snapshot.
+
+Pricing endpoints used to run their models inside the request. With the
+daemon running (PRICING_DAEMON=1; see below for where it starts) a background thread
+prices every default-parameter board once and publishes it as an immutable
+BoardSnapshot. Requests then only serialize what is already there, so their
+latency does not depend on simulation cost.
+
+A snapshot is rebuilt when:
+
+  - the geo_players / geo_countries data version changes (polled every
+    BOARD_POLL_INTERVAL seconds; ingest and /geo/cache/invalidate bump it);
+  - BOARD_REFRESH_INTERVAL seconds have passed (zetamac tables and locks have
+    no data version, so they are refreshed on the interval);
+  - request_refresh() is called.
+
+The daemon belongs to serving processes only. It is started from the entry
+points (the gunicorn post_fork hook in gunicorn.conf.py, and the reloader
+child of `python app.py`) and never from create_app. Importing the app,
+the reloader parent and simulation pool workers therefore never run their own.
+
+The new snapshot is built off to the side and swapped in with a single
+reference assignment, so readers always see one complete board. A job that
+fails keeps its previous payload, and the error is recorded on the snapshot.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+REFRESH_INTERVAL = float(os.getenv('BOARD_REFRESH_INTERVAL', '30'))
+POLL_INTERVAL = float(os.getenv('BOARD_POLL_INTERVAL', '1'))
+# threshold grid served by /api/geoguessr/totals and /api/pricing/lines
+TOTAL_THRESHOLDS = list(range(7500, 23001, 500))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BoardSnapshot:
+    """One complete priced board; never mutated after it is published."""
+    built_at: float
+    versions: Tuple
+    markets: Dict[str, Dict] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+
+def _geoguessr_totals() -> Dict:
+    from database.geo_repo import get_geo_players  # type: ignore
+    from services.pricing_service import geoguessr_totals_board  # type: ignore
+    rows = get_geo_players() or []
+    return dict(geoguessr_totals_board(rows), raw_rows=rows, db_ok=True)
+
+
+def _pricing_lines() -> Dict:
+    from database.geo_repo import get_geo_players  # type: ignore
+    from services.pricing_service import price_for_thresholds  # type: ignore
+    ids = [p.get('player_id') for p in get_geo_players() or []]
+    # /api/pricing/lines default: marginBps 0, bumped by 200 in the route
+    return price_for_thresholds(ids, TOTAL_THRESHOLDS, margin_bps=200) if ids else {}
+
+
+def default_jobs() -> Dict[str, Callable[[], Dict]]:
+    """Board name -> zero-argument pricing call, matching each endpoint's defaults."""
+    from services import pricing_service as ps  # type: ignore
+    return {
+        'geoguessr_totals': _geoguessr_totals,
+        'pricing_lines': _pricing_lines,
+        'country_props': lambda: ps.price_country_props(threshold_rounds=5, margin_bps=700),
+        'continents': lambda: ps.continent_markets(rounds=5),
+        'moneylines': lambda: ps.price_moneylines(simulations=5000, margin_bps=850),
+        'pricing_moneyline': lambda: ps.price_moneylines(simulations=5000, margin_bps=800),
+        'zetamac_totals': lambda: ps.price_zetamac_totals(margin_bps=700),
+        'zetamac_moneylines': lambda: ps.price_zetamac_moneylines(margin_bps=700),
+        'zetamac_outright': lambda: ps.price_zetamac_outright(margin_bps=700),
+    }
+
+
+def data_versions() -> Tuple:
+    """Current (geo_players, geo_countries) data versions, re-reading expired cache entries first."""
+    from database.geo_repo import get_data_version, get_geo_countries, get_geo_players  # type: ignore
+    try:
+        get_geo_players()
+        get_geo_countries()
+    except Exception:
+        logger.exception('board daemon: failed to refresh geo tables')
+    return get_data_version('geo_players'), get_data_version('geo_countries')
+
+
+class BoardDaemon:
+    """Owns the published snapshot and the thread that rebuilds it."""
+
+    def __init__(self, jobs: Dict[str, Callable[[], Dict]] = None, interval: float = REFRESH_INTERVAL,
+                 poll: float = POLL_INTERVAL, versions: Callable[[], Tuple] = data_versions):
+        self.jobs = jobs if jobs is not None else default_jobs()
+        self.interval = float(interval)
+        self.poll = float(poll)
+        self.versions = versions
+        self._snapshot: Optional[BoardSnapshot] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._build_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> Optional[BoardSnapshot]:
+        return self._snapshot
+
+    def get(self, name: str) -> Optional[Dict]:
+        snap = self._snapshot
+        return snap.markets.get(name) if snap is not None else None
+
+    def refresh(self) -> BoardSnapshot:
+        """Price every job and atomically publish the new snapshot."""
+        with self._build_lock:
+            versions = self.versions()
+            prev = self._snapshot
+            markets, errors = {}, {}
+            for name, job in self.jobs.items():
+                try:
+                    markets[name] = job()
+                except Exception as e:
+                    logger.exception('board daemon: %s failed', name)
+                    errors[name] = str(e)
+                    if prev is not None and name in prev.markets:
+                        markets[name] = prev.markets[name]
+            snap = BoardSnapshot(built_at=time.time(), versions=versions, markets=markets, errors=errors)
+            self._snapshot = snap
+            return snap
+
+    def request_refresh(self) -> None:
+        self._wake.set()
+
+    def _due(self) -> bool:
+        snap = self._snapshot
+        if snap is None or self._wake.is_set() or snap.age() >= self.interval:
+            return True
+        return self.versions() != snap.versions
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self._due():
+                    self._wake.clear()
+                    self.refresh()
+            except Exception:
+                logger.exception('board daemon: refresh failed')
+            self._wake.wait(self.poll)
+
+    def start(self) -> 'BoardDaemon':
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='board-daemon', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_daemon: Optional[BoardDaemon] = None
+_daemon_lock = threading.Lock()
+
+
+def start_daemon(**kwargs) -> BoardDaemon:
+    """Start the process-wide daemon (idempotent)."""
+    global _daemon
+    with _daemon_lock:
+        if _daemon is None:
+            _daemon = BoardDaemon(**kwargs)
+        return _daemon.start()
+
+
+def daemon_enabled() -> bool:
+    """PRICING_DAEMON is set and this is not a multiprocessing child (e.g. a sim pool worker)."""
+    if os.getenv('PRICING_DAEMON', '0').lower() not in ('1', 'true', 'yes'):
+        return False
+    return multiprocessing.parent_process() is None
+
+
+def start_daemon_if_enabled() -> Optional[BoardDaemon]:
+    """Entry-point hook: start the daemon when daemon_enabled(), else do nothing."""
+    return start_daemon() if daemon_enabled() else None
+
+
+def get_daemon() -> Optional[BoardDaemon]:
+    return _daemon
+
+
+def board_payload(name: str) -> Optional[Dict]:
+    """Precomputed payload for `name`, or None when the daemon is off or still warming up."""
+    daemon = _daemon
+    return daemon.get(name) if daemon is not None else None
+
+
+def board_payload_meta(name: str) -> Optional[Tuple[Dict, Dict]]:
+    """(payload, { age, version, stale, refreshing, error }) for `name`, or None when unavailable.
+
+    version is the geo_players data version the snapshot was priced from.
+    """
+    daemon = _daemon
+    snap = daemon.snapshot if daemon is not None else None
+    if snap is None or name not in snap.markets:
+        return None
+    age = snap.age()
+    stale = age >= daemon.interval
+    return snap.markets[name], {'age': round(age, 3), 'version': snap.versions[0] if snap.versions else None,
+                                'stale': stale, 'refreshing': stale, 'error': snap.errors.get(name)}
+
+
+def request_refresh() -> None:
+    """Ask the running daemon (if any) to reprice on its next poll."""
+    daemon = _daemon
+    if daemon is not None:
+        daemon.request_refresh()
@@ -0,0 +1,254 @@
+"""Health-bar duel pricing (GeoGuessr Duels format), vectorized.
+
+Rules (from steters/ml_headsup.py):
+  - both sides start on 6000 HP;
+  - each round the lower score takes (score difference) x multiplier damage;
+  - multiplier is 1 for rounds 1-3, then 0.5 * n - 0.5 (1.5, 2, 2.5, ...);
+  - the duel ends when a side reaches 0 HP.
+
+Round scores are Normal(mean/5, std/sqrt(5)) per player, clamped to [0, 5000].
+Team duels (steters/running.py) score each side as the best of its members and
+replace draws above 5000 with a uniform easy round on [4950, 5000].
+
+Every duel of every matchup runs in lockstep: one (sims, players) score matrix
+is drawn per round and shared by all matchups, and finished duels are retired
+with masks, so the whole board costs a handful of array ops per round.
+Matchup sides are index arrays into the roster, so a side may be a single
+player or a team (team score = best member score).
+"""
+from itertools import combinations
+from typing import Dict, List
+
+import numpy as np
+
+MAX_SCORE = 5000.0
+START_HP = 6000.0
+# safety stop; by round 20 the multiplier is 9.5x and duels are long over
+MAX_ROUNDS = 30
+DEFAULT_SIMS = 20000
+
+
+def multiplier(round_num):
+    """Damage multiplier for a (1-based) round number; works on scalars and arrays."""
+    r = np.asarray(round_num, dtype=float)
+    out = np.where(r <= 3, 1.0, 0.5 * r - 0.5)
+    return float(out) if out.ndim == 0 else out
+
+
+def round_params(players: List[Dict]):
+    """Per-round (mean, std) arrays from geo_players rows (game mean/std)."""
+    mu = np.array([float(p.get('mean_score') or 0.0) for p in players]) / 5.0
+    sd = np.array([float(p.get('stddev_score') or 0.0) for p in players]) / np.sqrt(5.0)
+    return mu, sd
+
+
+def sample_scores(mu: np.ndarray, sd: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    """(size, players) clamped normal round scores."""
+    scores = rng.normal(mu, sd, size=(int(size), len(mu)))
+    np.clip(scores, 0.0, MAX_SCORE, out=scores)
+    return scores
+
+
+def sample_capped_scores(mu: np.ndarray, sd: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    """(size, players) normal round scores; draws over 5000 become uniform on [4950, 5000]."""
+    scores = rng.normal(mu, sd, size=(int(size), len(mu)))
+    over = scores > MAX_SCORE
+    scores[over] = rng.uniform(4950.0, MAX_SCORE, size=int(over.sum()))
+    np.clip(scores, 0.0, MAX_SCORE, out=scores)
+    return scores
+
+
+def team_matchups(n_players: int, team_size: int = 2) -> List:
+    """Every pairing of two disjoint teams of `team_size` from a roster of n players.
+
+    For four players that is the three 2v2 splits, e.g. (0,1) v (2,3).
+    """
+    teams = list(combinations(range(n_players), team_size))
+    return [(a, b) for a, b in combinations(teams, 2) if not set(a) & set(b)]
+
+
+def simulate_duels(mu: np.ndarray, sd: np.ndarray, left: np.ndarray, right: np.ndarray, sims: int = DEFAULT_SIMS,
+                   rng: np.random.Generator = None, start_hp: float = START_HP, max_rounds: int = MAX_ROUNDS,
+                   sampler=None) -> Dict[str, np.ndarray]:
+    """Run `sims` duels of every matchup at once.
+
+    left/right: (matchups, team_size) player indices for each side.
+    sampler(mu, sd, size, rng) -> (size, players) scores; defaults to sample_scores.
+    Returns counts: 'left', 'right', 'unfinished' (matchups,) and
+    'rounds' (matchups, max_rounds + 1) histogram of rounds played.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    sampler = sampler or sample_scores
+    left = np.atleast_2d(np.asarray(left, dtype=np.int64))
+    right = np.atleast_2d(np.asarray(right, dtype=np.int64))
+    sims, n_match = int(sims), left.shape[0]
+
+    hp_left = np.full((sims, n_match), float(start_hp))
+    hp_right = np.full((sims, n_match), float(start_hp))
+    alive = np.ones((sims, n_match), dtype=bool)
+    played = np.full((sims, n_match), max_rounds, dtype=np.int64)
+
+    for r in range(1, max_rounds + 1):
+        rows = np.flatnonzero(alive.any(axis=1))
+        if rows.size == 0:
+            break
+        # only simulations with a live duel draw scores this round
+        scores = sampler(mu, sd, rows.size, rng)
+        diff = scores[:, left].max(axis=2) - scores[:, right].max(axis=2)
+        damage = np.abs(diff) * multiplier(r)
+        live = alive[rows]
+        hp_right[rows] -= np.where(live & (diff > 0), damage, 0.0)
+        hp_left[rows] -= np.where(live & (diff < 0), damage, 0.0)
+        done = live & ((hp_left[rows] <= 0) | (hp_right[rows] <= 0))
+        played[rows] = np.where(done, r, played[rows])
+        alive[rows] = live & ~done
+
+    left_win = (hp_right <= 0) & (hp_left > 0)
+    right_win = (hp_left <= 0) & (hp_right > 0)
+    hist = np.zeros((n_match, max_rounds + 1), dtype=np.int64)
+    for m in range(n_match):
+        hist[m] = np.bincount(played[:, m], minlength=max_rounds + 1)
+    return {
+        'left': left_win.sum(axis=0),
+        'right': right_win.sum(axis=0),
+        'unfinished': alive.sum(axis=0),
+        'rounds': hist,
+    }
+
+
+def _price_two_way(p_left: np.ndarray, margin_bps: int):
+    from services.pricing_service import apply_margin_array, prob_to_decimal_array  # type: ignore
+    from utils.odds import american_strings, decimal_to_american_array  # type: ignore
+
+    adj_l, adj_r = apply_margin_array(p_left, 1.0 - p_left, margin_bps)
+    dec_l, dec_r = prob_to_decimal_array(adj_l), prob_to_decimal_array(adj_r)
+    return {
+        'left_prob': adj_l.tolist(),
+        'right_prob': adj_r.tolist(),
+        'left_decimal': np.round(dec_l, 4).tolist(),
+        'right_decimal': np.round(dec_r, 4).tolist(),
+        'left_american': american_strings(decimal_to_american_array(dec_l, prob=adj_l)),
+        'right_american': american_strings(decimal_to_american_array(dec_r, prob=adj_r)),
+    }
+
+
+def _fair_left(counts: Dict[str, np.ndarray], sims: int) -> np.ndarray:
+    """Left-side fair probability; unfinished duels are split evenly."""
+    return (counts['left'] + 0.5 * counts['unfinished']) / float(sims)
+
+
+def _rounds_distribution(hist_row: np.ndarray, sims: int) -> Dict[int, float]:
+    return {int(r): float(c) / sims for r, c in enumerate(hist_row) if c > 0}
+
+
+def _name(p: Dict) -> str:
+    return p.get('name') or p.get('screenname') or str(p.get('player_id'))
+
+
+def price_duels(simulations: int = DEFAULT_SIMS, margin_bps: int = 700, players: List[Dict] = None, ctx=None,
+                parallel: bool = None, workers: int = None) -> Dict:
+    """Price every 1v1 duel between geo_players in one batched run.
+
+    Returns { 'matchups': [ { player1_id, player1_name, player2_id, player2_name,
+    player1_win, player2_win, unfinished, rounds: {n: prob}, expected_rounds,
+    player1_prob, player2_prob, player1_decimal, player2_decimal,
+    player1_american, player2_american } ] } where *_win are fair probabilities
+    and *_prob include the margin.
+
+    `parallel` / `workers` shard the run across services.sim_executor.
+    """
+    if players is None:
+        from database.geo_repo import get_geo_players  # type: ignore
+        players = get_geo_players() or []
+    if len(players) < 2:
+        return {'matchups': []}
+    from services.sim_context import default_context  # type: ignore
+    from services.sim_executor import parallel_duel_counts, use_pool  # type: ignore
+
+    sims = int(simulations or DEFAULT_SIMS)
+    pairs = list(combinations(range(len(players)), 2))
+    left = np.array([[i] for i, _ in pairs])
+    right = np.array([[j] for _, j in pairs])
+    mu, sd = round_params(players)
+    ctx = ctx or default_context()
+    # the same shards run pooled or in-process, so use_pool never changes the prices
+    counts = parallel_duel_counts(mu, sd, left, right, sims, ctx, 'duels', workers=workers, parallel=use_pool(parallel, sims))
+
+    fair = _fair_left(counts, sims)
+    priced = _price_two_way(fair, margin_bps)
+    rounds_axis = np.arange(counts['rounds'].shape[1])
+    matchups = []
+    for m, (i, j) in enumerate(pairs):
+        p1, p2 = players[i], players[j]
+        matchups.append({
+            'player1_id': p1.get('player_id'),
+            'player1_name': _name(p1),
+            'player2_id': p2.get('player_id'),
+            'player2_name': _name(p2),
+            'player1_win': float(counts['left'][m]) / sims,
+            'player2_win': float(counts['right'][m]) / sims,
+            'unfinished': float(counts['unfinished'][m]) / sims,
+            'rounds': _rounds_distribution(counts['rounds'][m], sims),
+            'expected_rounds': float((counts['rounds'][m] * rounds_axis).sum()) / sims,
+            'player1_prob': priced['left_prob'][m],
+            'player2_prob': priced['right_prob'][m],
+            'player1_decimal': priced['left_decimal'][m],
+            'player2_decimal': priced['right_decimal'][m],
+            'player1_american': priced['left_american'][m],
+            'player2_american': priced['right_american'][m],
+        })
+    return {'config': {'simulations': sims, 'start_hp': START_HP}, 'matchups': matchups}
+
+
+def price_team_duels(simulations: int = DEFAULT_SIMS, margin_bps: int = 700, players: List[Dict] = None, team_size: int = 2, ctx=None,
+                     parallel: bool = None, workers: int = None) -> Dict:
+    """Price every team-vs-team duel (default 2v2) between geo_players in one run.
+
+    All partitions share the same per-round draws, so e.g. Pam+Naresh v
+    Sohan+Pritesh and Pam+Sohan v Naresh+Pritesh are priced on identical games.
+
+    Returns { 'config', 'matchups': [ { team1: [names], team2: [names], team1_ids,
+    team2_ids, team1_win, team2_win, unfinished, rounds, expected_rounds,
+    team1_prob, team2_prob, team1_decimal, team2_decimal, team1_american,
+    team2_american } ] }
+    """
+    if players is None:
+        from database.geo_repo import get_geo_players  # type: ignore
+        players = get_geo_players() or []
+    pairs = team_matchups(len(players), int(team_size))
+    if not pairs:
+        return {'matchups': []}
+    from services.sim_context import default_context  # type: ignore
+    from services.sim_executor import parallel_duel_counts, use_pool  # type: ignore
+
+    sims = int(simulations or DEFAULT_SIMS)
+    left = np.array([a for a, _ in pairs])
+    right = np.array([b for _, b in pairs])
+    mu, sd = round_params(players)
+    ctx = ctx or default_context()
+    counts = parallel_duel_counts(mu, sd, left, right, sims, ctx, 'duels:teams', sampler_name='sample_capped_scores',
+                                  workers=workers, parallel=use_pool(parallel, sims))
+
+    priced = _price_two_way(_fair_left(counts, sims), margin_bps)
+    rounds_axis = np.arange(counts['rounds'].shape[1])
+    matchups = []
+    for m, (a, b) in enumerate(pairs):
+        matchups.append({
+            'team1': [_name(players[i]) for i in a],
+            'team2': [_name(players[i]) for i in b],
+            'team1_ids': [players[i].get('player_id') for i in a],
+            'team2_ids': [players[i].get('player_id') for i in b],
+            'team1_win': float(counts['left'][m]) / sims,
+            'team2_win': float(counts['right'][m]) / sims,
+            'unfinished': float(counts['unfinished'][m]) / sims,
+            'rounds': _rounds_distribution(counts['rounds'][m], sims),
+            'expected_rounds': float((counts['rounds'][m] * rounds_axis).sum()) / sims,
+            'team1_prob': priced['left_prob'][m],
+            'team2_prob': priced['right_prob'][m],
+            'team1_decimal': priced['left_decimal'][m],
+            'team2_decimal': priced['right_decimal'][m],
+            'team1_american': priced['left_american'][m],
+            'team2_american': priced['right_american'][m],
+        })
+    return {'config': {'simulations': sims, 'start_hp': START_HP, 'team_size': int(team_size)}, 'matchups': matchups}
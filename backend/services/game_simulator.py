@@ -0,0 +1,330 @@
+"""Single-pass game simulator feeding every GeoGuessr market at once.
+
+Each market family used to run its own model (moneylines in one Monte Carlo
+loop, totals and first guess from normal CDFs, continents from a binomial,
+specials from another sampler). Here one batch of games is drawn and kept as
+a GameTensor:
+
+  - draws: (sims, rounds) country index per round (continents follow);
+  - scores: (sims, rounds, players) round scores from services.simulation.
+
+Markets are registered functions that reduce the same tensor to fair
+probabilities, so the whole board comes from one set of games and
+cross-market combos (e.g. game winner and first-round winner) carry the
+correlation the separate models could not see.
+
+Every market returns outcome rows grouped into books; its `kind` decides how
+the margin is applied to each group:
+
+  - exclusive: outcomes of one book sum to 1; scaled to 1 + margin (moneyline style);
+  - two_way: over/under pairs, margin via apply_margin_array;
+  - single: stand-alone yes props, scaled by 1 + margin and kept below 1.
+"""
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from services.simulation import ROUNDS, max_hits
+
+DEFAULT_SIMS = 20000
+TOTAL_LINES = (12500, 15000, 17500, 20000)
+FIRST_GUESS_LINES = tuple(range(1700, 4701, 300))
+CONTINENT_HOOKS = (0.5, 1.5, 2.5, 3.5)
+MARKET_KINDS = ('exclusive', 'two_way', 'single')
+
+
+@dataclass
+class GameTensor:
+    """One batch of simulated games."""
+    scores: np.ndarray
+    draws: np.ndarray
+    countries: List[str]
+    continent_of: np.ndarray
+    continents: List[str]
+    player_ids: List = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+
+    @property
+    def sims(self) -> int:
+        return int(self.scores.shape[0])
+
+    @property
+    def rounds(self) -> int:
+        return int(self.scores.shape[1])
+
+    @cached_property
+    def totals(self) -> np.ndarray:
+        return self.scores.sum(axis=1)
+
+    @cached_property
+    def game_wins(self) -> np.ndarray:
+        """(sims, players) game winner mask (ties count for every tied player)."""
+        return max_hits(self.totals) if self.names else np.zeros(self.totals.shape, dtype=bool)
+
+    @cached_property
+    def round_wins(self) -> np.ndarray:
+        """(sims, rounds, players) round winner mask."""
+        return max_hits(self.scores) if self.names else np.zeros(self.scores.shape, dtype=bool)
+
+    @cached_property
+    def continent_draws(self) -> np.ndarray:
+        """(sims, rounds) continent index per round."""
+        return self.continent_of[self.draws]
+
+    def continent_counts(self) -> np.ndarray:
+        """(sims, continents) rounds landing in each continent."""
+        k = len(self.continents)
+        offsets = np.arange(self.sims)[:, None] * k
+        return np.bincount((self.continent_draws + offsets).ravel(), minlength=self.sims * k).reshape(self.sims, k)
+
+    def mean(self, hits: np.ndarray) -> np.ndarray:
+        """Hit rate over simulations (axis 0)."""
+        return np.asarray(hits, dtype=float).mean(axis=0)
+
+    def outcomes(self):
+        """The tensor as specials_dsl Outcomes, so formula specials price on the same games."""
+        from services.specials_dsl import Outcomes  # type: ignore
+        return Outcomes(
+            draws=self.draws,
+            continents=[self.continents[c].strip().lower() for c in self.continent_of],
+            countries=[c.strip().lower() for c in self.countries],
+            scores=self.scores,
+            player_index={str(n).strip().lower(): i for i, n in enumerate(self.names)},
+        )
+
+
+def _country_table(rows: List[Dict]):
+    """(countries, continent_of, continents, probs) from geo_countries rows."""
+    countries, conts, freqs = [], [], []
+    for r in rows or []:
+        cont = (r.get('continent') or '').strip()
+        if not cont:
+            continue
+        try:
+            f = max(0.0, float(r.get('freq') or 0.0))
+        except Exception:
+            f = 0.0
+        countries.append((r.get('country') or '').strip() or cont)
+        conts.append(cont)
+        freqs.append(f)
+    probs = np.array(freqs, dtype=float)
+    if not countries or probs.sum() <= 0:
+        raise ValueError('no location frequencies available')
+    continents = sorted(set(conts))
+    continent_of = np.array([continents.index(c) for c in conts], dtype=np.int64)
+    return countries, continent_of, continents, probs / probs.sum()
+
+
+def simulate_game(players: List[Dict] = None, rows: List[Dict] = None, sims: int = DEFAULT_SIMS, rounds: int = ROUNDS,
+                  ctx=None) -> GameTensor:
+    """Draw `sims` full games: a location per round and every player's round scores.
+
+    Locations and scores come from separate streams of the context ('game:locations',
+    'game:scores'), so adding a market never shifts the draws of another.
+    """
+    from services.sim_context import default_context  # type: ignore
+    from services.simulation import build_round_models, sample_round_scores  # type: ignore
+    if players is None:
+        from database.geo_repo import get_geo_players  # type: ignore
+        players = get_geo_players() or []
+    if rows is None:
+        from database.geo_repo import get_geo_countries  # type: ignore
+        rows = get_geo_countries() or []
+
+    ctx = ctx or default_context()
+    sims = int(sims or DEFAULT_SIMS)
+    countries, continent_of, continents, probs = _country_table(rows)
+    draws = ctx.stream('game:locations').choice(len(countries), size=(sims, int(rounds)), p=probs)
+    models = build_round_models(players)
+    if len(models):
+        scores = sample_round_scores(models, sims, rounds=int(rounds), rng=ctx.stream('game:scores'), inverse=ctx.crn)
+    else:
+        scores = np.zeros((sims, int(rounds), 0))
+    return GameTensor(scores=scores, draws=draws, countries=countries, continent_of=continent_of, continents=continents,
+                      player_ids=list(models.player_ids), names=list(models.names))
+
+
+### market registry ###
+
+MARKETS: Dict[str, Dict] = {}
+
+
+def register_market(name: str, kind: str):
+    """Decorator registering fn(game, **params) -> [ { group, key, label, fair_prob } ]."""
+    if kind not in MARKET_KINDS:
+        raise ValueError(f"unknown market kind: {kind}")
+
+    def wrap(fn: Callable) -> Callable:
+        MARKETS[name] = {'fn': fn, 'kind': kind}
+        return fn
+    return wrap
+
+
+def _players(game: GameTensor):
+    return list(enumerate(zip(game.player_ids, game.names)))
+
+
+@register_market('winner', 'exclusive')
+def winner_market(game: GameTensor, **_) -> List[Dict]:
+    p = game.mean(game.game_wins)
+    return [{'group': 'winner', 'key': f"winner:{pid}", 'label': f"{name} to win", 'player_id': pid, 'fair_prob': float(p[i])}
+            for i, (pid, name) in _players(game)]
+
+
+@register_market('round_winner', 'exclusive')
+def round_winner_market(game: GameTensor, **_) -> List[Dict]:
+    p = game.mean(game.round_wins)
+    out = []
+    for r in range(game.rounds):
+        for i, (pid, name) in _players(game):
+            out.append({'group': f"round{r + 1}", 'key': f"round{r + 1}:{pid}", 'label': f"{name} wins round {r + 1}",
+                        'player_id': pid, 'fair_prob': float(p[r, i])})
+    return out
+
+
+def _over_under(group: str, label: str, p_over: float, **extra) -> List[Dict]:
+    return [
+        dict(extra, group=group, key=f"{group}:over", label=f"{label} over", fair_prob=float(p_over)),
+        dict(extra, group=group, key=f"{group}:under", label=f"{label} under", fair_prob=float(1.0 - p_over)),
+    ]
+
+
+@register_market('player_totals', 'two_way')
+def player_totals_market(game: GameTensor, total_lines=TOTAL_LINES, **_) -> List[Dict]:
+    lines = np.asarray(total_lines, dtype=float)
+    over = game.mean(game.totals[:, :, None] >= lines[None, None, :])
+    out = []
+    for i, (pid, name) in _players(game):
+        for j, t in enumerate(total_lines):
+            out += _over_under(f"total:{pid}:{t}", f"{name} {t}", over[i, j], player_id=pid, line=t)
+    return out
+
+
+@register_market('first_guess', 'two_way')
+def first_guess_market(game: GameTensor, first_guess_lines=FIRST_GUESS_LINES, **_) -> List[Dict]:
+    lines = np.asarray(first_guess_lines, dtype=float)
+    over = game.mean(game.scores[:, 0, :, None] >= lines[None, None, :])
+    out = []
+    for i, (pid, name) in _players(game):
+        for j, t in enumerate(first_guess_lines):
+            out += _over_under(f"first_guess:{pid}:{t}", f"{name} first guess {t}", over[i, j], player_id=pid, line=t)
+    return out
+
+
+@register_market('round_count', 'single')
+def round_count_market(game: GameTensor, **_) -> List[Dict]:
+    wins = game.round_wins.sum(axis=1)
+    out = []
+    for i, (pid, name) in _players(game):
+        for k in range(1, game.rounds + 1):
+            out.append({'group': f"round_count:{pid}", 'key': f"round_count:{pid}:{k}", 'label': f"{name} wins {k}+ rounds",
+                        'player_id': pid, 'fair_prob': float(np.mean(wins[:, i] >= k))})
+    return out
+
+
+@register_market('continents', 'two_way')
+def continents_market(game: GameTensor, hooks=CONTINENT_HOOKS, **_) -> List[Dict]:
+    counts = game.continent_counts()
+    out = []
+    for c, name in enumerate(game.continents):
+        for h in hooks:
+            out += _over_under(f"continent:{name}:{h}", f"{name} {h}", np.mean(counts[:, c] > h), continent=name, hook=h)
+    return out
+
+
+@register_market('continent_specials', 'single')
+def continent_specials_market(game: GameTensor, **_) -> List[Dict]:
+    conts = game.continent_draws
+    same_next = conts[:, 1:] == conts[:, :-1]
+    out = []
+    for c, name in enumerate(game.continents):
+        here = conts == c
+        b2b = (here[:, 1:] & here[:, :-1]).any(axis=1)
+        out.append({'group': 'continent_specials', 'key': f"back_to_back:{name}", 'label': f"Back-to-back {name}",
+                    'fair_prob': float(b2b.mean())})
+        out.append({'group': 'continent_specials', 'key': f"no_until_4:{name}", 'label': f"No {name} until round 4",
+                    'fair_prob': float((~here[:, :3].any(axis=1)).mean())})
+    three = (same_next[:, 1:] & same_next[:, :-1]).any(axis=1) if game.rounds >= 3 else np.zeros(game.sims, dtype=bool)
+    out.append({'group': 'continent_specials', 'key': 'same_three_in_a_row', 'label': 'Same continent 3 rounds in a row',
+                'fair_prob': float(three.mean())})
+    return out
+
+
+@register_market('combos', 'single')
+def combos_market(game: GameTensor, formulas=(), **_) -> List[Dict]:
+    """Same-game combos: game + first round, game + last round, and any DSL formulas."""
+    wins, rounds = game.game_wins, game.round_wins
+    out = []
+    for i, (pid, name) in _players(game):
+        out.append({'group': 'combos', 'key': f"win_first:{pid}", 'label': f"{name} wins round 1 and the game",
+                    'player_id': pid, 'fair_prob': float(np.mean(wins[:, i] & rounds[:, 0, i]))})
+        out.append({'group': 'combos', 'key': f"win_last:{pid}", 'label': f"{name} wins round {game.rounds} and the game",
+                    'player_id': pid, 'fair_prob': float(np.mean(wins[:, i] & rounds[:, -1, i]))})
+    if formulas:
+        from services.specials_dsl import FormulaError, compile_formula  # type: ignore
+        outcomes = game.outcomes()
+        for text in formulas:
+            try:
+                prob = outcomes.probability(compile_formula(text).evaluate(outcomes))
+            except FormulaError as e:
+                out.append({'group': 'combos', 'key': f"formula:{text}", 'label': text, 'error': str(e)})
+                continue
+            out.append({'group': 'combos', 'key': f"formula:{text}", 'label': text, 'fair_prob': prob})
+    return out
+
+
+### pricing ###
+
+def _apply_margin(rows: List[Dict], kind: str, margin_bps: int) -> np.ndarray:
+    """Margin-adjusted probability per row according to the market kind."""
+    from services.pricing_service import apply_margin_array  # type: ignore
+    fair = np.array([r.get('fair_prob', np.nan) for r in rows], dtype=float)
+    if kind == 'single':
+        return np.clip(fair * (1.0 + margin_bps / 10000.0), 0.0, 0.9999)
+    adj = fair.copy()
+    groups: Dict[str, List[int]] = {}
+    for i, r in enumerate(rows):
+        groups.setdefault(r['group'], []).append(i)
+    for idx in groups.values():
+        if kind == 'two_way' and len(idx) == 2:
+            over, under = apply_margin_array(fair[idx[0]], fair[idx[1]], margin_bps)
+            adj[idx[0]], adj[idx[1]] = float(over), float(under)
+            continue
+        total = fair[idx].sum()
+        adj[idx] = fair[idx] * (1.0 + margin_bps / 10000.0) / total if total > 0 else 1.0 / len(idx)
+    return adj
+
+
+def price_board(markets: List[str] = None, sims: int = DEFAULT_SIMS, margin_bps: int = 800, players: List[Dict] = None,
+                rows: List[Dict] = None, ctx=None, max_decimal_odds: float = 100.0, **params) -> Dict:
+    """Simulate one batch of games and price every requested market from it.
+
+    markets: names from MARKETS (default: all). Extra keyword params are passed
+    to every market (total_lines, first_guess_lines, hooks, formulas).
+    Returns { 'config': { simulations, rounds, markets }, 'markets': { name: [ { group, key, label,
+    fair_prob, prob, decimal, american, ... } ] } }.
+    """
+    from services.pricing_service import prob_to_decimal_array  # type: ignore
+    from utils.odds import american_strings, decimal_to_american_array  # type: ignore
+
+    names = list(markets) if markets else list(MARKETS)
+    unknown = [m for m in names if m not in MARKETS]
+    if unknown:
+        raise ValueError(f"unknown markets: {', '.join(unknown)}")
+    game = simulate_game(players=players, rows=rows, sims=sims, ctx=ctx)
+
+    out = {}
+    for name in names:
+        spec = MARKETS[name]
+        entries = spec['fn'](game, **params)
+        priced = [r for r in entries if 'fair_prob' in r]
+        if priced:
+            adj = _apply_margin(priced, spec['kind'], margin_bps)
+            dec = np.minimum(prob_to_decimal_array(adj), max_decimal_odds)
+            amer = american_strings(decimal_to_american_array(dec, prob=adj))
+            for r, a, d, s in zip(priced, adj.tolist(), np.round(dec, 4).tolist(), amer):
+                r.update({'prob': a, 'decimal': d, 'american': s})
+        out[name] = entries
+    return {'config': {'simulations': game.sims, 'rounds': game.rounds, 'markets': names}, 'markets': out}
@@ -0,0 +1,114 @@
+"""Importance sampling for longshot specials and prop tails.
+
+Naive sampling sees only a handful of hits for events priced near the +5000
+cap, so their prices jump between refreshes. Here draws come from a proposal
+tilted toward the event and every hit is reweighted by the likelihood ratio
+p(x) / q(x), which keeps the estimate unbiased while the relative error stays
+roughly constant however small the probability is.
+
+  - continents: the per-round continent distribution is tilted with the
+    cross-entropy method (a few pilot rounds re-fit the proposal to the
+    weighted hit frequencies), then mixed with the true weights as a
+    defensive component so no weight can blow up;
+  - score thresholds: the normal score model is mean-shifted onto the
+    threshold, the classic exponential tilt for Gaussian tails.
+"""
+from typing import Callable, Dict, List
+
+import numpy as np
+
+ROUNDS = 5
+CE_ITERATIONS = 4
+# share of the true distribution kept in the final proposal (bounds the weights)
+DEFENSIVE_MIX = 0.1
+
+
+def _event_hits(condition_fn: Callable, conts: List[str], idx: np.ndarray) -> np.ndarray:
+    return np.fromiter((bool(condition_fn([conts[i] for i in row])) for row in idx), dtype=bool, count=len(idx))
+
+
+def _likelihood_ratio(p: np.ndarray, q: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    return np.exp(np.sum(np.log(p[idx]) - np.log(q[idx]), axis=1))
+
+
+def cross_entropy_tilt(condition_fn: Callable, conts: List[str], p: np.ndarray, rng: np.random.Generator,
+                       pilot: int = 2000, rounds: int = ROUNDS, iterations: int = CE_ITERATIONS) -> np.ndarray:
+    """Fit a per-round continent proposal q concentrated on the event.
+
+    Starts from an even split between p and uniform (so rare continents show
+    up in the pilot), then moves q to the likelihood-weighted continent
+    frequencies among hits.
+    """
+    k = len(conts)
+    q = 0.5 * p + 0.5 / k
+    for _ in range(int(iterations)):
+        idx = rng.choice(k, size=(int(pilot), int(rounds)), p=q)
+        hits = _event_hits(condition_fn, conts, idx)
+        if not hits.any():
+            # no hit yet: flatten further toward uniform and retry
+            q = 0.5 * q + 0.5 / k
+            continue
+        w = _likelihood_ratio(p, q, idx[hits])
+        freq = np.array([(w * (idx[hits] == c).sum(axis=1)).sum() for c in range(k)])
+        q = freq / freq.sum()
+    # defensive mixture keeps every continent reachable
+    return (1.0 - DEFENSIVE_MIX) * q + DEFENSIVE_MIX * p
+
+
+def importance_continent_event(condition_fn: Callable, weights: Dict[str, float], iterations: int = 5000,
+                               rng: np.random.Generator = None, rounds: int = ROUNDS) -> Dict:
+    """Importance-sampled P(condition_fn(draws)) over i.i.d. continent rounds.
+
+    Returns { prob, stderr, rel_error, proposal: {continent: q} }.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    conts = list(weights.keys())
+    p = np.array([max(0.0, float(weights[c])) for c in conts])
+    if not conts or p.sum() <= 0:
+        return {'prob': 0.0, 'stderr': 0.0, 'rel_error': None, 'proposal': {}}
+    p = p / p.sum()
+    # zero-probability continents can never occur; keep them out of the proposal
+    live = p > 0
+    conts_live = [c for c, ok in zip(conts, live) if ok]
+    p_live = p[live]
+
+    q = cross_entropy_tilt(condition_fn, conts_live, p_live, rng, pilot=max(500, int(iterations) // 4), rounds=rounds)
+    idx = rng.choice(len(conts_live), size=(int(iterations), int(rounds)), p=q)
+    hits = _event_hits(condition_fn, conts_live, idx)
+    y = np.where(hits, _likelihood_ratio(p_live, q, idx), 0.0)
+    prob = float(y.mean())
+    stderr = float(y.std(ddof=1) / np.sqrt(len(y))) if len(y) > 1 else 0.0
+    return {
+        'prob': min(1.0, prob),
+        'stderr': stderr,
+        'rel_error': stderr / prob if prob > 0 else None,
+        'proposal': {c: float(v) for c, v in zip(conts_live, q)},
+    }
+
+
+def importance_normal_tail(mean: float, std: float, threshold: float, trials: int = 10000,
+                           rng: np.random.Generator = None) -> Dict:
+    """P(X >= threshold) for X ~ N(mean, std) by sampling from N(threshold, std).
+
+    Shifting the mean onto the threshold puts about half the draws in the tail;
+    the likelihood ratio is exp((mean - t)(2x - mean - t) / (2 std^2)).
+    Returns { over, under, stderr }.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    std = float(std) if std and std > 0 else 1.0
+    t = float(threshold)
+    x = rng.normal(t, std, size=int(trials))
+    w = np.exp((mean - t) * (2.0 * x - mean - t) / (2.0 * std * std))
+    # estimate whichever side is the tail and take the complement for the other
+    if t >= mean:
+        y = np.where(x >= t, w, 0.0)
+        over = float(y.mean())
+        under = 1.0 - over
+    else:
+        y = np.where(x < t, w, 0.0)
+        under = float(y.mean())
+        over = 1.0 - under
+    stderr = float(y.std(ddof=1) / np.sqrt(len(y))) if len(y) > 1 else 0.0
+    return {'over': over, 'under': under, 'stderr': stderr}
@@ -1,21 +1,32 @@
-import random
 import statistics
 from typing import List
 
+import numpy as np
 
-def monte_carlo_probs(values: List[float], thresholds: List[float], trials: int = 10000):
+from services.sim_context import default_context
+
+
+def monte_carlo_probs(values: List[float], thresholds: List[float], trials: int = 10000, rng: np.random.Generator = None, importance: bool = False):
     # simple Monte Carlo assuming normal with mean/std from values
+    # importance=True samples each threshold's tail from a mean-shifted normal
+    # and reweights (services.importance_sampling), for far-out thresholds
     if not values:
         return {t: {'over': None, 'under': None} for t in thresholds}
     mean = statistics.mean(values)
     stdev = statistics.pstdev(values) if len(values) > 1 else 1.0
+    if rng is None:
+        rng = default_context().stream('monte_carlo')
+    if importance:
+        from services.importance_sampling import importance_normal_tail
+        out = {}
+        for t in thresholds:
+            res = importance_normal_tail(mean, stdev, t, trials=int(trials), rng=rng)
+            out[t] = {'over': res['over'], 'under': res['under']}
+        return out
+    # one seeded sample set shared by every threshold (common random numbers)
+    samples = rng.normal(mean, stdev, size=int(trials))
     out = {}
     for t in thresholds:
-        over = 0
-        for _ in range(trials):
-            sample = random.gauss(mean, stdev)
-            if sample >= t:
-                over += 1
-        p_over = over / trials
+        p_over = float(np.count_nonzero(samples >= t)) / trials
         out[t] = {'over': p_over, 'under': 1 - p_over}
     return out
@@ -0,0 +1,137 @@
+"""Precomputed GeoGuessr over/under price grid for single-price lookups.
+
+The frontend threshold slider hits /api/geoguessr/price on every move, and each
+hit used to scan geo_players and price one (player, threshold, margin) triple
+from scratch. The grid prices every player against the standard ladders once per
+geo_players data version:
+
+  - total:       7500..23000 step 500 (the /api/pricing/lines ladder)
+  - first_guess: 1700..4700 step 300 (first round, mean/5 and sd/sqrt(5))
+
+at each margin in GRID_MARGINS, as (margins, players, thresholds) arrays built in
+one price_ladder pass. Player ids, thresholds and margins map to array indices
+through dicts, so an on-grid quote is three dictionary lookups and an array
+read. Off-grid thresholds or margins fall back to the same ladder kernel on the
+player's stored mean/sd, so both paths return identical prices.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+TOTAL_THRESHOLDS = list(range(7500, 23001, 500))
+FIRST_GUESS_THRESHOLDS = list(range(1700, 4701, 300))
+# /api/geoguessr/price default (700) and the totals board (500)
+GRID_MARGINS = (500, 700)
+LADDERS = {'total': TOTAL_THRESHOLDS, 'first_guess': FIRST_GUESS_THRESHOLDS}
+_FIELDS = ('prob_over', 'prob_under', 'decimal_over', 'decimal_under', 'american_over', 'american_under')
+
+
+@dataclass(frozen=True)
+class PriceGrid:
+    """Priced ladders for one geo_players version; never mutated after it is built."""
+    version: int
+    player_index: Dict[Hashable, int]
+    margin_index: Dict[int, int]
+    threshold_index: Dict[str, Dict[int, int]]
+    # market -> (mu, sigma) per player, in player_index order
+    params: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    # market -> field -> (margins, players, thresholds) array
+    tables: Dict[str, Dict[str, np.ndarray]]
+
+    def quote(self, player_id: Hashable, threshold: float, margin_bps: int = 700, market: str = 'total') -> Optional[Dict]:
+        """Over/under quote for one player, or None when the player is unknown.
+
+        Returns { prob_over, prob_under, odds_over_decimal, odds_under_decimal,
+        odds_over_american, odds_under_american }.
+        """
+        if market not in LADDERS:
+            raise ValueError(f"unknown market: {market}")
+        row = self.player_index.get(player_id)
+        if row is None:
+            return None
+        m = self.margin_index.get(int(margin_bps)) if float(margin_bps) == int(margin_bps) else None
+        t = self.threshold_index[market].get(int(threshold)) if float(threshold) == int(threshold) else None
+        if m is not None and t is not None:
+            cell = {f: self.tables[market][f][m, row, t].item() for f in _FIELDS}
+        else:
+            cell = _price_cell(self.params[market][0][row], self.params[market][1][row], threshold, margin_bps)
+        return {
+            'prob_over': float(cell['prob_over']),
+            'prob_under': float(cell['prob_under']),
+            'odds_over_decimal': float(cell['decimal_over']),
+            'odds_under_decimal': float(cell['decimal_under']),
+            'odds_over_american': _american(cell['american_over']),
+            'odds_under_american': _american(cell['american_under']),
+        }
+
+
+def _american(value) -> str:
+    value = int(value)
+    return f"+{value}" if value > 0 else str(value)
+
+
+def _price_cell(mu: float, sigma: float, threshold: float, margin_bps: int) -> Dict:
+    from services.pricing_service import price_ladder  # type: ignore
+    ladder = price_ladder(mu, sigma, float(threshold), margin_bps)
+    return {f: ladder[f].item() for f in _FIELDS}
+
+
+def build_grid(rows: List[Dict], version: int = 0, margins=GRID_MARGINS) -> PriceGrid:
+    """Price every player in `rows` on both ladders at every margin in one pass per ladder."""
+    from services.pricing_service import _player_mu_sigma, first_guess_mu_sigma, price_ladder  # type: ignore
+
+    player_map = {r.get('player_id'): r for r in rows or [] if r.get('player_id') is not None}
+    ids = list(player_map)
+    mu, sigma = _player_mu_sigma(ids, player_map)
+    params = {'total': (mu, sigma), 'first_guess': first_guess_mu_sigma(mu, sigma)}
+    margin_arr = np.asarray(margins, dtype=float)[:, None, None]
+
+    tables = {}
+    for market, thresholds in LADDERS.items():
+        m_mu, m_sigma = params[market]
+        ladder = price_ladder(m_mu[None, :, None], m_sigma[None, :, None],
+                              np.asarray(thresholds, dtype=float)[None, None, :], margin_arr)
+        tables[market] = {
+            f: ladder[f].astype(np.int32) if f.startswith('american') else ladder[f]
+            for f in _FIELDS
+        }
+    return PriceGrid(
+        version=version,
+        player_index={pid: i for i, pid in enumerate(ids)},
+        margin_index={int(m): i for i, m in enumerate(margins)},
+        threshold_index={market: {int(t): i for i, t in enumerate(ts)} for market, ts in LADDERS.items()},
+        params=params,
+        tables=tables,
+    )
+
+
+_grid: Optional[PriceGrid] = None
+_grid_lock = threading.Lock()
+
+
+def get_grid() -> PriceGrid:
+    """Grid for the current geo_players data version; rows are only read when it has to be rebuilt.
+
+    The version comes from geo_repo.current_version, which re-fetches an expired
+    cache entry first, so edits made outside ingest still show up within
+    GEO_CACHE_TTL.
+    """
+    global _grid
+    from database.geo_repo import current_version  # type: ignore
+    version = current_version('geo_players')
+    grid = _grid
+    if grid is not None and grid.version == version:
+        return grid
+    with _grid_lock:
+        if _grid is None or _grid.version != version:
+            from database.geo_repo import get_geo_players  # type: ignore
+            # label with the version read first: rows newer than it only cost one extra rebuild
+            _grid = build_grid(get_geo_players() or [], version)
+        return _grid
+
+
+def quote(player_id: Hashable, threshold: float, margin_bps: int = 700, market: str = 'total') -> Optional[Dict]:
+    """Quote from the current grid (see PriceGrid.quote)."""
+    return get_grid().quote(player_id, threshold, margin_bps, market)
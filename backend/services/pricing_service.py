@@ -1,12 +1,15 @@
 from math import isfinite
 from typing import List, Dict
 import math
-import random
 import numpy as np
+from scipy.special import erf
 
 
 # Use shared odds formatting so decimal <-> american remain consistent with book-favoring rounding
 from utils.odds import decimal_to_american_rounded, format_american_odds, american_to_decimal  # type: ignore
+from utils.odds import decimal_to_american_array, american_to_decimal_array, american_strings  # type: ignore
+# identical concurrent pricing calls share one computation
+from utils.singleflight import singleflight  # type: ignore
 
 
 def normal_cdf(x: float, mu: float, sigma: float) -> float:
@@ -16,6 +19,15 @@ def normal_cdf(x: float, mu: float, sigma: float) -> float:
     z = (x - mu) / (sigma * math.sqrt(2))
     return 0.5 * (1 + math.erf(z))
 
+def normal_cdf_array(x, mu, sigma) -> np.ndarray:
+    """Vectorized normal_cdf; broadcasts x, mu and sigma (sigma <= 0 is a step at mu)."""
+    x = np.asarray(x, dtype=float)
+    mu = np.asarray(mu, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+    safe = np.where(sigma > 0, sigma, 1.0)
+    cdf = 0.5 * (1.0 + erf((x - mu) / (safe * math.sqrt(2))))
+    return np.where(sigma > 0, cdf, (x >= mu).astype(float))
+
 def fit_beta_params(mean: float, var: float, L: float = 5000.0):
     """Fit Beta(a,b) on [0,L] given mean and variance on original scale.
 
@@ -33,125 +45,129 @@ def fit_beta_params(mean: float, var: float, L: float = 5000.0):
     return a, b
 
 
-def price_moneylines(simulations: int = 5000, margin_bps: int = 800):
+def apply_single_vig(prob: float, vig_bps: int) -> float:
+    """Bump one outcome's fair probability by the margin (clamped to [0, 0.9999])."""
+    if prob is None:
+        return 0.0
+    margin = float(vig_bps) / 10000.0
+    adj = prob * (1.0 + margin)
+    return min(max(adj, 0.0), 0.9999)
+
+
+def apply_multi_vig(raw_probs: Dict, margin_bps: int = 800) -> Dict:
+    """Scale an n-way book {outcome: fair prob} so it sums to 1 + margin."""
+    total = sum(raw_probs.values())
+    if total <= 0:
+        return {k: 1.0 / len(raw_probs) for k in raw_probs}
+    scale = (1.0 + (margin_bps / 10000.0)) / total
+    return {k: float(v * scale) for k, v in raw_probs.items()}
+
+
+@singleflight
+def price_moneylines(simulations: int = 5000, margin_bps: int = 800, ctx=None, method: str = 'mc', adaptive: bool = False, max_simulations: int = 400000,
+                     sampler: str = 'pseudo', parallel: bool = None, workers: int = None,
+                     players: List[Dict] = None):
     """Monte Carlo price Moneyline markets (classic, first round, last round).
 
+    Simulations run through the vectorized engine in services.simulation, so
+    100k+ sims fit comfortably inside a request. Draws come from the
+    'moneyline' stream of `ctx` (a SimulationContext; defaults to the
+    process-wide seeded context), so identical inputs give identical odds.
+
+    `method='analytic'` skips sampling and integrates the same round model
+    numerically (services.analytic_pricing); `simulations` is then ignored.
+
+    With `adaptive=True` the Monte Carlo runs in batches of `simulations` until
+    every quoted price is stable to its rounding tier (services.adaptive_mc),
+    capped at `max_simulations`; the result then carries a 'meta' entry with
+    the simulations used.
+
+    `sampler='sobol'` swaps the pseudo-random uniforms for a scrambled Sobol
+    sequence (quasi-Monte Carlo), which reaches a given precision with fewer
+    simulations; see scripts/benchmark_qmc.py.
+
+    A plain pseudo-random run is always cut into the PRICING_SIM_SHARDS shards
+    of services.sim_executor, seeded from the 'moneyline' stream's spawned
+    sequences. `parallel=True` runs those shards on the process pool (`workers`
+    processes, default PRICING_SIM_WORKERS) and otherwise they run in-process,
+    so prices depend on neither the pool nor the worker count;
+    `parallel=None` follows the PRICING_PARALLEL setting.
+
+    `players` prices the given geo_players rows instead of reading the table.
+
     Returns dict with keys 'classic','firstRound','lastRound' each a list of entries
     { player: name, prob: adjusted_prob, american: string, decimal: decimal }
     """
     from database.geo_repo import get_geo_players
+    from services.simulation import build_round_models, simulate_moneyline_counts, sobol_engine, SAMPLERS
+    from services.sim_context import default_context
 
+    if sampler not in SAMPLERS:
+        raise ValueError(f"unknown sampler: {sampler}")
     sims = int(simulations or 5000)
-    players = get_geo_players() or []
+    if players is None:
+        players = get_geo_players() or []
     if not players:
         return {'classic': [], 'firstRound': [], 'lastRound': []}
 
     # build player models
-    models = []
-    for p in players:
-        name = p.get('name') or p.get('screenname') or str(p.get('player_id'))
-        mu = float(p.get('mean_score') or 0.0)
-        sigma = float(p.get('stddev_score') or 0.0)
-        models.append({'player_id': p.get('player_id'), 'name': name, 'mu': mu, 'sigma': sigma})
-
-    n = len(models)
-    classic_wins = {m['player_id']: 0 for m in models}
-    first_wins = {m['player_id']: 0 for m in models}
-    last_wins = {m['player_id']: 0 for m in models}
-
-    # Precompute beta params per-player per-round
-    per_round_params = {}
-    for m in models:
-        mu = m['mu']
-        sigma = m['sigma']
-        # per-round mean and std: follow existing first-guess convention: mu/5, sigma/sqrt(5)
-        round_mu = mu / 5.0
-        round_sigma = sigma / (np.sqrt(5.0) if sigma > 0 else 1.0)
-        var = (round_sigma ** 2) if round_sigma is not None else 0.0
-        a, b = fit_beta_params(round_mu, var, L=5000.0)
-        per_round_params[m['player_id']] = {'a': a, 'b': b, 'p_easy': 0.07, 'p_cat': 0.09}
-
-    # Monte Carlo
-    for it in range(sims):
-        # sample 5 rounds
-        round_scores = [dict() for _ in range(5)]
-        totals = {m['player_id']: 0.0 for m in models}
-        for r in range(5):
-            for m in models:
-                pid = m['player_id']
-                params = per_round_params.get(pid)
-                # categorical draw
-                rr = random.random()
-                if rr < params['p_easy']:
-                    score = random.uniform(4950, 5000)
-                elif rr < params['p_easy'] + params['p_cat']:
-                    score = random.uniform(0, 2000)
-                else:
-                    # normal beta-based sample on [0,5000]
-                    try:
-                        y = np.random.beta(params['a'], params['b'])
-                        score = float(y * 5000.0)
-                        if score > 5000.0:
-                            score = random.uniform(4950, 5000)
-                        score = max(0.0, min(5000.0, score))
-                    except Exception:
-                        score = float(random.uniform(0, 5000))
-                round_scores[r][pid] = score
-                totals[pid] += score
-
-        # determine classic winners (highest total)
-        max_tot = max(totals.values())
-        for pid, val in totals.items():
-            if abs(val - max_tot) < 1e-9:
-                classic_wins[pid] += 1
-
-        # first round winners
-        first_round = round_scores[0]
-        max_first = max(first_round.values())
-        for pid, val in first_round.items():
-            if abs(val - max_first) < 1e-9:
-                first_wins[pid] += 1
-
-        # last round winners
-        last_round = round_scores[-1]
-        max_last = max(last_round.values())
-        for pid, val in last_round.items():
-            if abs(val - max_last) < 1e-9:
-                last_wins[pid] += 1
+    round_models = build_round_models(players)
+    models = [{'player_id': pid, 'name': name} for pid, name in zip(round_models.player_ids, round_models.names)]
+
+    meta = None
+    if method == 'analytic':
+        from services.analytic_pricing import analytic_moneyline_probs
+        probs = analytic_moneyline_probs(round_models)
+    elif method == 'mc':
+        # Monte Carlo: the full (sims x rounds x players) tensor is drawn in batches
+        ctx = ctx or default_context()
+        rng = ctx.stream('moneyline')
+        engine = sobol_engine(round_models, rng=rng) if sampler == 'sobol' else None
+        if adaptive:
+            from services.adaptive_mc import run_adaptive
+            run = run_adaptive(lambda size: simulate_moneyline_counts(round_models, size, rng=rng, inverse=ctx.crn, engine=engine),
+                               scale=1.0 + margin_bps / 10000.0, batch_size=sims, min_sims=sims,
+                               max_sims=max(sims, int(max_simulations)))
+            counts, sims = run['counts'], run['sims']
+            meta = {'simulations': sims, 'converged': run['converged']}
+        else:
+            from services.sim_executor import parallel_moneyline_counts, use_pool
+            if sampler == 'pseudo':
+                counts = parallel_moneyline_counts(round_models, sims, ctx, workers=workers, parallel=use_pool(parallel, sims))
+            else:
+                counts = simulate_moneyline_counts(round_models, sims, rng=rng, inverse=ctx.crn, engine=engine)
+        probs = {k: v / float(sims) for k, v in counts.items()}
+    else:
+        raise ValueError(f"unknown pricing method: {method}")
 
     # compute raw probs
-    classic_raw = {pid: classic_wins[pid] / sims for pid in classic_wins}
-    first_raw = {pid: first_wins[pid] / sims for pid in first_wins}
-    last_raw = {pid: last_wins[pid] / sims for pid in last_wins}
-
-    def apply_multi_vig(raw_probs: dict):
-        total = sum(raw_probs.values())
-        if total <= 0:
-            return {k: 1.0 / len(raw_probs) for k in raw_probs}
-        scale = (1.0 + (margin_bps / 10000.0)) / total
-        return {k: float(v * scale) for k, v in raw_probs.items()}
+    classic_raw = {pid: float(p) for pid, p in zip(round_models.player_ids, probs['classic'])}
+    first_raw = {pid: float(p) for pid, p in zip(round_models.player_ids, probs['firstRound'])}
+    last_raw = {pid: float(p) for pid, p in zip(round_models.player_ids, probs['lastRound'])}
 
-    classic_adj = apply_multi_vig(classic_raw)
-    first_adj = apply_multi_vig(first_raw)
-    last_adj = apply_multi_vig(last_raw)
+    classic_adj = apply_multi_vig(classic_raw, margin_bps)
+    first_adj = apply_multi_vig(first_raw, margin_bps)
+    last_adj = apply_multi_vig(last_raw, margin_bps)
 
     def to_list(adj_probs: dict):
+        probs = np.array([float(adj_probs.get(m['player_id'], 0.0)) for m in models])
+        decimals = prob_to_decimal_array(probs)
+        americans = american_strings(decimal_to_american_array(decimals, prob=probs))
         out = []
-        for m in models:
-            pid = m['player_id']
-            p = float(adj_probs.get(pid, 0.0))
-            d = prob_to_decimal(p)
-            a = decimal_to_american_rounded(d, prob=p)
-            out.append({'player_id': pid, 'player': m['name'], 'prob': p, 'decimal': round(d, 4), 'american': a})
+        for m, p, d, a in zip(models, probs.tolist(), np.round(decimals, 4).tolist(), americans):
+            out.append({'player_id': m['player_id'], 'player': m['name'], 'prob': p, 'decimal': d, 'american': a})
         # sort desc prob
         out.sort(key=lambda x: x['prob'], reverse=True)
         return out
 
-    return {
+    out = {
         'classic': to_list(classic_adj),
         'firstRound': to_list(first_adj),
         'lastRound': to_list(last_adj),
     }
+    if meta is not None:
+        out['meta'] = meta
+    return out
 
 def prob_to_decimal(p: float, floor: float = 1.01, cap: float = None) -> float:
     """Convert probability to decimal odds.
@@ -245,6 +261,94 @@ def apply_margin(prob_over: float, prob_under: float, margin_bps: int = 400):
     return p_over_adj, p_under_adj
 
 
+def apply_margin_array(prob_over, prob_under, margin_bps: int = 400):
+    """Vectorized apply_margin (same +125 bps bump when either side is under 5%)."""
+    prob_over = np.asarray(prob_over, dtype=float)
+    prob_under = np.asarray(prob_under, dtype=float)
+    bps = np.where((prob_over < 0.05) | (prob_under < 0.05), margin_bps + 125, margin_bps)
+    margin = bps / 10000.0
+    cap = 0.9999
+    return np.minimum(prob_over * (1.0 + margin), cap), np.minimum(prob_under * (1.0 + margin), cap)
+
+
+def prob_to_decimal_array(p) -> np.ndarray:
+    """Vectorized prob_to_decimal with the default probability-aware floor."""
+    p = np.asarray(p, dtype=float)
+    floor = np.where(p > 0.5, np.where(p > 0.9995, 1.0005, 1.0), 1.01)
+    with np.errstate(divide='ignore'):
+        odds = np.where(p > 0, 1.0 / np.where(p > 0, p, 1.0), np.inf)
+    return np.maximum(floor, odds)
+
+
+def price_ladder(mu, sigma, thresholds, margin_bps: int) -> Dict[str, np.ndarray]:
+    """Price an over/under threshold ladder in one vectorized pass.
+
+    mu, sigma and thresholds broadcast against each other, so a full board is
+    `price_ladder(mu[:, None], sigma[:, None], thresholds[None, :], bps)`.
+    A NaN mu marks a player without stats and prices 50/50.
+
+    Returns arrays keyed: prob_over/prob_under (margin-adjusted),
+    decimal_over/decimal_under (raw from prob), american_over/american_under
+    (rounded ints) and rounded_decimal_over/rounded_decimal_under (decimal
+    implied by the rounded American price).
+    """
+    mu = np.asarray(mu, dtype=float)
+    cdf = normal_cdf_array(thresholds, np.nan_to_num(mu), sigma)
+    p_over = np.where(np.isnan(mu), 0.5, np.maximum(0.0, 1.0 - cdf))
+    p_under = 1.0 - p_over
+    over_adj, under_adj = apply_margin_array(p_over, p_under, margin_bps)
+
+    d_over = prob_to_decimal_array(over_adj)
+    d_under = prob_to_decimal_array(under_adj)
+    a_over = decimal_to_american_array(d_over, prob=over_adj)
+    a_under = decimal_to_american_array(d_under, prob=under_adj)
+    return {
+        'prob_over': over_adj,
+        'prob_under': under_adj,
+        'decimal_over': d_over,
+        'decimal_under': d_under,
+        'american_over': a_over,
+        'american_under': a_under,
+        'rounded_decimal_over': american_to_decimal_array(a_over),
+        'rounded_decimal_under': american_to_decimal_array(a_under),
+    }
+
+
+def _ladder_entries(ladder: Dict[str, np.ndarray], thresholds: List, row: int) -> Dict:
+    """Unpack one player's row of a price_ladder board into {threshold: entry} dicts."""
+    prob_over = ladder['prob_over'][row].tolist()
+    prob_under = ladder['prob_under'][row].tolist()
+    dec_over = ladder['rounded_decimal_over'][row].tolist()
+    dec_under = ladder['rounded_decimal_under'][row].tolist()
+    am_over = american_strings(ladder['american_over'][row])
+    am_under = american_strings(ladder['american_under'][row])
+    return {
+        t: {
+            'prob_over': prob_over[i],
+            'prob_under': prob_under[i],
+            'odds_over_decimal': dec_over[i],
+            'odds_under_decimal': dec_under[i],
+            'odds_over_american': am_over[i],
+            'odds_under_american': am_under[i],
+        }
+        for i, t in enumerate(thresholds)
+    }
+
+
+def _player_mu_sigma(player_ids: List, player_map: Dict):
+    """Aligned (mu, sigma) arrays for player_ids; mu is NaN when stats are missing."""
+    mu = np.full(len(player_ids), np.nan)
+    sigma = np.zeros(len(player_ids))
+    for i, pid in enumerate(player_ids):
+        row = player_map.get(pid)
+        if not row or row.get('mean_score') is None:
+            continue
+        mu[i] = float(row.get('mean_score'))
+        sigma[i] = float(row.get('stddev_score') or 0.0)
+    return mu, sigma
+
+
+@singleflight
 def price_for_thresholds(player_ids: List[int], thresholds: List[int], model: str = 'normal', margin_bps: int = 440) -> Dict:
     """
     Compute pricing for given player IDs and thresholds using Supabase geo_players table.
@@ -265,60 +369,27 @@ def price_for_thresholds(player_ids: List[int], thresholds: List[int], model: st
     """
     from database.geo_repo import get_geo_players
     margin_bps = margin_bps + 200
-    
-    results = {}
+
     all_players = get_geo_players()
     player_map = {p.get('player_id'): p for p in all_players}
-    
-    for pid in player_ids:
-        results[pid] = {}
-        player_data = player_map.get(pid)
-        
-        for t in thresholds:
-            if not player_data or player_data.get('mean_score') is None:
-                # No stats available, default to 50/50
-                p_over = 0.5
-            else:
-                mu = float(player_data.get('mean_score', 0))
-                sigma = float(player_data.get('stddev_score', 0)) or 0.0
-                # P(score >= threshold) = 1 - CDF(threshold)
-                cdf = normal_cdf(t, mu, sigma)
-                p_over = max(0.0, 1.0 - cdf)
-            
-            p_under = 1.0 - p_over
-            p_over_adj, p_under_adj = apply_margin(p_over, p_under, margin_bps)
-            # compute raw decimal from prob, then convert -> american -> round -> recompute decimal
-            d_over_raw = prob_to_decimal(p_over_adj)
-            d_under_raw = prob_to_decimal(p_under_adj)
-
-            # compute rounded american and decimal consistent with rounded american
-            odds_over_american_str = decimal_to_american_rounded(d_over_raw, prob=p_over_adj)
-            # parse rounded american to int and compute decimal from rounded american
-            try:
-                over_a_int = int(str(odds_over_american_str).replace('+', ''))
-            except Exception:
-                over_a_int = None
-            odds_over_decimal = american_to_decimal(over_a_int) if over_a_int is not None else d_over_raw
-
-            odds_under_american_str = decimal_to_american_rounded(d_under_raw, prob=p_under_adj)
-            try:
-                under_a_int = int(str(odds_under_american_str).replace('+', ''))
-            except Exception:
-                under_a_int = None
-            odds_under_decimal = american_to_decimal(under_a_int) if under_a_int is not None else d_under_raw
-
-            results[pid][t] = {
-                'prob_over': p_over_adj,
-                'prob_under': p_under_adj,
-                'odds_over_decimal': odds_over_decimal,
-                'odds_under_decimal': odds_under_decimal,
-                'odds_over_american': odds_over_american_str,
-                'odds_under_american': odds_under_american_str,
-            }
-    
-    return results
+    mu, sigma = _player_mu_sigma(player_ids, player_map)
+
+    # P(score >= threshold) = 1 - CDF(threshold), priced for the whole board at once
+    ladder = price_ladder(mu[:, None], sigma[:, None], np.asarray(thresholds, dtype=float)[None, :], margin_bps)
+    return {pid: _ladder_entries(ladder, thresholds, i) for i, pid in enumerate(player_ids)}
 
 
+def first_guess_mu_sigma(mu, sigma):
+    """Scale game mean/stddev arrays to the first round: mean/5, sd/sqrt(5)."""
+    mu_fg = np.asarray(mu, dtype=float) / 5.0
+    sigma_fg = np.where(np.asarray(sigma) > 0, np.asarray(sigma, dtype=float) / math.sqrt(5.0), 0.0)
+    # avoid degenerate zero-variance which produces step-function CDFs:
+    # fall back to a small but reasonable sigma relative to the mean
+    sigma_fg = np.where(sigma_fg <= 0.0, np.maximum(1.0, np.abs(np.nan_to_num(mu_fg)) * 0.05), sigma_fg)
+    return mu_fg, sigma_fg
+
+
+@singleflight
 def price_first_guess_thresholds(player_ids: List[int], thresholds: List[int] = None, model: str = 'normal', margin_bps: int = 700) -> Dict:
     """
     Price the "First Guess" market (first round points) for given players.
@@ -337,61 +408,75 @@ def price_first_guess_thresholds(player_ids: List[int], thresholds: List[int] =
     if thresholds is None:
         thresholds = list(range(1700, 4701, 300))
 
-    results = {}
     all_players = get_geo_players()
     player_map = {p.get('player_id'): p for p in all_players}
+    mu, sigma = _player_mu_sigma(player_ids, player_map)
 
-    for pid in player_ids:
-        results[pid] = {}
-        player_data = player_map.get(pid)
+    mu_fg, sigma_fg = first_guess_mu_sigma(mu, sigma)
+    ladder = price_ladder(mu_fg[:, None], sigma_fg[:, None], np.asarray(thresholds, dtype=float)[None, :], margin_bps)
+    return {pid: _ladder_entries(ladder, thresholds, i) for i, pid in enumerate(player_ids)}
 
-        for t in thresholds:
-            if not player_data or player_data.get('mean_score') is None:
-                p_over = 0.5
-            else:
-                mu = float(player_data.get('mean_score', 0))
-                sigma = float(player_data.get('stddev_score', 0)) or 0.0
-                # scale to first-round: assume 5 samples -> mean/5, sd/sqrt(5)
-                mu_fg = mu / 5.0
-                sigma_fg = sigma / math.sqrt(5.0) if sigma > 0 else 0.0
-                # avoid degenerate zero-variance which produces step-function CDFs
-                if sigma_fg <= 0.0:
-                    # fallback to a small but reasonable sigma relative to the mean
-                    sigma_fg = max(1.0, abs(mu_fg) * 0.05)
-                cdf = normal_cdf(t, mu_fg, sigma_fg)
-                p_over = max(0.0, 1.0 - cdf)
-
-            p_under = 1.0 - p_over
-            p_over_adj, p_under_adj = apply_margin(p_over, p_under, margin_bps)
-            d_over_raw = prob_to_decimal(p_over_adj)
-            d_under_raw = prob_to_decimal(p_under_adj)
-
-            odds_over_american_str = decimal_to_american_rounded(d_over_raw, prob=p_over_adj)
-            try:
-                over_a_int = int(str(odds_over_american_str).replace('+', ''))
-            except Exception:
-                over_a_int = None
-            odds_over_decimal = american_to_decimal(over_a_int) if over_a_int is not None else d_over_raw
-
-            odds_under_american_str = decimal_to_american_rounded(d_under_raw, prob=p_under_adj)
-            try:
-                under_a_int = int(str(odds_under_american_str).replace('+', ''))
-            except Exception:
-                under_a_int = None
-            odds_under_decimal = american_to_decimal(under_a_int) if under_a_int is not None else d_under_raw
-
-            results[pid][t] = {
-                'prob_over': p_over_adj,
-                'prob_under': p_under_adj,
-                'odds_over_decimal': odds_over_decimal,
-                'odds_under_decimal': odds_under_decimal,
-                'odds_over_american': odds_over_american_str,
-                'odds_under_american': odds_under_american_str,
-            }
 
-    return results
+def geoguessr_totals_board(rows: List[Dict], margin_bps: int = 500) -> Dict:
+    """Default GeoGuessr totals board: each player's threshold ladder and the line nearest their mean.
+
+    The default threshold is the multiple of 500 closest to the mean, clamped to
+    the 7500-23000 ladder. Returns { 'thresholds': [...], 'players': [ { player_id,
+    name, screenname, mean_score, stddev_score, default_threshold, initial: {...} } ] }.
+    """
+    thresholds = list(range(7500, 23001, 500))
+    players = []
+    for r in rows or []:
+        pid = int(r.get('player_id') or 0)
+        name = r.get('name', '')
+        screen = r.get('screenname', '')
+        mu = float(r.get('mean_score') or 0) if r.get('mean_score') is not None else None
+        sigma = float(r.get('stddev_score') or 0) if r.get('stddev_score') is not None else 0.0
+
+        # Guard against degenerate sigma (0 or very small) which causes step-function CDFs
+        if sigma <= 0:
+            sigma = max(1.0, abs(mu or 0) * 0.05) if mu else 1.0
+
+        # default threshold = nearest multiple of 500 to mean
+        if mu is None:
+            default_thresh = 10000
+        else:
+            default_thresh = int(round(mu / 500.0) * 500)
+            default_thresh = max(min(default_thresh, thresholds[-1]), thresholds[0])
+
+        if mu is None:
+            p_over = 0.5
+        else:
+            cdf = normal_cdf(default_thresh, mu, sigma)
+            p_over = max(0.0, 1.0 - cdf)
+        p_under = 1.0 - p_over
+        p_over_adj, p_under_adj = apply_margin(p_over, p_under, margin_bps=margin_bps)
+        d_over = prob_to_decimal(p_over_adj)
+        d_under = prob_to_decimal(p_under_adj)
+        a_over = decimal_to_american(d_over, prob=p_over_adj)
+        a_under = decimal_to_american(d_under, prob=p_under_adj)
+
+        players.append({
+            'player_id': pid,
+            'name': name,
+            'screenname': screen,
+            'mean_score': mu,
+            'stddev_score': sigma,
+            'default_threshold': default_thresh,
+            'initial': {
+                'threshold': default_thresh,
+                'prob_over': float(p_over_adj),
+                'prob_under': float(p_under_adj),
+                'odds_over_decimal': float(d_over),
+                'odds_under_decimal': float(d_under),
+                'odds_over_american': str(a_over),
+                'odds_under_american': str(a_under),
+            }
+        })
+    return {'thresholds': thresholds, 'players': players}
 
 
+@singleflight
 def price_country_props(threshold_rounds: int = 5, margin_bps: int = 700) -> Dict:
     """
     Price the Country Props 'To Appear' market.
@@ -416,79 +501,60 @@ def price_country_props(threshold_rounds: int = 5, margin_bps: int = 700) -> Dic
         print(f"✗ Failed to retrieve countries from DB: {e}")
         return {}
 
+    rows = []
+    freqs = []
     for c in countries:
+        freq_pct = c.get('freq')
+        # parse freq as float percent (e.g., 2.4 -> 0.024); malformed values count as 0
         try:
-            cid = c.get('id')
-            name = c.get('country')
-            freq_pct = c.get('freq')
-
-            # parse freq as float percent (e.g., 2.4 -> 0.024)
-            if freq_pct is None:
-                p = 0.0
-            else:
-                try:
-                    p = float(freq_pct) / 100.0
-                except Exception:
-                    # malformed freq value, skip this row
-                    p = 0.0
-
-            # guard p range
-            p = max(0.0, min(1.0, p))
-
-            # per-game probabilities for 'appears at least once in threshold_rounds rounds'
-            prob_no = (1.0 - p) ** threshold_rounds
-            prob_yes = 1.0 - prob_no
-
-            # apply vig (bump probabilities)
-            prob_yes_adj, prob_no_adj = apply_margin(prob_yes, prob_no, margin_bps)
-
-            # ensure numeric
-            prob_yes_adj = float(prob_yes_adj or 0.0)
-            prob_no_adj = float(prob_no_adj or 0.0)
-
-            d_yes_raw = prob_to_decimal(prob_yes_adj)
-            d_no_raw = prob_to_decimal(prob_no_adj)
-
-            odds_yes_american_str = decimal_to_american_rounded(d_yes_raw, prob=prob_yes_adj)
-            try:
-                yes_a_int = int(str(odds_yes_american_str).replace('+', ''))
-            except Exception:
-                yes_a_int = None
-            odds_yes_decimal = american_to_decimal(yes_a_int) if yes_a_int is not None else d_yes_raw
-
-            odds_no_american_str = decimal_to_american_rounded(d_no_raw, prob=prob_no_adj)
-            try:
-                no_a_int = int(str(odds_no_american_str).replace('+', ''))
-            except Exception:
-                no_a_int = None
-            odds_no_decimal = american_to_decimal(no_a_int) if no_a_int is not None else d_no_raw
-
-            # Lock countries with freq < 0.72
-            is_locked = False
-            
-            # Floor odds greater than +3000 to +3000 (decimal 31.0)
-            if yes_a_int is not None and yes_a_int > 3500:
-                odds_yes_american_str = '+3500'
-                odds_yes_decimal = 36.0
-            if no_a_int is not None and no_a_int > 3500:
-                odds_no_american_str = '+3500'
-                odds_no_decimal = 36.0
-            
-            results[cid] = {
-                'country_id': cid,
-                'country': name,
-                'freq_pct': freq_pct,
-                'prob_yes': prob_yes_adj,
-                'prob_no': prob_no_adj,
-                'odds_yes_decimal': odds_yes_decimal,
-                'odds_no_decimal': odds_no_decimal,
-                'odds_yes_american': odds_yes_american_str,
-                'odds_no_american': odds_no_american_str,
-                'lock': is_locked,
-            }
+            p = float(freq_pct) / 100.0 if freq_pct is not None else 0.0
         except Exception:
-            # skip problematic country row but continue processing others
-            continue
+            p = 0.0
+        if not isfinite(p):
+            p = 0.0
+        rows.append(c)
+        freqs.append(p)
+    if not rows:
+        return results
+
+    # guard p range
+    p = np.clip(np.asarray(freqs, dtype=float), 0.0, 1.0)
+
+    # per-game probabilities for 'appears at least once in threshold_rounds rounds'
+    prob_no = (1.0 - p) ** threshold_rounds
+    prob_yes = 1.0 - prob_no
+
+    # apply vig (bump probabilities) and convert the whole board at once
+    prob_yes_adj, prob_no_adj = apply_margin_array(prob_yes, prob_no, margin_bps)
+    yes_a = decimal_to_american_array(prob_to_decimal_array(prob_yes_adj), prob=prob_yes_adj)
+    no_a = decimal_to_american_array(prob_to_decimal_array(prob_no_adj), prob=prob_no_adj)
+
+    # Floor odds greater than +3500 to +3500 (decimal 36.0)
+    yes_a = np.minimum(yes_a, 3500)
+    no_a = np.minimum(no_a, 3500)
+    yes_dec = american_to_decimal_array(yes_a).tolist()
+    no_dec = american_to_decimal_array(no_a).tolist()
+    yes_str = american_strings(yes_a)
+    no_str = american_strings(no_a)
+    yes_probs = prob_yes_adj.tolist()
+    no_probs = prob_no_adj.tolist()
+
+    for i, c in enumerate(rows):
+        cid = c.get('id')
+        # Lock countries with freq < 0.72
+        is_locked = False
+        results[cid] = {
+            'country_id': cid,
+            'country': c.get('country'),
+            'freq_pct': c.get('freq'),
+            'prob_yes': yes_probs[i],
+            'prob_no': no_probs[i],
+            'odds_yes_decimal': yes_dec[i],
+            'odds_no_decimal': no_dec[i],
+            'odds_yes_american': yes_str[i],
+            'odds_no_american': no_str[i],
+            'lock': is_locked,
+        }
 
     return results
 
@@ -510,48 +576,11 @@ def recompute_all_lines_supabase(thresholds: List[int] = None, margin_bps: int =
         thresholds = list(range(7500, 23001, 500))
     
     all_players = get_geo_players()
-    results = {}
-    
-    for player in all_players:
-        pid = player.get('player_id')
-        mu = float(player.get('mean_score')) if player.get('mean_score') is not None else None
-        sigma = float(player.get('stddev_score')) if player.get('stddev_score') is not None else 0.0
-        
-        results[pid] = {}
-        
-        for t in thresholds:
-            if mu is None:
-                p_over = 0.5
-            else:
-                cdf = normal_cdf(t, mu, sigma)
-                p_over = max(0.0, 1.0 - cdf)
-            
-            p_under = 1.0 - p_over
-            p_over_adj, p_under_adj = apply_margin(p_over, p_under, margin_bps)
-            d_over_raw = prob_to_decimal(p_over_adj)
-            d_under_raw = prob_to_decimal(p_under_adj)
-            a_over = decimal_to_american_rounded(d_over_raw, prob=p_over_adj)
-            try:
-                a_over_int = int(str(a_over).replace('+', ''))
-            except Exception:
-                a_over_int = None
-            odds_over_decimal = american_to_decimal(a_over_int) if a_over_int is not None else d_over_raw
-
-            a_under = decimal_to_american_rounded(d_under_raw, prob=p_under_adj)
-            try:
-                a_under_int = int(str(a_under).replace('+', ''))
-            except Exception:
-                a_under_int = None
-            odds_under_decimal = american_to_decimal(a_under_int) if a_under_int is not None else d_under_raw
-
-            results[pid][t] = {
-                'prob_over': p_over_adj,
-                'prob_under': p_under_adj,
-                'odds_over_decimal': odds_over_decimal,
-                'odds_under_decimal': odds_under_decimal,
-                'odds_over_american': a_over,
-                'odds_under_american': a_under,
-            }
+    player_ids = [p.get('player_id') for p in all_players]
+    mu, sigma = _player_mu_sigma(player_ids, {p.get('player_id'): p for p in all_players})
+
+    ladder = price_ladder(mu[:, None], sigma[:, None], np.asarray(thresholds, dtype=float)[None, :], margin_bps)
+    results = {pid: _ladder_entries(ladder, thresholds, i) for i, pid in enumerate(player_ids)}
     
     # Note: Persistence to Supabase lines table would require creating that table first.
     # For now, we return the computed results without persisting.
@@ -661,56 +690,78 @@ def get_continent_probs(rounds: int = 5) -> List[Dict]:
     return out
 
 
+@singleflight
 def continent_markets(rounds: int = 5, hooks: List[float] = None, margin_bps: int = 850, max_decimal_odds: float = 100.0) -> Dict:
     """Build continent over/under markets priced by binomial model.
 
-    Returns dict: { 'config': { rounds }, 'continents': [ { name, p, hooks: [ {hook, overProb, underProb, overDecimal, underDecimal, overAmerican, underAmerican} ] } ] }
+    Returns dict: { 'config': { rounds }, 'continents': [ { name, p, hooks: [ {hook, overProb, underProb, overDecimal, underDecimal, overAmerican, underAmerican} ] } ],
+                    'sequences': [ { key, name, fairProb, prob, oddsDecimal, oddsAmerican } ] }
     """
     if hooks is None:
         hooks = [0.5, 1.5, 2.5, 3.5]
 
     conts = get_continent_probs(rounds=rounds)
     if not conts:
-        return {'config': {'rounds': rounds}, 'continents': []}
+        return {'config': {'rounds': rounds}, 'continents': [], 'sequences': []}
 
-    continents_out = []
-    for entry in conts:
-        name = entry.get('continent')
+    # (continent x hook) matrix of binomial tail probabilities
+    over = np.zeros((len(conts), len(hooks)))
+    under = np.zeros((len(conts), len(hooks)))
+    for i, entry in enumerate(conts):
         p = float(entry.get('p', 0.0))
-        hooks_out = []
-        for h in hooks:
+        for j, h in enumerate(hooks):
             probs = binomial_tail_probs(rounds, p, h)
-            over = float(probs.get('over', 0.0))
-            under = float(probs.get('under', 0.0))
-            # apply margin bump consistently (re-use apply_margin)
-            over_adj, under_adj = apply_margin(over, under, margin_bps)
-
-            # compute decimals
-            dol = prob_to_decimal(over_adj)
-            dul = prob_to_decimal(under_adj)
-            # cap decimal odds
-            dol = min(dol, max_decimal_odds)
-            dul = min(dul, max_decimal_odds)
-
-            # convert to american using existing helper
-            a_over = decimal_to_american_rounded(dol, prob=over_adj)
-            a_under = decimal_to_american_rounded(dul, prob=under_adj)
+            over[i, j] = float(probs.get('over', 0.0))
+            under[i, j] = float(probs.get('under', 0.0))
+
+    # apply margin bump consistently, then convert every price in one pass
+    over_adj, under_adj = apply_margin_array(over, under, margin_bps)
+    # cap decimal odds
+    dol = np.minimum(prob_to_decimal_array(over_adj), max_decimal_odds)
+    dul = np.minimum(prob_to_decimal_array(under_adj), max_decimal_odds)
+    a_over = decimal_to_american_array(dol, prob=over_adj)
+    a_under = decimal_to_american_array(dul, prob=under_adj)
 
+    continents_out = []
+    for i, entry in enumerate(conts):
+        a_over_row = american_strings(a_over[i])
+        a_under_row = american_strings(a_under[i])
+        hooks_out = []
+        for j, h in enumerate(hooks):
             hooks_out.append({
                 'hook': h,
-                'overProb': over_adj,
-                'underProb': under_adj,
-                'overOddsDecimal': round(dol, 4),
-                'underOddsDecimal': round(dul, 4),
-                'overOddsAmerican': a_over,
-                'underOddsAmerican': a_under,
+                'overProb': float(over_adj[i, j]),
+                'underProb': float(under_adj[i, j]),
+                'overOddsDecimal': round(float(dol[i, j]), 4),
+                'underOddsDecimal': round(float(dul[i, j]), 4),
+                'overOddsAmerican': a_over_row[j],
+                'underOddsAmerican': a_under_row[j],
             })
 
-        continents_out.append({'name': name, 'p': p, 'freq': entry.get('freq'), 'hooks': hooks_out})
+        continents_out.append({'name': entry.get('continent'), 'p': float(entry.get('p', 0.0)), 'freq': entry.get('freq'), 'hooks': hooks_out})
+
+    # order-dependent specials (back-to-back, runs, "no X until round 4"), exact by DP
+    from services.sequence_pricing import sequence_markets
+    sequences = sequence_markets(conts, rounds=rounds, margin_bps=margin_bps, max_decimal_odds=max_decimal_odds)
+
+    return {'config': {'rounds': rounds}, 'continents': continents_out, 'sequences': sequences}
+
 
-    return {'config': {'rounds': rounds}, 'continents': continents_out}
+def zetamac_hook_list(mean: float, std_dev: float, hooks: List[float] = None) -> List[float]:
+    """Zetamac hooks from mean-2σ to mean+2σ in 0.5 steps (or the requested hooks inside that range)."""
+    min_hook = max(0.0, math.floor((mean - 2 * std_dev) * 2) / 2.0)
+    max_hook = math.ceil((mean + 2 * std_dev) * 2) / 2.0
+    if hooks:
+        return [h for h in hooks if min_hook <= h <= max_hook]
+    hook_list = []
+    current = min_hook
+    while current <= max_hook:
+        hook_list.append(current)
+        current += 0.5
+    return hook_list
 
 
+@singleflight
 def price_zetamac_totals(player_ids: List[int] = None, hooks: List[float] = None, margin_bps: int = 700) -> Dict:
     """Price Zetamac totals using normal CDF.
     
@@ -734,7 +785,8 @@ def price_zetamac_totals(player_ids: List[int] = None, hooks: List[float] = None
     if not players:
         return {'players': []}
     
-    players_out = []
+    # collect every player's hook list, then price all hooks in one ladder call
+    specs = []
     for p in players:
         player_id = p.get('player_id')
         name = p.get('name') or f'Player {player_id}'
@@ -744,48 +796,36 @@ def price_zetamac_totals(player_ids: List[int] = None, hooks: List[float] = None
         
         # Center hook: round mean to nearest 0.5
         center_hook = round(mean * 2) / 2.0
-        
-        # Generate hooks: mean-2σ to mean+2σ, 0.5 steps
-        min_hook = max(0.0, math.floor((mean - 2 * std_dev) * 2) / 2.0)
-        max_hook = math.ceil((mean + 2 * std_dev) * 2) / 2.0
-        
-        # If specific hooks requested, filter to that range
-        if hooks:
-            hook_list = [h for h in hooks if min_hook <= h <= max_hook]
-        else:
-            # Generate all 0.5 steps from min to max
-            hook_list = []
-            current = min_hook
-            while current <= max_hook:
-                hook_list.append(current)
-                current += 0.5
-        
+        hook_list = zetamac_hook_list(mean, std_dev, hooks)
+        specs.append((player_id, name, mean, std_dev, lock, center_hook, hook_list))
+
+    flat_mu = np.concatenate([np.full(len(sp[6]), sp[2]) for sp in specs]) if specs else np.zeros(0)
+    flat_sigma = np.concatenate([np.full(len(sp[6]), sp[3]) for sp in specs]) if specs else np.zeros(0)
+    flat_hooks = np.concatenate([np.asarray(sp[6], dtype=float) for sp in specs]) if specs else np.zeros(0)
+    # P(X > hook) using normal CDF, with margin applied (700 bps default)
+    ladder = price_ladder(flat_mu, flat_sigma, flat_hooks, margin_bps)
+    over_prob = ladder['prob_over'].tolist()
+    under_prob = ladder['prob_under'].tolist()
+    over_decimal = np.round(ladder['decimal_over'], 4).tolist()
+    under_decimal = np.round(ladder['decimal_under'], 4).tolist()
+    over_american = american_strings(ladder['american_over'])
+    under_american = american_strings(ladder['american_under'])
+
+    players_out = []
+    offset = 0
+    for player_id, name, mean, std_dev, lock, center_hook, hook_list in specs:
         hooks_out = []
-        for hook in hook_list:
-            # P(X > hook) using normal CDF
-            over_prob = 1.0 - normal_cdf(hook, mean, std_dev)
-            under_prob = normal_cdf(hook, mean, std_dev)
-            
-            # Apply margin (700 bps)
-            over_adj, under_adj = apply_margin(over_prob, under_prob, margin_bps)
-            
-            # Convert to decimal odds
-            over_decimal = prob_to_decimal(over_adj)
-            under_decimal = prob_to_decimal(under_adj)
-            
-            # Convert to American odds
-            over_american = decimal_to_american_rounded(over_decimal, prob=over_adj)
-            under_american = decimal_to_american_rounded(under_decimal, prob=under_adj)
-            
+        for i, hook in enumerate(hook_list, start=offset):
             hooks_out.append({
                 'hook': hook,
-                'over_prob': over_adj,
-                'under_prob': under_adj,
-                'over_decimal': round(over_decimal, 4),
-                'under_decimal': round(under_decimal, 4),
-                'over_american': over_american,
-                'under_american': under_american,
+                'over_prob': over_prob[i],
+                'under_prob': under_prob[i],
+                'over_decimal': over_decimal[i],
+                'under_decimal': under_decimal[i],
+                'over_american': over_american[i],
+                'under_american': under_american[i],
             })
+        offset += len(hook_list)
         
         players_out.append({
             'player_id': player_id,
@@ -801,20 +841,20 @@ def price_zetamac_totals(player_ids: List[int] = None, hooks: List[float] = None
     return {'players': players_out}
 
 
+@singleflight
 def price_zetamac_moneylines(margin_bps: int = 700) -> Dict:
     """Price Zetamac moneylines (head-to-head matchups).
     
-    Generates N-choose-2 matchups using normal distribution superiority formula:
-    P(X > Y) = Φ((μ_X - μ_Y) / √(σ_X² + σ_Y²))
-    
-    Applies 7% vig (700 bps default) and converts to American odds.
+    All N-choose-2 matchups are read from one superiority matrix
+    P(X > Y) = Φ((μ_X - μ_Y) / √(σ_X² + σ_Y²)) built in services.matchups,
+    with the margin (700 bps default) and odds conversion applied in bulk.
     
     Returns: { 'matchups': [ { player1_id, player1_name, player2_id, player2_name, 
                                 player1_prob, player2_prob, player1_decimal, player2_decimal,
                                 player1_american, player2_american } ] }
     """
     from database.geo_repo import get_supabase_client
-    from itertools import combinations
+    from services.matchups import zetamac_matchups
     
     client = get_supabase_client()
     
@@ -824,61 +864,26 @@ def price_zetamac_moneylines(margin_bps: int = 700) -> Dict:
     
     if len(players) < 2:
         return {'matchups': []}
-    
-    matchups = []
-    
-    # Generate all N-choose-2 combinations
-    for p1, p2 in combinations(players, 2):
-        p1_id = p1.get('player_id')
-        p1_name = p1.get('name') or f'Player {p1_id}'
-        p1_mean = float(p1.get('mean') or 0.0)
-        p1_std = float(p1.get('std_dev') or 1.0)
-        
-        p2_id = p2.get('player_id')
-        p2_name = p2.get('name') or f'Player {p2_id}'
-        p2_mean = float(p2.get('mean') or 0.0)
-        p2_std = float(p2.get('std_dev') or 1.0)
-        
-        # Calculate P(X > Y) using normal distribution superiority formula
-        # P(X > Y) = Φ((μ_X - μ_Y) / √(σ_X² + σ_Y²))
-        mean_diff = p1_mean - p2_mean
-        combined_variance = (p1_std ** 2) + (p2_std ** 2)
-        
-        if combined_variance <= 0:
-            # Degenerate case: use 50/50
-            p1_prob = 0.5
-        else:
-            combined_std = math.sqrt(combined_variance)
-            # P(p1 > p2) = Φ(mean_diff / combined_std)
-            # Using standard normal CDF at z = mean_diff / combined_std
-            z = mean_diff / combined_std
-            p1_prob = normal_cdf(0, -z, 1.0)  # Φ(z) = CDF(0; μ=-z, σ=1)
-        
-        p2_prob = 1.0 - p1_prob
-        
-        # Apply margin (bump probabilities)
-        p1_adj, p2_adj = apply_margin(p1_prob, p2_prob, margin_bps)
-        
-        # Convert to decimal odds
-        p1_decimal = prob_to_decimal(p1_adj)
-        p2_decimal = prob_to_decimal(p2_adj)
-        
-        # Convert to American odds
-        p1_american = decimal_to_american_rounded(p1_decimal, prob=p1_adj)
-        p2_american = decimal_to_american_rounded(p2_decimal, prob=p2_adj)
-        
-        matchups.append({
-            'player1_id': p1_id,
-            'player1_name': p1_name,
-            'player2_id': p2_id,
-            'player2_name': p2_name,
-            'player1_prob': p1_adj,
-            'player2_prob': p2_adj,
-            'player1_decimal': round(p1_decimal, 4),
-            'player2_decimal': round(p2_decimal, 4),
-            'player1_american': p1_american,
-            'player2_american': p2_american,
-        })
-    
-    return {'matchups': matchups}
+    return zetamac_matchups(players, margin_bps=margin_bps)
+
+
+@singleflight
+def price_zetamac_outright(margin_bps: int = 700, include_locked: bool = False) -> Dict:
+    """Price the Zetamac outright winner market over all zetamac_players.
+
+    P(i is max) = ∫φ_i(x)∏Φ_j(x)dx by Gauss-Hermite quadrature (services.matchups),
+    with the multi-way margin applied like price_moneylines. Locked players are
+    left out of the offer but still count in the book.
 
+    Returns: { 'config': {...}, 'players': [ { player_id, name, mean, std_dev, lock,
+               fair_prob, prob, decimal, american } ] }
+    """
+    from database.geo_repo import get_supabase_client
+    from services.matchups import zetamac_outright
+
+    client = get_supabase_client()
+    res = client.table('zetamac_players').select('player_id,name,mean,std_dev,lock').execute()
+    players = res.data or []
+    if not players:
+        return {'players': []}
+    return zetamac_outright(players, margin_bps=margin_bps, include_locked=include_locked)
@@ -0,0 +1,230 @@
+"""Incremental, dependency-tracked repricing of the player-driven board.
+
+Without this, a stats edit to one geo_players or zetamac_players row reprices
+everything: every threshold of every player, all N-choose-2 zetamac matchups
+and the full moneyline Monte Carlo. The Repricer keeps the last priced board
+together with the player rows that every market key depends on:
+
+  ('geo_total', pid, threshold)        <- geo_players[pid]
+  ('geo_first_guess', pid, threshold)  <- geo_players[pid]
+  ('geo_moneyline', market, pid)       <- every geo player in the book
+  ('zetamac_total', pid, hook)         <- zetamac_players[pid]
+  ('zetamac_h2h', pid1, pid2)          <- zetamac_players[pid1], [pid2]
+
+When a table is synced (or one row is merged in with update), only the rows
+whose pricing inputs changed are treated as dirty. Their ladders and their matchups are recomputed, and so are the
+winner books they appear in. Keys a dirty player no longer produces (a removed
+player, a hook range that shrank) are dropped. The result is a diff of the
+quotes that actually changed, ready to push to clients.
+
+Moneylines are the board /api/moneylines/prices serves: price_moneylines at
+MONEYLINE_SIMULATIONS seeded simulations and MONEYLINE_MARGIN_BPS, priced from
+the repricer's rows. Its before/after are therefore the served prices. As with
+any seeded Monte Carlo board, an edit to one player can also move the others
+by sampling error.
+"""
+import threading
+from itertools import combinations
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+LINE_THRESHOLDS = list(range(7500, 23001, 500))
+FIRST_GUESS_THRESHOLDS = list(range(1700, 4701, 300))
+# /api/pricing/lines at marginBps 0 (the route and price_for_thresholds each add 200)
+LINE_MARGIN_BPS = 400
+FIRST_GUESS_MARGIN_BPS = 700
+# /api/moneylines/prices default board
+MONEYLINE_SIMULATIONS = 5000
+MONEYLINE_MARGIN_BPS = 850
+ZETAMAC_MARGIN_BPS = 700
+TABLES = ('geo_players', 'zetamac_players')
+# pricing inputs per table; edits to other columns (e.g. screenname) reprice nothing
+INPUT_COLUMNS = {
+    'geo_players': ('name', 'mean_score', 'stddev_score'),
+    'zetamac_players': ('name', 'mean', 'std_dev'),
+}
+
+Key = Tuple
+Dep = Tuple[str, Hashable]
+
+
+def _inputs(table: str, row: Dict) -> Tuple:
+    return tuple(row.get(c) for c in INPUT_COLUMNS[table])
+
+
+class Repricer:
+    """Last priced board plus the dependency index needed to reprice it incrementally."""
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[Hashable, Dict]] = {t: {} for t in TABLES}
+        self.prices: Dict[Key, Dict] = {}
+        self.key_deps: Dict[Key, Set[Dep]] = {}
+        self.dependents: Dict[Dep, Set[Key]] = {}
+        self.version = 0
+        self._lock = threading.Lock()
+
+    ### pricing families ###
+
+    def _ladder(self, pids: List, thresholds: List, margin_bps: int, first_guess: bool = False) -> Dict[Key, Tuple]:
+        from services.pricing_service import _ladder_entries, _player_mu_sigma, first_guess_mu_sigma, price_ladder  # type: ignore
+        if not pids:
+            return {}
+        mu, sigma = _player_mu_sigma(pids, self.rows['geo_players'])
+        if first_guess:
+            mu, sigma = first_guess_mu_sigma(mu, sigma)
+        ladder = price_ladder(mu[:, None], sigma[:, None], np.asarray(thresholds, dtype=float)[None, :], margin_bps)
+        family = 'geo_first_guess' if first_guess else 'geo_total'
+        out = {}
+        for i, pid in enumerate(pids):
+            for t, entry in _ladder_entries(ladder, thresholds, i).items():
+                out[(family, pid, t)] = (entry, {('geo_players', pid)})
+        return out
+
+    def _geo_moneylines(self) -> Dict[Key, Tuple]:
+        from services.pricing_service import price_moneylines  # type: ignore
+
+        # same row order as geo_repo.get_geo_players, so the draws match the served board
+        players = sorted(self.rows['geo_players'].values(), key=lambda r: r.get('player_id'))
+        if not players:
+            return {}
+        board = price_moneylines(simulations=MONEYLINE_SIMULATIONS, margin_bps=MONEYLINE_MARGIN_BPS, players=players)
+        deps = {('geo_players', pid) for pid in self.rows['geo_players']}
+        out = {}
+        for market in ('classic', 'firstRound', 'lastRound'):
+            for e in board.get(market, []):
+                entry = {'prob': e['prob'], 'decimal': e['decimal'], 'american': e['american']}
+                out[('geo_moneyline', market, e['player_id'])] = (entry, deps)
+        return out
+
+    def _zetamac_totals(self, pids: List) -> Dict[Key, Tuple]:
+        from services.pricing_service import _ladder_entries, price_ladder, zetamac_hook_list  # type: ignore
+        out = {}
+        for pid in pids:
+            row = self.rows['zetamac_players'][pid]
+            mean, std = float(row.get('mean') or 0.0), float(row.get('std_dev') or 1.0)
+            hooks = zetamac_hook_list(mean, std)
+            if not hooks:
+                continue
+            ladder = price_ladder(np.array([[mean]]), np.array([[std]]), np.asarray(hooks, dtype=float)[None, :], ZETAMAC_MARGIN_BPS)
+            for h, entry in _ladder_entries(ladder, hooks, 0).items():
+                out[('zetamac_total', pid, h)] = (entry, {('zetamac_players', pid)})
+        return out
+
+    def _zetamac_matchups(self, dirty: Set) -> Dict[Key, Tuple]:
+        from services.matchups import normal_superiority_matrix  # type: ignore
+        from services.pricing_service import apply_margin_array, prob_to_decimal_array  # type: ignore
+        from utils.odds import american_strings, decimal_to_american_array  # type: ignore
+
+        rows = self.rows['zetamac_players']
+        ids = sorted(rows)
+        pairs = [(i, j) for i, j in combinations(range(len(ids)), 2) if ids[i] in dirty or ids[j] in dirty]
+        if not pairs:
+            return {}
+        matrix = normal_superiority_matrix([float(rows[p].get('mean') or 0.0) for p in ids],
+                                           [float(rows[p].get('std_dev') or 1.0) for p in ids])
+        raw = np.array([matrix[i, j] for i, j in pairs])
+        p1, p2 = apply_margin_array(raw, 1.0 - raw, ZETAMAC_MARGIN_BPS)
+        a1 = american_strings(decimal_to_american_array(prob_to_decimal_array(p1), prob=p1))
+        a2 = american_strings(decimal_to_american_array(prob_to_decimal_array(p2), prob=p2))
+        out = {}
+        for k, (i, j) in enumerate(pairs):
+            a, b = ids[i], ids[j]
+            entry = {'player1_prob': float(p1[k]), 'player2_prob': float(p2[k]), 'player1_american': a1[k], 'player2_american': a2[k]}
+            out[('zetamac_h2h', a, b)] = (entry, {('zetamac_players', a), ('zetamac_players', b)})
+        return out
+
+    def _reprice(self, table: str, dirty: Set) -> Dict[Key, Optional[Tuple]]:
+        live = [pid for pid in sorted(dirty) if pid in self.rows[table]]
+        if table == 'geo_players':
+            fresh = self._ladder(live, LINE_THRESHOLDS, LINE_MARGIN_BPS)
+            fresh.update(self._ladder(live, FIRST_GUESS_THRESHOLDS, FIRST_GUESS_MARGIN_BPS, first_guess=True))
+            fresh.update(self._geo_moneylines())
+        else:
+            fresh = self._zetamac_totals(live)
+            fresh.update(self._zetamac_matchups(dirty))
+        # everything a dirty player used to feed and no longer produces is withdrawn
+        for pid in dirty:
+            for key in self.dependents.get((table, pid), set()):
+                fresh.setdefault(key, None)
+        return fresh
+
+    ### bookkeeping ###
+
+    def _set(self, key: Key, entry: Optional[Dict], deps: Set[Dep]) -> None:
+        for dep in self.key_deps.pop(key, set()):
+            keys = self.dependents.get(dep)
+            if keys is not None:
+                keys.discard(key)
+        if entry is None:
+            self.prices.pop(key, None)
+            return
+        self.prices[key] = entry
+        self.key_deps[key] = set(deps)
+        for dep in deps:
+            self.dependents.setdefault(dep, set()).add(key)
+
+    def _sync(self, table: str, new_rows: Dict[Hashable, Dict]) -> Dict:
+        # caller holds self._lock
+        old_rows = self.rows[table]
+        dirty = {pid for pid in set(old_rows) | set(new_rows)
+                 if pid not in old_rows or pid not in new_rows or _inputs(table, old_rows[pid]) != _inputs(table, new_rows[pid])}
+        self.rows[table] = new_rows
+        fresh = self._reprice(table, dirty) if dirty else {}
+        changes = []
+        for key, value in fresh.items():
+            entry, deps = value if value is not None else (None, set())
+            before = self.prices.get(key)
+            self._set(key, entry, deps)
+            if before != entry:
+                changes.append({'market': key[0], 'key': list(key[1:]), 'before': before, 'after': entry})
+        if changes:
+            self.version += 1
+        return {'version': self.version, 'table': table, 'players': sorted(dirty, key=str),
+                'recomputed': len(fresh), 'changes': changes}
+
+    def sync(self, table: str, rows: List[Dict]) -> Dict:
+        """Replace `table` with `rows`, reprice what depends on changed rows and return the diff.
+
+        Returns { version, table, players: [dirty ids], recomputed, changes: [ { market, key,
+        before, after } ] } where before/after are None for added/withdrawn quotes.
+        """
+        if table not in TABLES:
+            raise ValueError(f"unknown table: {table}")
+        new_rows = {r.get('player_id'): dict(r) for r in rows or [] if r.get('player_id') is not None}
+        with self._lock:
+            return self._sync(table, new_rows)
+
+    def update(self, table: str, row: Dict) -> Dict:
+        """Merge `row` into the stored row of its player (partial rows keep the other columns) and return the diff."""
+        if table not in TABLES:
+            raise ValueError(f"unknown table: {table}")
+        pid = row.get('player_id')
+        if pid is None:
+            raise ValueError('row needs a player_id')
+        with self._lock:
+            rows = dict(self.rows[table])
+            rows[pid] = {**rows.get(pid, {}), **row}
+            return self._sync(table, rows)
+
+    def board(self, market: str = None) -> Dict[Key, Dict]:
+        """Current quotes (optionally one market family)."""
+        with self._lock:
+            return {k: v for k, v in self.prices.items() if market is None or k[0] == market}
+
+
+_repricer: Optional[Repricer] = None
+_repricer_lock = threading.Lock()
+
+
+def get_repricer() -> Repricer:
+    """Process-wide repricer, primed from the current tables on first use."""
+    global _repricer
+    with _repricer_lock:
+        if _repricer is None:
+            from database.geo_repo import get_geo_players, get_zetamac_players  # type: ignore
+            rep = Repricer()
+            rep.sync('geo_players', get_geo_players() or [])
+            rep.sync('zetamac_players', get_zetamac_players() or [])
+            _repricer = rep
+        return _repricer
@@ -0,0 +1,160 @@
+"""Round-count markets: how many of the 5 rounds a player wins.
+
+Under the pricing model the rounds are i.i.d., so the number of rounds player i
+wins is Binomial(5, q_i), where q_i = P(i has the round max) comes from the
+analytic integration in services.analytic_pricing. The per-round table and
+the priced markets are cached per geo_players data version, so a warm request
+does no integration and no simulation:
+
+  - at_least_k / exactly_k round wins (k = 0..5)
+  - first_and_last: wins round 1 and round 5 (q_i ** 2)
+  - first_last_overall: wins round 1, round 5 and the game total (as in
+    steters/sohan_galore.py). The total is correlated with the two rounds, so
+    this one is estimated with the seeded Monte Carlo engine.
+"""
+import threading
+from math import comb
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ROUNDS = 5
+DEFAULT_TRIPLE_SIMS = 50000
+
+_table_lock = threading.Lock()
+_table_cache: Dict[Tuple, Dict] = {}
+# (version, fingerprint, margin_bps, triple_sims, seed, crn) -> round_count_markets result
+_markets_cache: Dict[Tuple, Dict] = {}
+
+
+def _fingerprint(players: List[Dict]) -> Tuple:
+    return tuple((p.get('player_id'), p.get('mean_score'), p.get('stddev_score')) for p in players)
+
+
+def round_win_table(players: List[Dict] = None) -> Dict:
+    """Per-round win probability for every player, cached per data version.
+
+    Returns { 'version', 'player_ids', 'names', 'q': ndarray, 'models' }.
+    """
+    from database.geo_repo import get_data_version  # type: ignore
+    if players is None:
+        from database.geo_repo import get_geo_players  # type: ignore
+        players = get_geo_players() or []
+    key = (get_data_version('geo_players'), _fingerprint(players))
+    with _table_lock:
+        hit = _table_cache.get(key)
+    if hit is not None:
+        return hit
+
+    from services.simulation import build_round_models  # type: ignore
+    from services.analytic_pricing import round_win_probs  # type: ignore
+    models = build_round_models(players)
+    q = round_win_probs(models) if len(models) else np.zeros(0)
+    table = {'version': key[0], 'fingerprint': key[1], 'player_ids': models.player_ids, 'names': models.names, 'q': q,
+             'models': models}
+    with _table_lock:
+        # only the latest roster/version is useful; drop older tables
+        _table_cache.clear()
+        _table_cache[key] = table
+    return table
+
+
+def round_count_pmf(q: float, rounds: int = ROUNDS) -> np.ndarray:
+    """P(exactly k round wins) for k = 0..rounds."""
+    return np.array([comb(rounds, k) * q ** k * (1.0 - q) ** (rounds - k) for k in range(rounds + 1)])
+
+
+def first_last_overall_probs(table: Dict, sims: int = DEFAULT_TRIPLE_SIMS, ctx=None) -> np.ndarray:
+    """P(win round 1 and round 5 and the game) per player, from the MC engine."""
+    from services.simulation import sample_round_scores, max_hits  # type: ignore
+    from services.sim_context import default_context  # type: ignore
+
+    models = table['models']
+    ctx = ctx or default_context()
+    rng = ctx.stream('round_counts:first_last_overall')
+    hits = np.zeros(len(models), dtype=np.int64)
+    remaining = int(sims)
+    while remaining > 0:
+        size = min(remaining, 25000)
+        scores = sample_round_scores(models, size, rng=rng, inverse=ctx.crn)
+        hit = max_hits(scores[:, 0, :]) & max_hits(scores[:, -1, :]) & max_hits(scores.sum(axis=1))
+        hits += hit.sum(axis=0)
+        remaining -= size
+    return hits / float(sims)
+
+
+def round_count_markets(players: List[Dict] = None, margin_bps: int = 800, triple_sims: int = DEFAULT_TRIPLE_SIMS, ctx=None) -> Dict:
+    """Fair and priced round-count markets for every player, cached per data version.
+
+    Returns { 'config', 'players': [ { player_id, player, round_win_prob,
+    markets: [ { market, label, fair_prob, prob, decimal, american } ] } ] }
+    """
+    from services.sim_context import default_context  # type: ignore
+
+    ctx = ctx or default_context()
+    table = round_win_table(players)
+    if not len(table['q']):
+        return {'config': {'rounds': ROUNDS}, 'players': []}
+    key = (table['version'], table['fingerprint'], int(margin_bps), int(triple_sims or 0), ctx.seed, ctx.crn)
+    with _table_lock:
+        hit = _markets_cache.get(key)
+    if hit is not None:
+        return hit
+    res = _price_round_counts(table, margin_bps, triple_sims, ctx)
+    with _table_lock:
+        # keep every margin / sims variant of the latest roster and version only
+        for stale in [k for k in _markets_cache if k[:2] != key[:2]]:
+            del _markets_cache[stale]
+        _markets_cache[key] = res
+    return res
+
+
+def _price_round_counts(table: Dict, margin_bps: int, triple_sims: int, ctx) -> Dict:
+    from services.pricing_service import apply_single_vig, prob_to_decimal_array  # type: ignore
+    from utils.odds import american_strings, decimal_to_american_array  # type: ignore
+
+    triple = first_last_overall_probs(table, sims=triple_sims, ctx=ctx) if triple_sims else None
+
+    out = []
+    for i, (pid, name) in enumerate(zip(table['player_ids'], table['names'])):
+        q = float(table['q'][i])
+        pmf = round_count_pmf(q)
+        tail = np.cumsum(pmf[::-1])[::-1]
+        entries = [('exactly_%d' % k, f"{name} wins exactly {k} rounds", pmf[k]) for k in range(ROUNDS + 1)]
+        entries += [('at_least_%d' % k, f"{name} wins {k}+ rounds", tail[k]) for k in range(1, ROUNDS + 1)]
+        entries.append(('first_and_last', f"{name} wins the first and last round", q * q))
+        if triple is not None:
+            entries.append(('first_last_overall', f"{name} wins the first round, last round and overall", triple[i]))
+
+        fair = np.array([float(e[2]) for e in entries])
+        vig = np.array([apply_single_vig(p, margin_bps) for p in fair])
+        dec = prob_to_decimal_array(vig)
+        amer = american_strings(decimal_to_american_array(dec, prob=vig))
+        markets = []
+        for (market, label, _), f, v, d, a in zip(entries, fair.tolist(), vig.tolist(), np.round(dec, 4).tolist(), amer):
+            markets.append({'market': market, 'label': label, 'fair_prob': f, 'prob': v, 'decimal': d, 'american': a})
+        out.append({'player_id': pid, 'player': name, 'round_win_prob': q, 'markets': markets})
+    return {'config': {'rounds': ROUNDS, 'version': table['version']}, 'players': out}
+
+
+# markets surfaced on the specials board (one row per player and market)
+BOARD_MARKETS = ('at_least_3', 'at_least_4', 'first_last_overall')
+
+
+def round_count_specials(players: List[Dict] = None, margin_bps: int = 800, ctx=None) -> List[Dict]:
+    """Round-count markets shaped like specials table rows (betid, outcome, odds)."""
+    res = round_count_markets(players=players, margin_bps=margin_bps, ctx=ctx)
+    rows = []
+    for p in res['players']:
+        for m in p['markets']:
+            if m['market'] not in BOARD_MARKETS:
+                continue
+            rows.append({
+                'betid': f"rounds-{p['player_id']}-{m['market']}",
+                'outcome': m['label'],
+                'odds': m['american'],
+                'fair_prob': m['fair_prob'],
+                'decimal': m['decimal'],
+                'priced': 'model',
+            })
+    return rows
@@ -0,0 +1,115 @@
+"""Exact pricing of order-dependent continent specials by dynamic programming.
+
+Rounds draw continents i.i.d. from get_continent_probs(), so any condition that
+can be tracked with a small state (last continent, current run length, a few
+flags) is solved exactly by pushing probability mass forward round by round:
+
+    P_{r+1}(step(s, c)) += P_r(s) * p_c
+
+`sequence_probability` runs that DP for an arbitrary (init, step, accept)
+tracker; the helpers below build the trackers for the usual specials:
+back-to-back runs, "same continent k times in a row" and "no X until round r".
+State spaces are at most (continents x run length x 2), so every price is a few
+hundred multiply-adds instead of a simulation.
+"""
+from typing import Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+
+ROUNDS = 5
+
+
+def _normalize(probs: Dict[str, float]) -> Dict[str, float]:
+    clean = {c: max(0.0, float(p)) for c, p in (probs or {}).items()}
+    total = sum(clean.values())
+    if total <= 0:
+        return {c: 1.0 / len(clean) for c in clean} if clean else {}
+    return {c: p / total for c, p in clean.items()}
+
+
+def sequence_probability(probs: Dict[str, float], step: Callable[[Hashable, str, int], Hashable],
+                         accept: Callable[[Hashable], bool], init: Hashable = None, rounds: int = ROUNDS) -> float:
+    """Exact P(accept(final state)) for a tracker driven by i.i.d. continent draws.
+
+    step(state, continent, round_number) returns the next state (round numbers
+    are 1-based). States must be hashable; equal states are merged each round.
+    """
+    probs = _normalize(probs)
+    dist = {init: 1.0}
+    for r in range(1, int(rounds) + 1):
+        nxt: Dict[Hashable, float] = {}
+        for state, mass in dist.items():
+            for cont, p in probs.items():
+                if p <= 0:
+                    continue
+                s = step(state, cont, r)
+                nxt[s] = nxt.get(s, 0.0) + mass * p
+        dist = nxt
+    return float(min(1.0, sum(m for s, m in dist.items() if accept(s))))
+
+
+def _same(a: Optional[str], b: Optional[str]) -> bool:
+    return a is not None and b is not None and a.strip().lower() == b.strip().lower()
+
+
+def run_probability(probs: Dict[str, float], k: int, continent: str = None, rounds: int = ROUNDS) -> float:
+    """P(some run of >= k consecutive rounds in `continent` (or any one continent if None))."""
+    k = int(k)
+
+    def step(state, cont, r):
+        last, run, hit = state
+        run = run + 1 if last == cont else 1
+        counts = continent is None or _same(cont, continent)
+        return (cont, min(run, k), hit or (counts and run >= k))
+
+    return sequence_probability(probs, step, lambda s: s[2], init=(None, 0, False), rounds=rounds)
+
+
+def absent_until_probability(probs: Dict[str, float], continent: str, first_round: int, rounds: int = ROUNDS) -> float:
+    """P(`continent` does not appear before round `first_round`)."""
+    def step(seen, cont, r):
+        return seen or (r < first_round and _same(cont, continent))
+
+    return sequence_probability(probs, step, lambda s: not s, init=False, rounds=rounds)
+
+
+def longest_run_distribution(probs: Dict[str, float], rounds: int = ROUNDS) -> List[float]:
+    """P(longest same-continent run == L) for L = 1..rounds."""
+    out = []
+    prev = 1.0
+    for k in range(2, int(rounds) + 1):
+        at_least = run_probability(probs, k, rounds=rounds)
+        out.append(prev - at_least)
+        prev = at_least
+    out.append(prev)
+    return out
+
+
+def sequence_markets(conts: List[Dict], rounds: int = ROUNDS, margin_bps: int = 850, max_decimal_odds: float = 100.0) -> List[Dict]:
+    """Priced sequence specials for the continent board.
+
+    conts: rows from get_continent_probs() ({ continent, p, ... }).
+    Returns [ { key, name, fairProb, prob, oddsDecimal, oddsAmerican } ].
+    """
+    from services.pricing_service import prob_to_decimal_array  # type: ignore
+    from utils.odds import american_strings, decimal_to_american_array  # type: ignore
+
+    probs = {c['continent']: float(c.get('p', 0.0)) for c in conts or []}
+    if not probs:
+        return []
+    entries = []
+    for c in probs:
+        entries.append((f"back_to_back:{c}", f"Back-to-back {c}", run_probability(probs, 2, c, rounds)))
+    entries.append(('same_three_in_a_row', 'Same continent 3 rounds in a row', run_probability(probs, 3, None, rounds)))
+    for c in probs:
+        entries.append((f"no_until_4:{c}", f"No {c} until round 4", absent_until_probability(probs, c, 4, rounds)))
+
+    fair = np.array([e[2] for e in entries])
+    # single-sided markets: scale by the margin, keep below certainty
+    adj = np.clip(fair * (1.0 + margin_bps / 10000.0), 0.0, 0.9999)
+    dec = np.minimum(prob_to_decimal_array(adj), max_decimal_odds)
+    amer = american_strings(decimal_to_american_array(dec, prob=adj))
+    out = []
+    for (key, name, _), f, a, d, s in zip(entries, fair.tolist(), adj.tolist(), np.round(dec, 4).tolist(), amer):
+        out.append({'key': key, 'name': name, 'fairProb': f, 'prob': a, 'oddsDecimal': d, 'oddsAmerican': s})
+    return out
@@ -0,0 +1,166 @@
+"""Process-pool executor for large pricing simulations.
+
+A sync gunicorn worker prices on one core and holds the GIL for the whole
+simulation. Big jobs can instead be split into shards that run in a
+ProcessPoolExecutor:
+
+  - the job is always cut into PRICING_SIM_SHARDS shards (default 16), however
+    many workers run them, and each shard gets its own SeedSequence spawned
+    from the SimulationContext stream. A given (seed, sims, shards) therefore
+    prices identically on every machine, and shards never share random
+    numbers;
+  - shards write their integer counts into one shared_memory buffer
+    (shards x outputs), and the parent sums it, so results are never pickled
+    back through the pool;
+  - the same shard functions run in-process when the pool is disabled, giving
+    identical numbers. The pricing functions use that in-process path whenever
+    they do not use the pool, so whether a call trips use_pool never changes
+    its prices.
+
+Enabled per call (parallel=True on the pricing functions) or globally with
+PRICING_PARALLEL=1; PRICING_SIM_WORKERS sets the pool size (default: CPU count).
+With the global switch, jobs below PRICING_PARALLEL_MIN_SIMS stay in-process,
+where the pool start-up and IPC would cost more than they save.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+PARALLEL_ENABLED = os.getenv('PRICING_PARALLEL', '0').lower() in ('1', 'true', 'yes')
+SIM_WORKERS = int(os.getenv('PRICING_SIM_WORKERS', '0') or 0) or (os.cpu_count() or 1)
+# part of the seed configuration: changing it changes the sampled prices
+SIM_SHARDS = int(os.getenv('PRICING_SIM_SHARDS', '16'))
+PARALLEL_MIN_SIMS = int(os.getenv('PRICING_PARALLEL_MIN_SIMS', '20000'))
+
+_pool_lock = threading.Lock()
+# one pool per worker count: a call asking for another size must not shut down
+# a pool that other threads are still submitting shards to
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def use_pool(flag: bool = None, sims: int = 0) -> bool:
+    """Resolve a per-call parallel flag (None: PRICING_PARALLEL for jobs of PARALLEL_MIN_SIMS or more)."""
+    if flag is None:
+        return PARALLEL_ENABLED and int(sims) >= PARALLEL_MIN_SIMS
+    return bool(flag)
+
+
+def get_executor(workers: int = None) -> ProcessPoolExecutor:
+    """Shared process pool of `workers` processes (spawned workers, safe under threaded/forked servers)."""
+    workers = int(workers or SIM_WORKERS)
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return pool
+
+
+def shutdown_executor() -> None:
+    with _pool_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
+atexit.register(shutdown_executor)
+
+
+def split_sims(sims: int, shards: int) -> List[int]:
+    """Split `sims` into `shards` near-equal positive parts."""
+    shards = max(1, min(int(shards), int(sims)))
+    base, extra = divmod(int(sims), shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def _run_shard(shm_name: str, shape, shard: int, task: Callable, args: tuple, sims: int, seed_seq) -> None:
+    """Worker entry point: run one shard and write its counts into the shared buffer."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=np.int64, buffer=shm.buf)
+        out[shard] = task(args, sims, seed_seq)
+    finally:
+        shm.close()
+
+
+def run_sharded(task: Callable, args: tuple, sims: int, seed_seqs: Sequence, n_out: int, workers: int = None,
+                parallel: bool = True) -> np.ndarray:
+    """Run task(args, shard_sims, seed_seq) -> int64 (n_out,) over shards and sum the counts.
+
+    `task` must be a module-level function and `args` picklable. One shard is
+    run per seed sequence.
+    """
+    sizes = split_sims(sims, len(seed_seqs))
+    seed_seqs = list(seed_seqs)[:len(sizes)]
+    if not parallel:
+        return np.sum([np.asarray(task(args, n, ss), dtype=np.int64) for n, ss in zip(sizes, seed_seqs)], axis=0)
+
+    shape = (len(sizes), int(n_out))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    try:
+        buf = np.ndarray(shape, dtype=np.int64, buffer=shm.buf)
+        buf[:] = 0
+        pool = get_executor(workers)
+        futures = [pool.submit(_run_shard, shm.name, shape, i, task, args, n, ss)
+                   for i, (n, ss) in enumerate(zip(sizes, seed_seqs))]
+        for f in futures:
+            f.result()
+        return buf.sum(axis=0).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+### shard tasks (module level so spawned workers can unpickle them) ###
+
+def moneyline_task(args: tuple, sims: int, seed_seq) -> np.ndarray:
+    """Classic/firstRound/lastRound win counts, flattened to (3 * players,)."""
+    from services.simulation import simulate_moneyline_counts  # type: ignore
+    models, inverse = args
+    rng = np.random.Generator(np.random.PCG64(seed_seq))
+    counts = simulate_moneyline_counts(models, sims, rng=rng, inverse=inverse)
+    return np.concatenate([counts['classic'], counts['firstRound'], counts['lastRound']])
+
+
+def duel_task(args: tuple, sims: int, seed_seq) -> np.ndarray:
+    """Duel left/right/unfinished counts and rounds histogram, flattened."""
+    from services import duel_pricing  # type: ignore
+    mu, sd, left, right, sampler_name = args
+    rng = np.random.Generator(np.random.PCG64(seed_seq))
+    sampler = getattr(duel_pricing, sampler_name)
+    counts = duel_pricing.simulate_duels(mu, sd, left, right, sims=sims, rng=rng, sampler=sampler)
+    return np.concatenate([counts['left'], counts['right'], counts['unfinished'], counts['rounds'].ravel()])
+
+
+def parallel_moneyline_counts(models, sims: int, ctx, workers: int = None, parallel: bool = True, shards: int = None):
+    """Sharded equivalent of simulation.simulate_moneyline_counts (`shards` defaults to SIM_SHARDS)."""
+    n = len(models)
+    shards = int(shards or SIM_SHARDS)
+    flat = run_sharded(moneyline_task, (models, ctx.crn), sims, ctx.spawn_sequences('moneyline', shards), 3 * n,
+                       workers=workers, parallel=parallel)
+    return {'classic': flat[:n], 'firstRound': flat[n:2 * n], 'lastRound': flat[2 * n:]}
+
+
+def parallel_duel_counts(mu, sd, left, right, sims: int, ctx, key: str, sampler_name: str = 'sample_scores',
+                         workers: int = None, parallel: bool = True, shards: int = None):
+    """Sharded equivalent of duel_pricing.simulate_duels (`shards` defaults to SIM_SHARDS)."""
+    from services.duel_pricing import MAX_ROUNDS  # type: ignore
+    left = np.atleast_2d(np.asarray(left, dtype=np.int64))
+    right = np.atleast_2d(np.asarray(right, dtype=np.int64))
+    m = left.shape[0]
+    shards = int(shards or SIM_SHARDS)
+    n_out = 3 * m + m * (MAX_ROUNDS + 1)
+    flat = run_sharded(duel_task, (mu, sd, left, right, sampler_name), sims, ctx.spawn_sequences(key, shards), n_out,
+                       workers=workers, parallel=parallel)
+    return {
+        'left': flat[:m],
+        'right': flat[m:2 * m],
+        'unfinished': flat[2 * m:3 * m],
+        'rounds': flat[3 * m:].reshape(m, MAX_ROUNDS + 1),
+    }
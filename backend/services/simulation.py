@@ -0,0 +1,188 @@
+"""Vectorized Monte Carlo engine for GeoGuessr round-score simulations.
+
+Every player's per-round score follows the same three-way mixture used by the
+moneyline pricer and the steters scripts:
+  - p_easy:  uniform easy round on [4950, 5000]
+  - p_cat:   uniform catastrophe on [0, 2000]
+  - else:    Beta(a, b) scaled to [0, 5000], fitted from mean/5 and sd/sqrt(5)
+
+Instead of looping over simulations, rounds and players in Python, the whole
+(sims x rounds x players) score tensor is drawn in a handful of NumPy calls and
+winner counts are reduced with array max/tie logic.
+
+Two uniform sources are supported: the pseudo-random Generator (default) and a
+scrambled Sobol sequence (sampler='sobol'). A Sobol point supplies the
+(branch, value) uniform pair for every round and player of one game, and those
+pairs go through the same inverse-CDF mixture map, so the low-discrepancy
+structure carries over to the scores.
+"""
+import warnings
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+from scipy.special import betaincinv
+from scipy.stats import qmc
+
+from services.pricing_service import fit_beta_params  # type: ignore
+
+MAX_SCORE = 5000.0
+P_EASY = 0.07
+P_CAT = 0.09
+ROUNDS = 5
+# cap on sims drawn per batch so a 100k+ run stays within a few tens of MB
+DEFAULT_BATCH = 50000
+TIE_TOL = 1e-9
+# knots of the tabulated Beta inverse CDF used by inverse-transform sampling
+PPF_KNOTS = 4097
+SAMPLERS = ('pseudo', 'sobol')
+
+
+@dataclass
+class RoundModels:
+    """Per-player round-score mixture parameters stored as aligned arrays."""
+    player_ids: List
+    names: List[str]
+    a: np.ndarray
+    b: np.ndarray
+    p_easy: float = P_EASY
+    p_cat: float = P_CAT
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+
+def build_round_models(players: List[Dict]) -> RoundModels:
+    """Build RoundModels from geo_players rows (mean_score/stddev_score are per game)."""
+    pids, names, a_list, b_list = [], [], [], []
+    for p in players:
+        name = p.get('name') or p.get('screenname') or str(p.get('player_id'))
+        mu = float(p.get('mean_score') or 0.0)
+        sigma = float(p.get('stddev_score') or 0.0)
+        # per-round mean and std: follow existing first-guess convention: mu/5, sigma/sqrt(5)
+        round_mu = mu / 5.0
+        round_sigma = sigma / (np.sqrt(5.0) if sigma > 0 else 1.0)
+        a, b = fit_beta_params(round_mu, round_sigma ** 2, L=MAX_SCORE)
+        pids.append(p.get('player_id'))
+        names.append(name)
+        a_list.append(a)
+        b_list.append(b)
+    return RoundModels(player_ids=pids, names=names, a=np.asarray(a_list, dtype=float), b=np.asarray(b_list, dtype=float))
+
+
+def sobol_engine(models: RoundModels, rounds: int = ROUNDS, rng: np.random.Generator = None) -> qmc.Sobol:
+    """Scrambled Sobol engine with one (branch, value) pair per round and player."""
+    return qmc.Sobol(d=2 * int(rounds) * len(models), scramble=True, seed=rng)
+
+
+def sobol_uniforms(engine: qmc.Sobol, sims: int) -> np.ndarray:
+    """Next `sims` Sobol points; powers of two keep the sequence balanced."""
+    with warnings.catch_warnings():
+        # scipy warns when n is not a power of 2; the points are still valid
+        warnings.simplefilter('ignore', UserWarning)
+        return engine.random(int(sims))
+
+
+def sample_round_scores(models: RoundModels, sims: int, rounds: int = ROUNDS, rng: np.random.Generator = None, inverse: bool = False,
+                        engine: qmc.Sobol = None) -> np.ndarray:
+    """Draw a (sims, rounds, players) tensor of round scores from the mixture.
+
+    With `inverse=True` every score is an inverse-CDF transform of exactly two
+    uniforms (branch, value), so the draw consumes the same random numbers
+    whatever the Beta parameters are (common random numbers). Passing a Sobol
+    `engine` (see sobol_engine) takes those uniforms from it instead.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    shape = (int(sims), int(rounds), len(models))
+    if engine is not None:
+        points = sobol_uniforms(engine, sims).reshape((int(sims), 2, int(rounds), len(models)))
+        return mixture_from_uniforms(models, points[:, 0], points[:, 1])
+    if inverse:
+        branch, value = rng.random((2,) + shape)
+        return mixture_from_uniforms(models, branch, value)
+
+    branch = rng.random(shape)
+    scores = rng.beta(models.a, models.b, size=shape) * MAX_SCORE
+
+    easy = branch < models.p_easy
+    cat = (branch >= models.p_easy) & (branch < models.p_easy + models.p_cat)
+    scores[easy] = rng.uniform(4950.0, 5000.0, size=int(easy.sum()))
+    scores[cat] = rng.uniform(0.0, 2000.0, size=int(cat.sum()))
+    np.clip(scores, 0.0, MAX_SCORE, out=scores)
+    return scores
+
+
+def mixture_from_uniforms(models: RoundModels, branch: np.ndarray, value: np.ndarray) -> np.ndarray:
+    """Map (branch, value) uniforms of shape (..., players) to mixture round scores."""
+    easy = branch < models.p_easy
+    cat = (branch >= models.p_easy) & (branch < models.p_easy + models.p_cat)
+    normal = ~(easy | cat)
+
+    scores = np.empty(np.shape(value), dtype=float)
+    scores[easy] = 4950.0 + 50.0 * value[easy]
+    scores[cat] = 2000.0 * value[cat]
+    grid, table = beta_ppf_table(models)
+    # players sit on the last axis; interpolate each player's column separately
+    for j in range(len(models)):
+        col = normal[..., j]
+        scores[..., j][col] = np.interp(value[..., j][col], grid, table[j]) * MAX_SCORE
+    np.clip(scores, 0.0, MAX_SCORE, out=scores)
+    return scores
+
+
+def beta_ppf_table(models: RoundModels):
+    """Tabulate each player's Beta inverse CDF on a shared uniform grid.
+
+    Exact betaincinv per draw is ~15x slower than rng.beta; interpolating a
+    4k-knot table costs about the same as direct sampling and stays within a
+    fraction of a point on the [0, 5000] scale.
+    """
+    # cosine spacing packs knots into both tails, where the inverse CDF is steep
+    grid = 0.5 * (1.0 - np.cos(np.linspace(0.0, np.pi, PPF_KNOTS)))
+    table = betaincinv(models.a[:, None], models.b[:, None], grid[None, :])
+    return grid, table
+
+
+def max_hits(values: np.ndarray) -> np.ndarray:
+    """Boolean mask of entries tied for the max along the last (player) axis."""
+    best = values.max(axis=-1, keepdims=True)
+    return np.abs(values - best) < TIE_TOL
+
+
+def count_winners(scores: np.ndarray) -> Dict[str, np.ndarray]:
+    """Reduce a score tensor to classic/first-round/last-round win counts per player.
+
+    Ties count as a win for every tied player, matching the original loop.
+    """
+    totals = scores.sum(axis=1)
+    return {
+        'classic': max_hits(totals).sum(axis=0),
+        'firstRound': max_hits(scores[:, 0, :]).sum(axis=0),
+        'lastRound': max_hits(scores[:, -1, :]).sum(axis=0),
+    }
+
+
+def simulate_moneyline_counts(models: RoundModels, sims: int, rounds: int = ROUNDS, rng: np.random.Generator = None, batch_size: int = DEFAULT_BATCH, inverse: bool = False,
+                              sampler: str = 'pseudo', engine: qmc.Sobol = None) -> Dict[str, np.ndarray]:
+    """Run `sims` simulated games in batches and return win counts per market.
+
+    sampler='sobol' draws from a scrambled Sobol sequence seeded from `rng`;
+    pass `engine` to continue an existing sequence across calls.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if sampler not in SAMPLERS:
+        raise ValueError(f"unknown sampler: {sampler}")
+    if sampler == 'sobol' and engine is None:
+        engine = sobol_engine(models, rounds, rng)
+    n = len(models)
+    counts = {k: np.zeros(n, dtype=np.int64) for k in ('classic', 'firstRound', 'lastRound')}
+    remaining = int(sims)
+    while remaining > 0:
+        size = min(remaining, int(batch_size))
+        batch = count_winners(sample_round_scores(models, size, rounds=rounds, rng=rng, inverse=inverse, engine=engine))
+        for k in counts:
+            counts[k] += batch[k]
+        remaining -= size
+    return counts
@@ -0,0 +1,351 @@
+"""Small expression language for GeoGuessr specials.
+
+A special is written as a boolean formula over one 5-round game, e.g.
+
+    count(Europe) == 0 and count(Oceania) >= 2
+    count(Europe) == 3 and count(Asia) == 1 and count(Africa) == 1
+    streak(Asia, 2)                       # back-to-back Asia
+    none('North America') and none('South America')
+    at(1, Europe) and at(-1, Europe)      # first and last round in Europe
+    any(France) or count(Brazil) >= 2     # country-level conditions
+    total(Sohan) > 17000 and score(Pam, 1) >= 4000
+
+Formulas are parsed with `ast` (nothing is ever eval'd) and compiled to NumPy
+operations over an outcome tensor of shape (outcomes, rounds):
+
+  - exact: when only locations are referenced and the category space is small,
+    every ordered sequence is enumerated with its probability;
+  - monte carlo: otherwise a batch of games is drawn (country indices plus, if
+    player functions are used, round scores from services.simulation).
+
+Functions
+  count(L)        number of rounds landing in location L
+  any(L) / none(L) / all(L)
+  at(r, L)        round r (1-based, negative counts from the end) is in L
+  streak(L, k=2)  k consecutive rounds in L
+  distinct()      number of distinct continents in the game
+  score(P, r)     player P's score in round r
+  total(P)        player P's game total
+
+Locations are continents or countries from geo_countries (case-insensitive);
+multi-word names must be quoted. Operators: and, or, not, comparisons
+(chainable), + and -.
+"""
+import ast
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+ROUNDS = 5
+# largest number of ordered sequences enumerated in exact mode
+EXACT_LIMIT = 100000
+DEFAULT_SIMS = 20000
+
+LOCATION_FUNCS = {'count', 'any', 'none', 'all', 'at', 'streak'}
+PLAYER_FUNCS = {'score', 'total'}
+_COMPARE = {
+    ast.Eq: np.equal, ast.NotEq: np.not_equal,
+    ast.Lt: np.less, ast.LtE: np.less_equal,
+    ast.Gt: np.greater, ast.GtE: np.greater_equal,
+}
+
+
+class FormulaError(ValueError):
+    """Raised for formulas that do not parse or reference unknown names."""
+
+
+@dataclass
+class Formula:
+    """A parsed special: the source text, its evaluator and what it references."""
+    text: str
+    evaluate: Callable
+    locations: Set[str] = field(default_factory=set)
+    players: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class Outcomes:
+    """Batch of games over location categories.
+
+    draws: (n, rounds) category index per round
+    weights: (n,) probability of each row (exact) or None (equally weighted draws)
+    continents / countries: per-category continent name and country name (None for
+    the "rest of continent" buckets), all lowercase
+    scores: optional (n, rounds, players) round scores, columns keyed by player_index
+    """
+    draws: np.ndarray
+    continents: List[str]
+    countries: List[Optional[str]]
+    weights: Optional[np.ndarray] = None
+    scores: Optional[np.ndarray] = None
+    player_index: Dict[str, int] = field(default_factory=dict)
+
+    def mask(self, label: str) -> np.ndarray:
+        key = label.strip().lower()
+        cats = [i for i, c in enumerate(self.continents) if c == key]
+        if not cats:
+            cats = [i for i, c in enumerate(self.countries) if c == key]
+        if not cats:
+            raise FormulaError(f"unknown location: {label}")
+        return np.isin(self.draws, cats)
+
+    def player_scores(self, name: str) -> np.ndarray:
+        key = name.strip().lower()
+        if self.scores is None or key not in self.player_index:
+            raise FormulaError(f"unknown player: {name}")
+        return self.scores[:, :, self.player_index[key]]
+
+    def probability(self, hits: np.ndarray) -> float:
+        if self.weights is None:
+            return float(np.mean(hits)) if len(hits) else 0.0
+        return float(min(1.0, self.weights[hits].sum()))
+
+
+def _label(node: ast.AST) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    raise FormulaError(f"expected a name, got {ast.dump(node)}")
+
+
+def _int(node: ast.AST) -> int:
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return -_int(node.operand)
+    if isinstance(node, ast.Constant) and isinstance(node.value, int) and not isinstance(node.value, bool):
+        return node.value
+    raise FormulaError(f"expected an integer, got {ast.dump(node)}")
+
+
+def _round_index(r: int, rounds: int) -> int:
+    idx = r - 1 if r > 0 else rounds + r
+    if r == 0 or not 0 <= idx < rounds:
+        raise FormulaError(f"round {r} out of range 1..{rounds}")
+    return idx
+
+
+def _compile_call(node: ast.Call, locations: Set[str], players: Set[str]) -> Callable:
+    if not isinstance(node.func, ast.Name) or node.keywords:
+        raise FormulaError('only plain function calls are allowed')
+    name, args = node.func.id, node.args
+
+    def arity(*allowed):
+        if len(args) not in allowed:
+            raise FormulaError(f"{name}() takes {' or '.join(str(a) for a in allowed)} arguments")
+
+    if name in ('count', 'any', 'none', 'all'):
+        arity(1)
+        loc = _label(args[0])
+        locations.add(loc)
+        reducer = {
+            'count': lambda m: m.sum(axis=1),
+            'any': lambda m: m.any(axis=1),
+            'none': lambda m: ~m.any(axis=1),
+            'all': lambda m: m.all(axis=1),
+        }[name]
+        return lambda o: reducer(o.mask(loc))
+    if name == 'at':
+        arity(2)
+        r, loc = _int(args[0]), _label(args[1])
+        locations.add(loc)
+        return lambda o: o.mask(loc)[:, _round_index(r, o.draws.shape[1])]
+    if name == 'streak':
+        arity(1, 2)
+        loc = _label(args[0])
+        k = _int(args[1]) if len(args) == 2 else 2
+        if k < 1:
+            raise FormulaError('streak length must be >= 1')
+        locations.add(loc)
+
+        def streak(o):
+            m = o.mask(loc)
+            rounds = m.shape[1]
+            if k > rounds:
+                return np.zeros(m.shape[0], dtype=bool)
+            run = m[:, :rounds - k + 1].copy()
+            for s in range(1, k):
+                run &= m[:, s:rounds - k + 1 + s]
+            return run.any(axis=1)
+        return streak
+    if name == 'distinct':
+        arity(0)
+
+        def distinct(o):
+            cont_of = np.array([sorted(set(o.continents)).index(c) for c in o.continents])
+            conts = cont_of[o.draws]
+            conts.sort(axis=1)
+            return 1 + (np.diff(conts, axis=1) != 0).sum(axis=1)
+        return distinct
+    if name == 'score':
+        arity(2)
+        player, r = _label(args[0]), _int(args[1])
+        players.add(player)
+        return lambda o: o.player_scores(player)[:, _round_index(r, o.draws.shape[1])]
+    if name == 'total':
+        arity(1)
+        player = _label(args[0])
+        players.add(player)
+        return lambda o: o.player_scores(player).sum(axis=1)
+    raise FormulaError(f"unknown function: {name}")
+
+
+def _compile(node: ast.AST, locations: Set[str], players: Set[str]) -> Callable:
+    if isinstance(node, ast.Expression):
+        return _compile(node.body, locations, players)
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(v, locations, players) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def boolop(o):
+            out = np.asarray(parts[0](o), dtype=bool)
+            for p in parts[1:]:
+                out = combine(out, p(o))
+            return out
+        return boolop
+    if isinstance(node, ast.UnaryOp):
+        inner = _compile(node.operand, locations, players)
+        if isinstance(node.op, ast.Not):
+            return lambda o: ~np.asarray(inner(o), dtype=bool)
+        if isinstance(node.op, ast.USub):
+            return lambda o: -inner(o)
+        raise FormulaError('unsupported unary operator')
+    if isinstance(node, ast.BinOp):
+        if not isinstance(node.op, (ast.Add, ast.Sub)):
+            raise FormulaError('only + and - are supported')
+        left = _compile(node.left, locations, players)
+        right = _compile(node.right, locations, players)
+        if isinstance(node.op, ast.Add):
+            return lambda o: left(o) + right(o)
+        return lambda o: left(o) - right(o)
+    if isinstance(node, ast.Compare):
+        terms = [_compile(node.left, locations, players)] + [_compile(c, locations, players) for c in node.comparators]
+        ops = []
+        for op in node.ops:
+            if type(op) not in _COMPARE:
+                raise FormulaError('unsupported comparison')
+            ops.append(_COMPARE[type(op)])
+
+        def compare(o):
+            values = [t(o) for t in terms]
+            out = ops[0](values[0], values[1])
+            for i in range(1, len(ops)):
+                out = out & ops[i](values[i], values[i + 1])
+            return out
+        return compare
+    if isinstance(node, ast.Call):
+        return _compile_call(node, locations, players)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = node.value
+        return lambda o: value
+    raise FormulaError(f"unsupported expression: {type(node).__name__}")
+
+
+def compile_formula(text: str) -> Formula:
+    """Parse and compile a specials formula. Raises FormulaError on bad input."""
+    if not text or not str(text).strip():
+        raise FormulaError('empty formula')
+    try:
+        tree = ast.parse(str(text).strip(), mode='eval')
+    except SyntaxError as e:
+        raise FormulaError(f"invalid formula: {e.msg}")
+    locations, players = set(), set()
+    fn = _compile(tree, locations, players)
+
+    def evaluate(outcomes: Outcomes) -> np.ndarray:
+        out = fn(outcomes)
+        if np.ndim(out) != 1 or np.asarray(out).dtype != bool:
+            raise FormulaError('formula must be a condition (true/false per game)')
+        return out
+
+    return Formula(text=str(text).strip(), evaluate=evaluate, locations=locations, players=players)
+
+
+def location_categories(rows: List[Dict], locations: Set[str]):
+    """Collapse geo_countries rows into the categories a set of formulas can tell apart.
+
+    Referenced countries keep their own category; every other country is pooled
+    into one "rest of <continent>" bucket. Returns (continents, countries, probs).
+    """
+    wanted = {l.strip().lower() for l in locations}
+    mass: Dict[tuple, float] = {}
+    for r in rows or []:
+        cont = (r.get('continent') or '').strip().lower()
+        if not cont:
+            continue
+        try:
+            f = max(0.0, float(r.get('freq') or 0.0))
+        except Exception:
+            f = 0.0
+        country = (r.get('country') or '').strip().lower()
+        key = (cont, country if country in wanted else None)
+        mass[key] = mass.get(key, 0.0) + f
+    total = sum(mass.values())
+    if total <= 0:
+        raise FormulaError('no location frequencies available')
+    keys = sorted(mass, key=lambda k: (k[0], k[1] or ''))
+    return [k[0] for k in keys], [k[1] for k in keys], np.array([mass[k] / total for k in keys])
+
+
+def build_outcomes(formulas: List[Formula], rows: List[Dict] = None, players: List[Dict] = None, rounds: int = ROUNDS,
+                   sims: int = DEFAULT_SIMS, rng: np.random.Generator = None) -> Outcomes:
+    """One shared outcome tensor able to evaluate every formula in `formulas`."""
+    if rows is None:
+        from database.geo_repo import get_geo_countries  # type: ignore
+        rows = get_geo_countries() or []
+    locations = set().union(*(f.locations for f in formulas)) if formulas else set()
+    needs_scores = any(f.players for f in formulas)
+    continents, countries, probs = location_categories(rows, locations)
+    n_cat = len(probs)
+
+    if not needs_scores and n_cat ** rounds <= EXACT_LIMIT:
+        from services.specials_pricing import _continent_outcomes  # type: ignore
+        draws, _ = _continent_outcomes(n_cat, int(rounds), True)
+        weights = np.prod(probs[draws], axis=1)
+        return Outcomes(draws=draws, continents=continents, countries=countries, weights=weights)
+
+    if rng is None:
+        from services.sim_context import default_context  # type: ignore
+        rng = default_context().stream('specials:formula')
+    sims = int(sims or DEFAULT_SIMS)
+    draws = rng.choice(n_cat, size=(sims, int(rounds)), p=probs)
+    scores, player_index = None, {}
+    if needs_scores:
+        from services.simulation import build_round_models, sample_round_scores  # type: ignore
+        if players is None:
+            from database.geo_repo import get_geo_players  # type: ignore
+            players = get_geo_players() or []
+        models = build_round_models(players)
+        scores = sample_round_scores(models, sims, rounds=int(rounds), rng=rng)
+        player_index = {str(n).strip().lower(): i for i, n in enumerate(models.names)}
+    return Outcomes(draws=draws, continents=continents, countries=countries, scores=scores, player_index=player_index)
+
+
+def evaluate_formulas(texts: List[str], rows: List[Dict] = None, players: List[Dict] = None, rounds: int = ROUNDS,
+                      sims: int = DEFAULT_SIMS, rng: np.random.Generator = None) -> List[Dict]:
+    """Fair probabilities for many formulas priced on one shared outcome tensor.
+
+    Returns one { formula, prob, exact } or { formula, error } entry per input.
+    Exact enumeration is used only if every valid formula fits it.
+    """
+    compiled: List = []
+    for t in texts:
+        try:
+            compiled.append(compile_formula(t))
+        except FormulaError as e:
+            compiled.append(e)
+    valid = [f for f in compiled if isinstance(f, Formula)]
+    if not valid:
+        return [{'formula': t, 'error': str(e)} for t, e in zip(texts, compiled)]
+
+    outcomes = build_outcomes(valid, rows=rows, players=players, rounds=rounds, sims=sims, rng=rng)
+    out = []
+    for t, f in zip(texts, compiled):
+        if not isinstance(f, Formula):
+            out.append({'formula': t, 'error': str(f)})
+            continue
+        try:
+            out.append({'formula': f.text, 'prob': outcomes.probability(f.evaluate(outcomes)), 'exact': outcomes.weights is not None})
+        except FormulaError as e:
+            out.append({'formula': f.text, 'error': str(e)})
+    return out
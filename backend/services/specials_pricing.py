@@ -1,17 +1,21 @@
-from typing import Dict, List
-import random
-from math import isfinite
+import logging
+import threading
+from functools import lru_cache
+from itertools import combinations_with_replacement, product
+from typing import Dict, List, Tuple
+from math import factorial, isfinite
 
-from services.pricing_service import fit_beta_params, prob_to_decimal  # type: ignore
-from utils.odds import decimal_to_american_rounded  # type: ignore
+import numpy as np
 
+from services.pricing_service import apply_single_vig, fit_beta_params, prob_to_decimal  # type: ignore
+from services.sim_context import SimulationContext, default_context  # type: ignore
+from utils.odds import decimal_to_american_rounded  # type: ignore
+from utils.singleflight import singleflight  # type: ignore
 
-def _apply_single_vig(prob: float, vig_bps: int) -> float:
-    if prob is None:
-        return 0.0
-    margin = float(vig_bps) / 10000.0
-    adj = prob * (1.0 + margin)
-    return min(max(adj, 0.0), 0.9999)
+# formula results per (formula set, geo data version, seed); see price_special_rows
+_FORMULA_CACHE_SIZE = 16
+_formula_cache_lock = threading.Lock()
+_formula_cache: Dict[Tuple, List[Dict]] = {}
 
 
 def _get_continent_weights() -> Dict[str, float]:
@@ -24,7 +28,15 @@ def _get_continent_weights() -> Dict[str, float]:
         return {}
 
 
-def _sample_continent_event(condition_fn, weights: Dict[str, float], iterations: int = 5000) -> float:
+def _sample_continent_event(condition_fn, weights: Dict[str, float], iterations: int = 5000, rng: np.random.Generator = None,
+                            adaptive: bool = False, vig_bps: int = 800, max_iterations: int = 200000, importance: bool = False) -> float:
+    """Sampled probability of condition_fn over 5 continent draws.
+
+    With adaptive=True, batches of `iterations` are drawn until the quoted price
+    (after `vig_bps`) is stable to its rounding tier, up to `max_iterations`.
+    With importance=True the draws come from a cross-entropy-tilted continent
+    distribution and hits are reweighted (services.importance_sampling).
+    """
     # normalize weights to list
     if not weights:
         weights = _get_continent_weights()
@@ -37,36 +49,102 @@ def _sample_continent_event(condition_fn, weights: Dict[str, float], iterations:
     else:
         probs = [p / total for p in probs]
 
-    hits = 0
-    for _ in range(int(iterations or 5000)):
-        draws = random.choices(conts, weights=probs, k=5)
-        if condition_fn(draws):
-            hits += 1
-    return float(hits) / float(iterations or 5000)
+    if rng is None:
+        rng = default_context().stream('specials')
+    iterations = int(iterations or 5000)
+    if importance:
+        from services.importance_sampling import importance_continent_event  # type: ignore
+        return importance_continent_event(condition_fn, dict(zip(conts, probs)), iterations=iterations, rng=rng)['prob']
+
+    def batch(size: int) -> Dict[str, np.ndarray]:
+        # draw every game's 5 continent indices in one call, then evaluate per game
+        idx = rng.choice(len(conts), size=(size, 5), p=probs)
+        hits = 0
+        for row in idx:
+            if condition_fn([conts[i] for i in row]):
+                hits += 1
+        return {'event': np.array([hits])}
+
+    if adaptive:
+        from services.adaptive_mc import run_adaptive  # type: ignore
+        run = run_adaptive(batch, scale=1.0 + vig_bps / 10000.0, batch_size=iterations, min_sims=iterations,
+                           max_sims=max(iterations, int(max_iterations)))
+        return float(run['counts']['event'][0]) / float(run['sims'])
+    return float(batch(iterations)['event'][0]) / float(iterations)
+
+
+@lru_cache(maxsize=32)
+def _continent_outcomes(n_conts: int, rounds: int = 5, ordered: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Every distinct outcome of `rounds` continent draws, plus its multiplicity.
 
+    Unordered: one representative (sorted) draw per count composition, weighted
+    by the multinomial coefficient (252 rows for 6 continents x 5 rounds).
+    Ordered: all n_conts**rounds sequences with multiplicity 1 (7776 rows).
+    Returns (idx (outcomes, rounds) int array, multiplicity (outcomes,) float array).
+    """
+    if ordered:
+        idx = np.array(list(product(range(n_conts), repeat=rounds)), dtype=np.int64).reshape(-1, rounds)
+        return idx, np.ones(len(idx))
+    rows, mult = [], []
+    for combo in combinations_with_replacement(range(n_conts), rounds):
+        coef = factorial(rounds)
+        for c in set(combo):
+            coef //= factorial(combo.count(c))
+        rows.append(combo)
+        mult.append(float(coef))
+    return np.array(rows, dtype=np.int64).reshape(-1, rounds), np.array(mult)
+
+
+def _exact_continent_event(condition_fn, weights: Dict[str, float], rounds: int = 5, ordered: bool = False) -> float:
+    """Exact probability that `condition_fn(draws)` holds over `rounds` i.i.d. continent draws.
+
+    Takes the same condition_fn as _sample_continent_event. Count-based events
+    (the usual specials) only need the unordered compositions; pass
+    ordered=True when the condition depends on which round a continent lands in.
+    """
+    if not weights:
+        weights = _get_continent_weights()
+    conts = list(weights.keys())
+    if not conts:
+        return 0.0
+    probs = np.array([max(0.0, float(weights.get(c, 0.0))) for c in conts])
+    total = probs.sum()
+    probs = probs / total if total > 0 else np.full(len(conts), 1.0 / len(conts))
 
-def no_europe_and_two_plus_oceania(weights: Dict[str, float] = None, iterations: int = 5000, vig_bps: int = 800) -> Dict:
+    idx, mult = _continent_outcomes(len(conts), int(rounds), bool(ordered))
+    outcome_probs = mult * np.prod(probs[idx], axis=1)
+    hits = np.fromiter((bool(condition_fn([conts[i] for i in row])) for row in idx), dtype=bool, count=len(idx))
+    return float(min(1.0, outcome_probs[hits].sum()))
+
+
+def no_europe_and_two_plus_oceania(weights: Dict[str, float] = None, iterations: int = 5000, vig_bps: int = 800, ctx: SimulationContext = None, exact: bool = True, adaptive: bool = False, importance: bool = False) -> Dict:
     def cond(draws: List[str]):
         europe_count = sum(1 for d in draws if d.lower() == 'europe')
         oce_count = sum(1 for d in draws if d.lower() == 'oceania')
         return (europe_count == 0) and (oce_count >= 2)
 
-    fair = _sample_continent_event(cond, weights or _get_continent_weights(), iterations=iterations)
-    vig = _apply_single_vig(fair, vig_bps)
+    if exact:
+        fair = _exact_continent_event(cond, weights or _get_continent_weights())
+    else:
+        fair = _sample_continent_event(cond, weights or _get_continent_weights(), iterations=iterations, rng=(ctx or default_context()).stream('specials:no_europe_two_plus_oceania'), adaptive=adaptive, vig_bps=vig_bps, importance=importance)
+    vig = apply_single_vig(fair, vig_bps)
     dec = prob_to_decimal(vig) if fair is not None else float('inf')
     amer = decimal_to_american_rounded(dec, prob=vig)
     return {'name': 'No Europe and 2+ Oceania', 'fair_prob': float(fair), 'vig_prob': float(vig), 'american': amer, 'decimal': round(dec, 4)}
 
 
-def three_europe_one_asia_one_africa(weights: Dict[str, float] = None, iterations: int = 5000, vig_bps: int = 800) -> Dict:
+def three_europe_one_asia_one_africa(weights: Dict[str, float] = None, iterations: int = 5000, vig_bps: int = 800, ctx: SimulationContext = None, exact: bool = True, adaptive: bool = False, importance: bool = False) -> Dict:
     def cond(draws: List[str]):
         europe_count = sum(1 for d in draws if d.lower() == 'europe')
         asia_count = sum(1 for d in draws if d.lower() == 'asia')
         africa_count = sum(1 for d in draws if d.lower() == 'africa')
         return (europe_count == 3) and (asia_count == 1) and (africa_count == 1)
 
-    fair = _sample_continent_event(cond, weights or _get_continent_weights(), iterations=iterations)
-    vig = _apply_single_vig(fair, vig_bps)
+    if exact:
+        fair = _exact_continent_event(cond, weights or _get_continent_weights())
+    else:
+        fair = _sample_continent_event(cond, weights or _get_continent_weights(), iterations=iterations, rng=(ctx or default_context()).stream('specials:three_europe_one_asia_one_africa'), adaptive=adaptive, vig_bps=vig_bps, importance=importance)
+    vig = apply_single_vig(fair, vig_bps)
     dec = prob_to_decimal(vig) if fair is not None else float('inf')
     amer = decimal_to_american_rounded(dec, prob=vig)
     return {'name': '3 Europe, 1 Asia, 1 Africa', 'fair_prob': float(fair), 'vig_prob': float(vig), 'american': amer, 'decimal': round(dec, 4)}
@@ -95,7 +173,7 @@ def no_world_cup_winners(vig_bps: int = 700) -> Dict:
     # per-round probability that a world-cup-winner appears is p_sum (may exceed 1 if DB values inconsistent, clamp)
     p = max(0.0, min(1.0, p_sum))
     fair = (1.0 - p) ** 5
-    vig = _apply_single_vig(fair, vig_bps)
+    vig = apply_single_vig(fair, vig_bps)
     dec = prob_to_decimal(vig)
     amer = decimal_to_american_rounded(dec, prob=vig)
     return {'name': 'No World Cup Winners', 'fair_prob': float(fair), 'vig_prob': float(vig), 'american': amer, 'decimal': round(dec, 4)}
@@ -104,13 +182,84 @@ def no_world_cup_winners(vig_bps: int = 700) -> Dict:
 # Naresh-specific specials removed per user request. Do not include Naresh markets.
 
 
-def get_specials_prices(simulations: int = 10000) -> Dict:
-    """Return specials prices. Default simulations increased to 10,000 for stability."""
+def price_special_rows(rows: List[Dict], vig_bps: int = 800, countries: List[Dict] = None, players: List[Dict] = None, ctx: SimulationContext = None) -> List[Dict]:
+    """Price `specials` table rows that carry a formula (services.specials_dsl).
+
+    All formulas are evaluated together on one outcome tensor. Priced rows get
+    their `odds` replaced by the computed American price plus fair_prob/decimal;
+    rows without a formula (or with a broken one) keep their stored odds. If
+    pricing fails as a whole (e.g. no geo_countries rows), every formula row
+    keeps its stored odds and carries `formula_error`.
+
+    When countries/players come from the database, results are cached per
+    (formula set, geo data version, seed), so repeat reads do not re-simulate.
+    """
+    out = [dict(r) for r in rows or []]
+    todo = [r for r in out if (r.get('formula') or '').strip()]
+    if not todo:
+        return out
+    try:
+        results = _evaluate_formula_rows([r['formula'] for r in todo], countries, players, ctx or default_context())
+    except Exception as e:
+        logging.exception('price_special_rows: formula pricing failed')
+        for r in todo:
+            r['formula_error'] = str(e)
+        return out
+    for r, res in zip(todo, results):
+        if 'error' in res:
+            r['formula_error'] = res['error']
+            continue
+        fair = res['prob']
+        vig = apply_single_vig(fair, vig_bps)
+        dec = prob_to_decimal(vig)
+        r['odds'] = decimal_to_american_rounded(dec, prob=vig)
+        r['fair_prob'] = float(fair)
+        r['decimal'] = round(dec, 4) if isfinite(dec) else None
+        r['priced'] = 'exact' if res['exact'] else 'simulated'
+    return out
+
+
+def _evaluate_formula_rows(formulas: List[str], countries: List[Dict], players: List[Dict], ctx: SimulationContext) -> List[Dict]:
+    from services.specials_dsl import evaluate_formulas  # type: ignore
+
+    def evaluate():
+        return evaluate_formulas(formulas, rows=countries, players=players, rng=ctx.stream('specials:formula'))
+    if countries is not None or players is not None:
+        return evaluate()
+
+    from database.geo_repo import get_data_version, get_geo_countries, get_geo_players  # type: ignore
+    # re-read expired entries of both tables first so the versions below are current
+    countries = get_geo_countries() or []
+    players = get_geo_players() or []
+    key = (tuple(formulas), get_data_version('geo_countries'), get_data_version('geo_players'), ctx.seed, ctx.crn)
+    with _formula_cache_lock:
+        hit = _formula_cache.get(key)
+    if hit is not None:
+        return hit
+    results = evaluate()
+    with _formula_cache_lock:
+        if len(_formula_cache) >= _FORMULA_CACHE_SIZE:
+            _formula_cache.pop(next(iter(_formula_cache)))
+        _formula_cache[key] = results
+    return results
+
+
+@singleflight
+def get_specials_prices(simulations: int = 10000, ctx: SimulationContext = None, exact: bool = True, adaptive: bool = False,
+                        importance: bool = False) -> Dict:
+    """Return specials prices.
+
+    Continent specials are evaluated exactly by enumerating every 5-round
+    outcome. With exact=False they are sampled instead (`simulations` draws
+    per special, each from its own named stream of `ctx`); adaptive=True keeps
+    sampling in batches of `simulations` until each price settles, and
+    importance=True tilts the draws toward each (longshot) event.
+    """
     weights = _get_continent_weights()
     sims = int(simulations or 10000)
     markets = []
-    markets.append(no_europe_and_two_plus_oceania(weights=weights, iterations=sims, vig_bps=800))
-    markets.append(three_europe_one_asia_one_africa(weights=weights, iterations=sims, vig_bps=800))
+    markets.append(no_europe_and_two_plus_oceania(weights=weights, iterations=sims, vig_bps=800, ctx=ctx, exact=exact, adaptive=adaptive, importance=importance))
+    markets.append(three_europe_one_asia_one_africa(weights=weights, iterations=sims, vig_bps=800, ctx=ctx, exact=exact, adaptive=adaptive, importance=importance))
     markets.append(no_world_cup_winners(vig_bps=700))
     # Naresh markets intentionally excluded
     return {'markets': markets}
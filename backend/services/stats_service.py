@@ -19,6 +19,8 @@ def compute_player_stats(player_id: int) -> Optional[Dict]:
     try:
         upsert_player_stats(session, player_id, float(mean), float(stdev), float(variance), int(sample_size))
         session.commit()
+        from database.geo_repo import invalidate_geo_cache
+        invalidate_geo_cache('geo_players')
     except Exception:
         session.rollback()
     finally:
@@ -0,0 +1,8 @@
+-- Migration: add formula column to specials
+-- Rows with a formula (see backend/services/specials_dsl.py) are priced by the
+-- server on every read; rows without one keep serving their static odds.
+ALTER TABLE specials ADD COLUMN IF NOT EXISTS formula TEXT;
+
+-- Example formula rows
+-- UPDATE specials SET formula = 'count(Europe) == 0 and count(Oceania) >= 2' WHERE outcome = 'No Europe and 2+ Oceania';
+-- UPDATE specials SET formula = 'streak(Asia, 2)' WHERE outcome = 'Back-to-back Asia';
@@ -1,4 +1,8 @@
-import random
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.sim_context import default_context  # type: ignore
 
 # Continent probabilities
 continent_probs = {
@@ -15,8 +19,10 @@ total = sum(continent_probs.values())
 continents = list(continent_probs.keys())
 weights = [p / total for p in continent_probs.values()]
 
+rng = default_context().stream('steters:alleurope')
+
 def simulate_game(rounds=5):
-    picks = random.choices(continents, weights=weights, k=rounds)
+    picks = list(rng.choice(continents, size=rounds, p=weights))
     return all(c == "Europe" for c in picks)
 
 if __name__ == "__main__":
@@ -1,4 +1,8 @@
-import random
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.sim_context import default_context  # type: ignore
 
 # Continent probabilities
 continent_probs = {
@@ -15,9 +19,11 @@ total = sum(continent_probs.values())
 continents = list(continent_probs.keys())
 weights = [p / total for p in continent_probs.values()]
 
+rng = default_context().stream('steters:backtobackasia')
+
 def simulate_game():
     # Sample 5 rounds
-    rounds = random.choices(continents, weights=weights, k=5)
+    rounds = list(rng.choice(continents, size=5, p=weights))
     # Check for back-to-back Asia (pairs or triples)
     for i in range(4):
         if rounds[i] == "Asia" and rounds[i+1] == "Asia":
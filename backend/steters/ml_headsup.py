@@ -1,9 +1,15 @@
-import random
 import numpy as np
 from dataclasses import dataclass
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.sim_context import default_context  # type: ignore
 
 MAX_SCORE = 5000.0
 
+rng = default_context().stream('steters:ml_headsup')
+
 @dataclass
 class PlayerModel:
     name: str
@@ -12,7 +18,7 @@ class PlayerModel:
 
     def sample_round(self) -> float:
         # sample from normal, clamp between 0 and MAX_SCORE
-        x = np.random.normal(self.mean, self.std)
+        x = rng.normal(self.mean, self.std)
         return max(0.0, min(MAX_SCORE, x))
 
 def multiplier(round_num: int) -> float:
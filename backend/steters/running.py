@@ -170,7 +170,11 @@
 
 
 import numpy as np
-import random
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.sim_context import default_context  # type: ignore
 
 # Player distributions: mean and std dev
 players = {
@@ -180,12 +184,14 @@ players = {
     "Pam": (2600, 750)
 }
 
+rng = default_context().stream('steters:running')
+
 # Function to sample a player's score with cap at 5000
 def sample_score(name, mu, sigma):
-    score = np.random.normal(mu, sigma)
+    score = rng.normal(mu, sigma)
     if score > 5000:
         # Cap: replace with uniform between 4950 and 5000
-        score = random.uniform(4950, 5000)
+        score = rng.uniform(4950, 5000)
     print(f"Sampled score for {name}: {score:.2f}")
     return score
 
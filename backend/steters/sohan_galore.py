@@ -1,10 +1,16 @@
-import random
 import numpy as np
 from scipy.stats import beta
 from dataclasses import dataclass
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.sim_context import default_context  # type: ignore
 
 MAX_SCORE = 5000.0
 
+rng = default_context().stream('steters:sohan_galore')
+
 def fit_beta_params(mean: float, var: float, L: float = MAX_SCORE):
     m = mean / L
     v = var / (L**2)
@@ -31,16 +37,16 @@ class PlayerModel:
         return cls(name=name, mean=mean, std=std, p_easy=p_easy, p_cat=p_cat, a=a, b=b)
 
     def sample_round(self) -> float:
-        r = random.random()
+        r = rng.random()
         if r < self.p_easy:
-            return random.uniform(4950, 5000)
+            return rng.uniform(4950, 5000)
         elif r < self.p_easy + self.p_cat:
-            return random.uniform(0, 2000)
+            return rng.uniform(0, 2000)
         else:
-            y = beta.rvs(self.a, self.b)
+            y = beta.rvs(self.a, self.b, random_state=rng)
             x = float(y * MAX_SCORE)
             if x > MAX_SCORE:
-                x = random.uniform(4950, 5000)
+                x = rng.uniform(4950, 5000)
             return max(0.0, min(MAX_SCORE, x))
 
 def simulate_game(players, rounds=5):
@@ -1,4 +1,11 @@
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from services.sim_context import default_context  # type: ignore
+
+rng = default_context().stream('steters:zetamac/moneyline')
 
 # Player distributions
 players = {
@@ -16,8 +23,8 @@ def simulate_matchup(player1, player2, iterations=10000):
     wins_p2 = 0
 
     for _ in range(iterations):
-        score1 = np.random.normal(p1["mean"], p1["std_dev"])
-        score2 = np.random.normal(p2["mean"], p2["std_dev"])
+        score1 = rng.normal(p1["mean"], p1["std_dev"])
+        score2 = rng.normal(p2["mean"], p2["std_dev"])
         if score1 > score2:
             wins_p1 += 1
         elif score2 > score1:
@@ -0,0 +1,43 @@
+import numpy as np
+
+from services import adaptive_mc
+from utils.odds import american_distance_array, american_tier_array
+
+
+def test_wilson_interval_covers_estimate():
+    lo, hi = adaptive_mc.wilson_interval(np.array([0, 50, 100]), 100)
+    assert np.isclose(lo[0], 0.0) and hi[0] > 0.0
+    assert lo[1] < 0.5 < hi[1]
+    assert np.isclose(hi[2], 1.0)
+
+
+def test_tier_and_distance_helpers():
+    assert american_tier_array([-250, 450, -1500, 4000]).tolist() == [1, 5, 10, 100]
+    assert american_distance_array([-105], [105]).tolist() == [10]
+
+
+def test_longshot_market_stops_early_and_close_market_runs_longer():
+    rng = np.random.default_rng(11)
+
+    def longshots(size):
+        # three-way market with two deep longshots pinned at the +5000 cap
+        return {'win': rng.multinomial(size, [0.996, 0.002, 0.002])}
+
+    def coin_flip(size):
+        return {'win': rng.multinomial(size, [0.5, 0.5])}
+
+    easy = adaptive_mc.run_adaptive(longshots, scale=1.08, batch_size=5000, min_sims=5000, max_sims=200000)
+    hard = adaptive_mc.run_adaptive(coin_flip, scale=1.08, batch_size=5000, min_sims=5000, max_sims=200000)
+    assert easy['converged'] and easy['sims'] < hard['sims']
+    assert hard['sims'] == 200000 and not hard['converged']
+
+
+def test_price_moneylines_adaptive_reports_sims(monkeypatch):
+    import database.geo_repo as geo_repo
+    from services.pricing_service import price_moneylines
+    from test_simulation import PLAYERS
+
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: [dict(p) for p in PLAYERS])
+    res = price_moneylines(simulations=5000, adaptive=True, max_simulations=20000)
+    assert 5000 <= res['meta']['simulations'] <= 20000
+    assert len(res['classic']) == len(PLAYERS)
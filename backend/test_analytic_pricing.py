@@ -0,0 +1,36 @@
+import numpy as np
+
+from services import analytic_pricing, simulation
+from test_simulation import PLAYERS
+
+
+def test_round_pmf_is_a_distribution():
+    models = simulation.build_round_models(PLAYERS)
+    pmf = analytic_pricing.round_pmf(models)
+    assert pmf.shape == (4, 5000)
+    assert (pmf >= 0).all()
+    assert np.allclose(pmf.sum(axis=1), 1.0)
+
+
+def test_two_identical_players_split_evenly():
+    models = simulation.build_round_models([PLAYERS[0], dict(PLAYERS[0], player_id=9)])
+    probs = analytic_pricing.analytic_moneyline_probs(models)
+    assert np.allclose(probs['classic'], [0.5, 0.5])
+    assert np.allclose(probs['firstRound'], [0.5, 0.5])
+
+
+def test_analytic_matches_monte_carlo():
+    models = simulation.build_round_models(PLAYERS)
+    gaps = analytic_pricing.cross_check(models, sims=200000, rng=np.random.default_rng(3))
+    assert max(gaps.values()) < 0.006
+
+
+def test_price_moneylines_analytic_method(monkeypatch):
+    import database.geo_repo as geo_repo
+    from services.pricing_service import price_moneylines
+
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: [dict(p) for p in PLAYERS])
+    res = price_moneylines(margin_bps=800, method='analytic')
+    assert [e['player'] for e in res['classic']][0] == 'Sohan'
+    assert abs(sum(e['prob'] for e in res['classic']) - 1.08) < 1e-9
+    assert res['firstRound'] == res['lastRound']
@@ -0,0 +1,72 @@
+import time
+
+from services import board_daemon
+
+
+def _counting_jobs(calls):
+    def job():
+        calls.append(1)
+        return {'n': len(calls)}
+
+    def broken():
+        raise RuntimeError('boom')
+    return {'board': job, 'broken': broken}
+
+
+def test_refresh_publishes_new_snapshot_and_keeps_failed_jobs_out():
+    calls = []
+    daemon = board_daemon.BoardDaemon(jobs=_counting_jobs(calls), versions=lambda: (1, 1))
+    first = daemon.refresh()
+    assert daemon.get('board') == {'n': 1}
+    assert 'broken' in first.errors and daemon.get('broken') is None
+    second = daemon.refresh()
+    # readers holding the old snapshot keep a complete, unchanged board
+    assert first.markets['board'] == {'n': 1}
+    assert second.markets['board'] == {'n': 2}
+
+
+def test_reprices_on_data_version_change():
+    calls, version = [], [1]
+    daemon = board_daemon.BoardDaemon(jobs={'board': lambda: calls.append(1) or {}}, interval=3600, poll=0.01,
+                                      versions=lambda: (version[0],))
+    daemon.start()
+    try:
+        deadline = time.time() + 5
+        while not calls and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(calls) == 1
+        version[0] = 2
+        while len(calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(calls) == 2
+        assert daemon.snapshot.versions == (2,)
+    finally:
+        daemon.stop()
+
+
+def test_route_serves_snapshot(monkeypatch):
+    from app import create_app
+
+    daemon = board_daemon.BoardDaemon(jobs={'zetamac_moneylines': lambda: {'matchups': ['cached']}}, versions=lambda: ())
+    daemon.refresh()
+    monkeypatch.setattr(board_daemon, '_daemon', daemon)
+    client = create_app().test_client()
+    assert client.get('/api/zetamac/moneylines').get_json() == {'matchups': ['cached']}
+    status = client.get('/api/board/snapshot').get_json()
+    assert status['ready'] and status['markets'] == ['zetamac_moneylines']
+
+
+def test_daemon_only_starts_from_serving_entry_points(monkeypatch):
+    import multiprocessing
+    from app import create_app
+
+    monkeypatch.setenv('PRICING_DAEMON', '1')
+    monkeypatch.setattr(board_daemon, '_daemon', None)
+    create_app()
+    assert board_daemon.get_daemon() is None
+    assert board_daemon.daemon_enabled()
+
+    # spawned simulation pool workers never run their own daemon
+    monkeypatch.setattr(multiprocessing, 'parent_process', lambda: object())
+    assert not board_daemon.daemon_enabled()
+    assert board_daemon.start_daemon_if_enabled() is None and board_daemon.get_daemon() is None
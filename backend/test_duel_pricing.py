@@ -0,0 +1,83 @@
+import numpy as np
+
+from services import duel_pricing
+
+
+PLAYERS = [
+    {'player_id': 1, 'name': 'Sohan', 'mean_score': 16750.0, 'stddev_score': 4700.0},
+    {'player_id': 2, 'name': 'Pam', 'mean_score': 14550.0, 'stddev_score': 4950.0},
+    {'player_id': 3, 'name': 'Naresh', 'mean_score': 12400.0, 'stddev_score': 4800.0},
+]
+
+
+def test_multiplier_schedule():
+    assert [duel_pricing.multiplier(r) for r in range(1, 7)] == [1.0, 1.0, 1.0, 1.5, 2.0, 2.5]
+
+
+def test_deterministic_duel_ends_on_expected_round():
+    # left always scores 1000 more: 1000 x (1 + 1 + 1 + 1.5 + 2) reaches 6000 in round 5
+    mu, sd = np.array([3000.0, 2000.0]), np.zeros(2)
+    counts = duel_pricing.simulate_duels(mu, sd, [[0]], [[1]], sims=10, rng=np.random.default_rng(0))
+    assert counts['left'].tolist() == [10]
+    assert counts['rounds'][0, 5] == 10
+
+
+def test_price_duels_all_pairs():
+    res = duel_pricing.price_duels(simulations=20000, players=PLAYERS)
+    assert len(res['matchups']) == 3
+    for m in res['matchups']:
+        assert abs(m['player1_win'] + m['player2_win'] + m['unfinished'] - 1.0) < 1e-9
+        assert abs(sum(m['rounds'].values()) - 1.0) < 1e-9
+        assert m['player1_prob'] + m['player2_prob'] > 1.0
+    sohan_pam = res['matchups'][0]
+    assert 0.59 < sohan_pam['player1_win'] < 0.67
+    assert 3.5 < sohan_pam['expected_rounds'] < 5.5
+
+
+def test_team_matchups_cover_every_split():
+    assert duel_pricing.team_matchups(4) == [((0, 1), (2, 3)), ((0, 2), (1, 3)), ((0, 3), (1, 2))]
+    assert len(duel_pricing.team_matchups(5)) == 15
+
+
+def test_price_team_duels_shares_draws_across_partitions():
+    roster = [
+        {'player_id': 1, 'name': 'Sohan', 'mean_score': 15500.0, 'stddev_score': 1342.0},
+        {'player_id': 2, 'name': 'Pritesh', 'mean_score': 15250.0, 'stddev_score': 1677.0},
+        {'player_id': 3, 'name': 'Naresh', 'mean_score': 12000.0, 'stddev_score': 1789.0},
+        {'player_id': 4, 'name': 'Pam', 'mean_score': 13000.0, 'stddev_score': 1677.0},
+    ]
+    res = duel_pricing.price_team_duels(simulations=20000, players=roster)
+    by_teams = {(tuple(m['team1']), tuple(m['team2'])): m for m in res['matchups']}
+    assert len(by_teams) == 3
+    stacked = by_teams[(('Sohan', 'Pritesh'), ('Naresh', 'Pam'))]
+    split = by_teams[(('Sohan', 'Naresh'), ('Pritesh', 'Pam'))]
+    assert stacked['team1_win'] > 0.9
+    assert 0.3 < split['team1_win'] < 0.7
+    assert stacked['team1_american'].startswith('-')
+
+
+def test_duels_route_validates_and_clamps_simulations(monkeypatch):
+    from api import routes
+    from app import create_app
+
+    calls = []
+    monkeypatch.setattr(duel_pricing, 'price_duels', lambda **kw: calls.append(kw) or {'config': kw, 'matchups': []})
+    client = create_app().test_client()
+    assert client.get('/api/duels/prices?simulations=lots').status_code == 400
+    assert client.get('/api/duels/prices?simulations=0').status_code == 400
+    assert client.get('/api/duels/prices?simulations=100000000').status_code == 200
+    assert client.get('/api/duels/prices').status_code == 200
+    assert [c['simulations'] for c in calls] == [routes.MAX_SIMULATIONS, 20000]
+
+
+def test_team_duels_route_validates_and_clamps_simulations(monkeypatch):
+    from api import routes
+    from app import create_app
+
+    calls = []
+    monkeypatch.setattr(duel_pricing, 'price_team_duels', lambda **kw: calls.append(kw) or {'config': kw, 'matchups': []})
+    client = create_app().test_client()
+    assert client.get('/api/duels/teams/prices?simulations=1e9').status_code == 400
+    assert client.get('/api/duels/teams/prices?simulations=-5').status_code == 400
+    assert client.get('/api/duels/teams/prices?simulations=100000000').status_code == 200
+    assert [c['simulations'] for c in calls] == [routes.MAX_SIMULATIONS]
@@ -0,0 +1,57 @@
+import numpy as np
+
+from services import game_simulator
+from services.sim_context import SimulationContext
+from test_simulation import PLAYERS
+
+ROWS = [
+    {'country': 'France', 'continent': 'Europe', 'freq': 3.0},
+    {'country': 'Spain', 'continent': 'Europe', 'freq': 1.0},
+    {'country': 'Brazil', 'continent': 'South America', 'freq': 4.0},
+    {'country': 'Japan', 'continent': 'Asia', 'freq': 2.0},
+]
+
+
+def test_one_tensor_feeds_every_market():
+    res = game_simulator.price_board(sims=20000, players=PLAYERS, rows=ROWS, ctx=SimulationContext(seed=5))
+    assert set(res['markets']) == set(game_simulator.MARKETS)
+    winner = res['markets']['winner']
+    assert abs(sum(e['fair_prob'] for e in winner) - 1.0) < 0.01
+    assert sum(e['prob'] for e in winner) > 1.0
+    for r in range(1, 6):
+        book = [e for e in res['markets']['round_winner'] if e['group'] == f"round{r}"]
+        assert abs(sum(e['fair_prob'] for e in book) - 1.0) < 0.01
+
+
+def test_markets_agree_with_closed_forms():
+    game = game_simulator.simulate_game(players=PLAYERS, rows=ROWS, sims=50000, ctx=SimulationContext(seed=9))
+    specials = {e['key']: e['fair_prob'] for e in game_simulator.continent_specials_market(game)}
+    # Europe has p = 0.4 per round: "no Europe until round 4" is 0.6 ** 3
+    assert abs(specials['no_until_4:Europe'] - 0.6 ** 3) < 0.01
+    continents = {e['key']: e['fair_prob'] for e in game_simulator.continents_market(game)}
+    assert abs(continents['continent:Asia:0.5:over'] - (1 - 0.8 ** 5)) < 0.01
+    # a combo can never be likelier than either of its legs
+    wins = {e['player_id']: e['fair_prob'] for e in game_simulator.winner_market(game)}
+    for e in game_simulator.combos_market(game):
+        assert e['fair_prob'] <= wins[e['player_id']] + 1e-12
+
+
+def test_formula_combos_use_the_same_games():
+    game = game_simulator.simulate_game(players=PLAYERS, rows=ROWS, sims=5000, ctx=SimulationContext(seed=1))
+    rows = game_simulator.combos_market(game, formulas=['any(France) and total(Sohan) > 15000', 'nope('])
+    ok, bad = rows[-2], rows[-1]
+    expected = np.mean((game.draws == 0).any(axis=1) & (game.totals[:, game.names.index('Sohan')] > 15000))
+    assert ok['fair_prob'] == expected
+    assert 'error' in bad
+
+
+def test_board_route_validates_and_clamps_simulations(monkeypatch):
+    from api import routes
+    from app import create_app
+
+    calls = []
+    monkeypatch.setattr(game_simulator, 'price_board', lambda **kw: calls.append(kw) or {'config': {}, 'markets': {}})
+    client = create_app().test_client()
+    assert client.get('/api/board/prices?simulations=abc').status_code == 400
+    assert client.get('/api/board/prices?simulations=100000000').status_code == 200
+    assert [c['sims'] for c in calls] == [routes.MAX_SIMULATIONS]
@@ -0,0 +1,102 @@
+import database.geo_repo as geo_repo
+
+
+def _counting_fetch(rows):
+    calls = {'n': 0}
+
+    def fetch():
+        calls['n'] += 1
+        return [dict(r) for r in rows]
+
+    return fetch, calls
+
+
+def test_cached_rows_skip_network_until_invalidated(monkeypatch):
+    rows = [{'player_id': 1, 'name': 'Pam', 'mean_score': 14880.0, 'stddev_score': 2400.0}]
+    fetch, calls = _counting_fetch(rows)
+    monkeypatch.setattr(geo_repo, '_fetch_geo_players', fetch)
+    geo_repo.invalidate_geo_cache('geo_players')
+
+    first = geo_repo.get_geo_players()
+    geo_repo.get_geo_players()
+    assert calls['n'] == 1
+    assert first == rows
+
+    # callers get copies, not the cached dicts
+    first[0]['name'] = 'mutated'
+    assert geo_repo.get_geo_players()[0]['name'] == 'Pam'
+
+    before = geo_repo.get_data_version('geo_players')
+    after = geo_repo.invalidate_geo_cache('geo_players')
+    assert after > before
+    geo_repo.get_geo_players()
+    assert calls['n'] == 2
+
+
+def test_ttl_expiry_bumps_version_only_on_change(monkeypatch):
+    rows = [{'id': 1, 'country': 'France', 'freq': 3.1, 'continent': 'Europe'}]
+    fetch, calls = _counting_fetch(rows)
+    monkeypatch.setattr(geo_repo, '_fetch_geo_countries', fetch)
+    monkeypatch.setattr(geo_repo, 'GEO_CACHE_TTL', 0.0)
+    geo_repo.invalidate_geo_cache('geo_countries')
+
+    geo_repo.get_geo_countries()
+    v1 = geo_repo.get_data_version('geo_countries')
+    geo_repo.get_geo_countries()
+    assert calls['n'] == 2
+    assert geo_repo.get_data_version('geo_countries') == v1
+
+    rows[0]['freq'] = 3.5
+    geo_repo.get_geo_countries()
+    assert geo_repo.get_data_version('geo_countries') > v1
+
+
+def test_invalidate_route_requires_authorization(monkeypatch):
+    from api import routes
+    from app import create_app
+
+    client = create_app().test_client()
+    version = geo_repo.get_data_version()
+    assert client.post('/api/geo/cache/invalidate', json={}).status_code == 401
+    assert geo_repo.get_data_version() == version
+
+    monkeypatch.setattr(routes, '_get_user_from_header', lambda req: 'user-1')
+    res = client.post('/api/geo/cache/invalidate', json={'table': 'geo_players'})
+    assert res.status_code == 200 and res.get_json()['data_version'] > version
+
+
+def test_fetch_straddling_invalidate_is_not_cached(monkeypatch):
+    rows = [{'player_id': 1, 'name': 'Pam', 'mean_score': 14880.0, 'stddev_score': 2400.0}]
+    calls = {'n': 0}
+
+    def fetch():
+        calls['n'] += 1
+        snapshot = [dict(r) for r in rows]
+        if calls['n'] == 1:
+            # the write commits and invalidates while this read is in flight
+            rows[0]['mean_score'] = 16000.0
+            geo_repo.invalidate_geo_cache('geo_players')
+        return snapshot
+    monkeypatch.setattr(geo_repo, '_fetch_geo_players', fetch)
+    geo_repo.invalidate_geo_cache('geo_players')
+
+    assert geo_repo.get_geo_players()[0]['mean_score'] == 14880.0
+    version = geo_repo.get_data_version('geo_players')
+    # the pre-write rows were not cached, so the next read fetches the new ones
+    assert geo_repo.get_geo_players()[0]['mean_score'] == 16000.0
+    assert calls['n'] == 2
+    assert geo_repo.get_data_version('geo_players') > version
+
+
+def test_current_version_refreshes_expired_entry(monkeypatch):
+    rows = [{'player_id': 1, 'name': 'Pam', 'mean_score': 14880.0, 'stddev_score': 2400.0}]
+    fetch, calls = _counting_fetch(rows)
+    monkeypatch.setattr(geo_repo, '_fetch_geo_players', fetch)
+    geo_repo.invalidate_geo_cache('geo_players')
+
+    version = geo_repo.current_version('geo_players')
+    assert calls['n'] == 1 and geo_repo.current_version('geo_players') == version and calls['n'] == 1
+    rows[0]['mean_score'] = 15500.0
+    monkeypatch.setattr(geo_repo, 'GEO_CACHE_TTL', 0.0)
+    assert geo_repo.current_version('geo_players') > version
+    geo_repo.invalidate_geo_cache('geo_players')
@@ -0,0 +1,39 @@
+import numpy as np
+from scipy.stats import norm
+
+from services import importance_sampling, specials_pricing
+from services.monte_carlo import monte_carlo_probs
+
+
+WEIGHTS = {'Europe': 0.588, 'Asia': 0.132, 'South America': 0.09, 'Africa': 0.067, 'North America': 0.06, 'Oceania': 0.04766}
+
+
+def _no_europe_two_oceania(draws):
+    return 'Europe' not in draws and draws.count('Oceania') >= 2
+
+
+def test_continent_longshot_has_small_relative_error():
+    exact = specials_pricing._exact_continent_event(_no_europe_two_oceania, WEIGHTS)
+    assert exact < 0.01
+    res = importance_sampling.importance_continent_event(_no_europe_two_oceania, WEIGHTS, iterations=5000,
+                                                         rng=np.random.default_rng(3))
+    assert res['rel_error'] < 0.05
+    assert abs(res['prob'] - exact) < 4 * res['stderr']
+    # naive sampling with the same budget is far noisier
+    naive = [specials_pricing._sample_continent_event(_no_europe_two_oceania, WEIGHTS, 5000, rng=np.random.default_rng(s))
+             for s in range(8)]
+    assert np.std(naive) > 3 * res['stderr']
+
+
+def test_normal_tail_matches_closed_form():
+    res = importance_sampling.importance_normal_tail(14000.0, 3000.0, 24000.0, trials=5000, rng=np.random.default_rng(1))
+    exact = norm.sf(24000.0, 14000.0, 3000.0)
+    assert abs(res['over'] - exact) / exact < 0.1
+    low = importance_sampling.importance_normal_tail(14000.0, 3000.0, 5000.0, trials=5000, rng=np.random.default_rng(2))
+    assert abs(low['under'] - norm.cdf(5000.0, 14000.0, 3000.0)) / norm.cdf(5000.0, 14000.0, 3000.0) < 0.1
+
+
+def test_monte_carlo_probs_importance_mode():
+    values = [12000.0, 15000.0, 18000.0]
+    out = monte_carlo_probs(values, [26000.0], trials=4000, rng=np.random.default_rng(0), importance=True)
+    assert 0.0 < out[26000.0]['over'] < 0.01
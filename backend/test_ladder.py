@@ -0,0 +1,47 @@
+import numpy as np
+
+from services import pricing_service
+from utils.odds import decimal_to_american_rounded, american_to_decimal
+
+
+def _scalar_entry(mu, sigma, t, margin_bps):
+    # the original per-threshold chain the ladder kernel replaces
+    p_over = max(0.0, 1.0 - pricing_service.normal_cdf(t, mu, sigma))
+    p_over_adj, p_under_adj = pricing_service.apply_margin(p_over, 1.0 - p_over, margin_bps)
+    a_over = decimal_to_american_rounded(pricing_service.prob_to_decimal(p_over_adj), prob=p_over_adj)
+    a_under = decimal_to_american_rounded(pricing_service.prob_to_decimal(p_under_adj), prob=p_under_adj)
+    return p_over_adj, p_under_adj, a_over, a_under
+
+
+def test_ladder_matches_scalar_pricing_chain():
+    mu = np.array([9000.0, 14880.0, 16500.0, 21000.0])
+    sigma = np.array([0.0, 2400.0, 2092.0, 4800.0])
+    thresholds = np.arange(7500, 23001, 500, dtype=float)
+    ladder = pricing_service.price_ladder(mu[:, None], sigma[:, None], thresholds[None, :], 700)
+    assert ladder['prob_over'].shape == (4, len(thresholds))
+
+    for i in range(len(mu)):
+        for j, t in enumerate(thresholds):
+            p_over, p_under, a_over, a_under = _scalar_entry(mu[i], sigma[i], t, 700)
+            assert abs(ladder['prob_over'][i, j] - p_over) < 1e-12
+            assert abs(ladder['prob_under'][i, j] - p_under) < 1e-12
+            assert str(ladder['american_over'][i, j]) == a_over.replace('+', '')
+            assert str(ladder['american_under'][i, j]) == a_under.replace('+', '')
+            assert ladder['rounded_decimal_over'][i, j] == american_to_decimal(int(a_over))
+
+
+def test_missing_stats_price_even_money():
+    ladder = pricing_service.price_ladder(np.array([np.nan]), np.array([0.0]), np.array([12000.0]), 0)
+    assert ladder['prob_over'][0] == 0.5 and ladder['prob_under'][0] == 0.5
+
+
+def test_price_for_thresholds_shape(monkeypatch):
+    import database.geo_repo as geo_repo
+
+    rows = [{'player_id': 1, 'mean_score': 14880.0, 'stddev_score': 2400.0}]
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: rows)
+    res = pricing_service.price_for_thresholds([1, 2], [10000, 15000], margin_bps=500)
+    assert set(res.keys()) == {1, 2}
+    assert set(res[1].keys()) == {10000, 15000}
+    assert res[2][10000]['prob_over'] == res[2][10000]['prob_under']
+    assert isinstance(res[1][15000]['odds_over_american'], str)
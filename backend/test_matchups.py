@@ -0,0 +1,71 @@
+import math
+
+import numpy as np
+
+from services import matchups
+from test_simulation import PLAYERS
+
+
+def test_normal_matrix_matches_pairwise_formula():
+    mu, sd = [80.0, 95.0, 70.0], [6.0, 5.0, 0.0]
+    m = matchups.normal_superiority_matrix(mu, sd)
+    z = (80.0 - 95.0) / math.sqrt(36.0 + 25.0)
+    assert abs(m[0, 1] - 0.5 * (1 + math.erf(z / math.sqrt(2)))) < 1e-12
+    assert np.allclose(m + m.T, 1.0)
+    assert np.allclose(np.diag(m), 0.5)
+
+
+def test_zetamac_pairs_in_combinations_order():
+    players = [{'player_id': i, 'name': f"P{i}", 'mean': 60.0 + 5 * i, 'std_dev': 6.0} for i in range(4)]
+    res = matchups.zetamac_matchups(players)
+    assert [(m['player1_id'], m['player2_id']) for m in res['matchups']] == [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+    assert all(m['player1_prob'] + m['player2_prob'] > 1.0 for m in res['matchups'])
+
+
+def test_exact_geoguessr_agrees_with_simulation():
+    from services.simulation import build_round_models, sample_round_scores
+
+    exact = matchups.exact_total_superiority(PLAYERS)
+    totals = sample_round_scores(build_round_models(PLAYERS), 100000, rng=np.random.default_rng(4)).sum(axis=1)
+    mc = (totals[:, :, None] > totals[:, None, :]).mean(axis=0)
+    off = ~np.eye(len(PLAYERS), dtype=bool)
+    assert np.max(np.abs(exact - mc)[off]) < 0.01
+
+
+def test_large_roster_is_priced_once_and_cached(monkeypatch):
+    builds = []
+    price_pairs = matchups.price_pairs
+
+    def counting(*args, **kwargs):
+        builds.append(1)
+        return price_pairs(*args, **kwargs)
+    monkeypatch.setattr(matchups, 'price_pairs', counting)
+    players = [{'player_id': i, 'name': f"P{i}", 'mean': 50.0 + (i % 17), 'std_dev': 4.0 + (i % 5)} for i in range(200)]
+    first = matchups.zetamac_matchups(players)
+    assert len(first['matchups']) == 200 * 199 // 2
+    assert matchups.zetamac_matchups(players) is first
+    assert len(builds) == 1
+
+
+def test_outright_quadrature_matches_simulation():
+    mu, sd = np.array([80.0, 95.0, 70.0, 90.0]), np.array([6.0, 5.0, 8.0, 12.0])
+    draws = np.random.default_rng(2).normal(mu, sd, size=(400000, 4))
+    mc = np.bincount(draws.argmax(axis=1), minlength=4) / 400000.0
+    probs = matchups.normal_win_probs(mu, sd)
+    assert abs(probs.sum() - 1.0) < 1e-12
+    assert np.max(np.abs(probs - mc)) < 0.003
+    # a zero-variance player is a point mass
+    assert matchups.normal_win_probs([10.0, 0.0], [0.0, 1.0])[0] > 0.999
+
+
+def test_outright_withdraws_locked_players_but_keeps_them_in_the_book():
+    players = [
+        {'player_id': 1, 'name': 'Pam', 'mean': 80.0, 'std_dev': 6.0, 'lock': False},
+        {'player_id': 2, 'name': 'Sohan', 'mean': 95.0, 'std_dev': 5.0, 'lock': True},
+        {'player_id': 3, 'name': 'Naresh', 'mean': 70.0, 'std_dev': 8.0, 'lock': False},
+    ]
+    full = matchups.zetamac_outright(players, margin_bps=800, include_locked=True)
+    assert abs(sum(p['prob'] for p in full['players']) - 1.08) < 1e-9
+    offered = matchups.zetamac_outright(players, margin_bps=800)
+    assert [p['player_id'] for p in offered['players']] == [1, 3]
+    assert offered['players'][0]['fair_prob'] < 0.1
@@ -45,3 +45,25 @@ def test_prob_0_9996_caps_to_minus_200000():
     d = prob_to_decimal(p)
     a = decimal_to_american_rounded(d, prob=p)
     assert a == "-200000"
+
+
+def test_array_conversion_matches_scalar_rules():
+    import numpy as np
+    from utils.odds import decimal_to_american_array, american_strings
+
+    probs = np.concatenate([np.linspace(0.0005, 0.9999, 4000), [0.01, 0.0199, 0.9996, 1.05, 1.1, 1.2]])
+    decs = [prob_to_decimal(float(p)) for p in probs]
+    expected = [decimal_to_american_rounded(d, prob=float(p)) for d, p in zip(decs, probs)]
+    assert american_strings(decimal_to_american_array(decs, prob=probs)) == expected
+
+    raw_decs = [0.0, -1.0, 1.0, 1.000001, 1.5, 2.0, 3.333, 51.0, 120.0, float('inf')]
+    expected = [decimal_to_american_rounded(d) for d in raw_decs]
+    assert american_strings(decimal_to_american_array(raw_decs)) == expected
+
+
+def test_american_to_decimal_lookup_matches_scalar():
+    import numpy as np
+    from utils.odds import american_to_decimal, american_to_decimal_array
+
+    values = np.array([-500000, -200000, -1250, -110, -100, 0, 100, 346, 3500, 5000, 7000, -900000])
+    assert american_to_decimal_array(values).tolist() == [american_to_decimal(int(v)) for v in values]
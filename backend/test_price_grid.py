@@ -0,0 +1,100 @@
+import pytest
+
+from services import price_grid
+from services.pricing_service import apply_margin, decimal_to_american, normal_cdf, prob_to_decimal
+from test_simulation import PLAYERS
+
+
+def _scalar_quote(row, threshold, margin_bps):
+    """The per-request computation /api/geoguessr/price used before the grid."""
+    if row.get('mean_score') is None:
+        p_over = 0.5
+    else:
+        p_over = max(0.0, 1.0 - normal_cdf(threshold, float(row['mean_score']), float(row.get('stddev_score') or 0)))
+    p_over_adj, p_under_adj = apply_margin(p_over, 1.0 - p_over, margin_bps=margin_bps)
+    d_over, d_under = prob_to_decimal(p_over_adj), prob_to_decimal(p_under_adj)
+    return {
+        'prob_over': p_over_adj,
+        'prob_under': p_under_adj,
+        'odds_over_decimal': d_over,
+        'odds_under_decimal': d_under,
+        'odds_over_american': decimal_to_american(d_over, prob=p_over_adj),
+        'odds_under_american': decimal_to_american(d_under, prob=p_under_adj),
+    }
+
+
+def test_grid_and_fallback_match_scalar_pricing():
+    rows = [dict(p) for p in PLAYERS] + [{'player_id': 99, 'name': 'New', 'mean_score': None, 'stddev_score': None}]
+    grid = price_grid.build_grid(rows, version=1)
+    for row in rows:
+        # on-grid (every ladder rung at both margins) and off-grid threshold / margin
+        for threshold, bps in [(t, m) for t in price_grid.TOTAL_THRESHOLDS for m in price_grid.GRID_MARGINS] + [(15123, 700), (15000, 640)]:
+            got = grid.quote(row['player_id'], threshold, bps)
+            want = _scalar_quote(row, threshold, bps)
+            assert got['odds_over_american'] == want['odds_over_american']
+            assert got['odds_under_american'] == want['odds_under_american']
+            for k in ('prob_over', 'prob_under', 'odds_over_decimal', 'odds_under_decimal'):
+                assert got[k] == pytest.approx(want[k], rel=1e-12)
+    assert grid.quote(12345, 15000) is None
+    with pytest.raises(ValueError):
+        grid.quote(rows[0]['player_id'], 15000, market='nope')
+
+
+def test_first_guess_ladder_matches_first_guess_pricing(monkeypatch):
+    from database import geo_repo
+    from services.pricing_service import price_first_guess_thresholds
+
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: [dict(p) for p in PLAYERS])
+    ids = [p['player_id'] for p in PLAYERS]
+    want = price_first_guess_thresholds(ids, margin_bps=700)
+    grid = price_grid.build_grid(PLAYERS)
+    for pid in ids:
+        for t in price_grid.FIRST_GUESS_THRESHOLDS:
+            got = grid.quote(pid, t, 700, market='first_guess')
+            # the ladder endpoints report the decimal implied by the rounded American price
+            for k in ('prob_over', 'prob_under', 'odds_over_american', 'odds_under_american'):
+                assert got[k] == want[pid][t][k]
+
+
+def test_grid_rebuilds_only_when_data_version_changes(monkeypatch):
+    from database import geo_repo
+
+    state = {'version': 5, 'rows': [dict(p) for p in PLAYERS], 'reads': 0}
+
+    def get_geo_players():
+        state['reads'] += 1
+        return state['rows']
+    monkeypatch.setattr(geo_repo, 'get_geo_players', get_geo_players)
+    monkeypatch.setattr(geo_repo, 'current_version', lambda table: state['version'])
+    monkeypatch.setattr(price_grid, '_grid', None)
+
+    first = price_grid.get_grid()
+    assert price_grid.get_grid() is first
+    # quotes on an unchanged version never touch the player rows
+    price_grid.quote(PLAYERS[0]['player_id'], 15000)
+    assert state['reads'] == 1
+    pid = PLAYERS[0]['player_id']
+    state['rows'] = [dict(p, mean_score=p['mean_score'] + 2000) if p['player_id'] == pid else dict(p) for p in PLAYERS]
+    state['version'] = 6
+    rebuilt = price_grid.get_grid()
+    assert rebuilt is not first and rebuilt.version == 6
+    assert rebuilt.quote(pid, 15000)['prob_over'] > first.quote(pid, 15000)['prob_over']
+
+
+def test_grid_follows_ttl_expiry_without_outside_reads(monkeypatch):
+    from database import geo_repo
+
+    rows = [dict(p) for p in PLAYERS]
+    monkeypatch.setattr(geo_repo, '_fetch_geo_players', lambda: [dict(p) for p in rows])
+    monkeypatch.setattr(geo_repo, 'GEO_CACHE_TTL', 60.0)
+    monkeypatch.setattr(price_grid, '_grid', None)
+    geo_repo.invalidate_geo_cache('geo_players')
+    pid = rows[0]['player_id']
+
+    before = price_grid.quote(pid, 15000)
+    rows[0]['mean_score'] += 6000
+    assert price_grid.quote(pid, 15000) == before
+    # once the entry expires the next quote re-fetches and reprices on its own
+    monkeypatch.setattr(geo_repo, 'GEO_CACHE_TTL', 0.0)
+    assert price_grid.quote(pid, 15000)['prob_over'] > before['prob_over']
+    geo_repo.invalidate_geo_cache('geo_players')
@@ -0,0 +1,115 @@
+from services.repricer import Repricer
+from test_simulation import PLAYERS
+
+ZETAMAC = [
+    {'player_id': 1, 'name': 'Pam', 'mean': 80.0, 'std_dev': 6.0},
+    {'player_id': 2, 'name': 'Sohan', 'mean': 95.0, 'std_dev': 5.0},
+    {'player_id': 3, 'name': 'Naresh', 'mean': 70.0, 'std_dev': 8.0},
+]
+
+
+def _primed():
+    rep = Repricer()
+    rep.sync('geo_players', PLAYERS)
+    rep.sync('zetamac_players', ZETAMAC)
+    return rep
+
+
+def test_unchanged_rows_reprice_nothing():
+    rep = _primed()
+    diff = rep.sync('zetamac_players', [dict(r, lock=True) for r in ZETAMAC])
+    assert diff['players'] == [] and diff['changes'] == []
+
+
+def test_zetamac_edit_touches_only_that_player():
+    rep = _primed()
+    diff = rep.update('zetamac_players', dict(ZETAMAC[0], mean=90.0))
+    assert diff['players'] == [1]
+    keys = {(c['market'],) + tuple(c['key']) for c in diff['changes']}
+    assert ('zetamac_h2h', 1, 2) in keys and ('zetamac_h2h', 1, 3) in keys
+    assert ('zetamac_h2h', 2, 3) not in keys
+    assert all(k[1] == 1 for k in keys if k[0] == 'zetamac_total')
+    assert not any(k[0].startswith('geo') for k in keys)
+
+
+def test_geo_edit_reprices_ladder_and_winner_books():
+    rep = _primed()
+    before = rep.board('geo_total')
+    row = dict(PLAYERS[0], mean_score=PLAYERS[0]['mean_score'] + 1500)
+    diff = rep.update('geo_players', row)
+    markets = {c['market'] for c in diff['changes']}
+    assert markets == {'geo_total', 'geo_first_guess', 'geo_moneyline'}
+    pid = PLAYERS[0]['player_id']
+    assert all(c['key'][0] == pid for c in diff['changes'] if c['market'] in ('geo_total', 'geo_first_guess'))
+    after = rep.board('geo_total')
+    assert all(after[k] == v for k, v in before.items() if k[1] != pid)
+
+
+def test_removed_player_withdraws_quotes():
+    rep = _primed()
+    diff = rep.sync('zetamac_players', ZETAMAC[:2])
+    withdrawn = [c for c in diff['changes'] if c['after'] is None]
+    assert withdrawn and all(3 in c['key'] for c in withdrawn)
+    assert not any(3 in k[1:] for k in rep.board('zetamac_h2h'))
+
+
+def test_partial_update_merges_into_stored_row():
+    rep = _primed()
+    pid = PLAYERS[0]['player_id']
+    rep.update('geo_players', {'player_id': pid, 'mean_score': PLAYERS[0]['mean_score'] + 500})
+    stored = rep.rows['geo_players'][pid]
+    assert stored['stddev_score'] == PLAYERS[0]['stddev_score'] and stored['name'] == PLAYERS[0]['name']
+
+
+def test_concurrent_updates_keep_both_edits():
+    import threading
+
+    rep = _primed()
+    start = threading.Barrier(2)
+
+    def edit(column, value):
+        start.wait()
+        rep.update('zetamac_players', {'player_id': 1, column: value})
+    threads = [threading.Thread(target=edit, args=('mean', 85.0)), threading.Thread(target=edit, args=('std_dev', 4.0))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert rep.rows['zetamac_players'][1]['mean'] == 85.0 and rep.rows['zetamac_players'][1]['std_dev'] == 4.0
+
+
+def test_moneyline_quotes_match_the_served_board(monkeypatch):
+    from database import geo_repo
+    from services.pricing_service import price_moneylines
+
+    rep = _primed()
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: [dict(p) for p in PLAYERS])
+    served = price_moneylines(simulations=5000, margin_bps=850)
+    board = rep.board('geo_moneyline')
+    for market in ('classic', 'firstRound', 'lastRound'):
+        for e in served[market]:
+            assert board[('geo_moneyline', market, e['player_id'])]['american'] == e['american']
+
+
+def test_reprice_route_persists_the_row(monkeypatch):
+    from api import routes
+    from app import create_app
+    from database import geo_repo
+    from services import repricer
+
+    rep = _primed()
+    written = []
+
+    def update_player_row(table, row):
+        written.append((table, row))
+        return dict(rep.rows[table][row['player_id']], **row)
+    monkeypatch.setattr(repricer, '_repricer', rep)
+    monkeypatch.setattr(geo_repo, 'update_player_row', update_player_row)
+    client = create_app().test_client()
+    body = {'table': 'zetamac_players', 'row': {'player_id': 2, 'mean': 99.0}}
+    assert client.post('/api/pricing/reprice', json=body).status_code == 401
+
+    monkeypatch.setattr(routes, '_get_user_from_header', lambda req: 'user-1')
+    diff = client.post('/api/pricing/reprice', json=body).get_json()
+    assert written == [('zetamac_players', {'player_id': 2, 'mean': 99.0})]
+    assert diff['players'] == [2] and rep.rows['zetamac_players'][2]['std_dev'] == 5.0
@@ -0,0 +1,67 @@
+import numpy as np
+
+from services import round_markets, simulation
+from test_simulation import PLAYERS
+
+
+def _market(entry, name):
+    return next(m for m in entry['markets'] if m['market'] == name)
+
+
+def test_round_counts_match_simulated_games():
+    res = round_markets.round_count_markets(players=PLAYERS, triple_sims=0)
+    models = simulation.build_round_models(PLAYERS)
+    scores = simulation.sample_round_scores(models, 100000, rng=np.random.default_rng(5))
+    wins = simulation.max_hits(scores).sum(axis=1)
+    for i, entry in enumerate(res['players']):
+        assert abs(sum(_market(entry, 'exactly_%d' % k)['fair_prob'] for k in range(6)) - 1.0) < 1e-12
+        assert abs(_market(entry, 'at_least_3')['fair_prob'] - np.mean(wins[:, i] >= 3)) < 0.006
+        assert abs(_market(entry, 'first_and_last')['fair_prob'] - entry['round_win_prob'] ** 2) < 1e-12
+
+
+def test_round_win_table_is_cached(monkeypatch):
+    from services import analytic_pricing
+
+    calls = []
+    round_win_probs = analytic_pricing.round_win_probs
+
+    def counting(models):
+        calls.append(1)
+        return round_win_probs(models)
+    monkeypatch.setattr(analytic_pricing, 'round_win_probs', counting)
+    players = [dict(p, mean_score=p['mean_score'] + 1.0) for p in PLAYERS]
+    first = round_markets.round_win_table(players)
+    assert all(round_markets.round_win_table(players) is first for _ in range(100))
+    assert len(calls) == 1
+
+
+def test_triple_market_below_first_and_last():
+    res = round_markets.round_count_markets(players=PLAYERS, triple_sims=20000)
+    for entry in res['players']:
+        triple = _market(entry, 'first_last_overall')
+        assert 0 < triple['fair_prob'] <= _market(entry, 'first_and_last')['fair_prob'] + 0.01
+    rows = round_markets.round_count_specials(players=PLAYERS)
+    assert len(rows) == 3 * len(PLAYERS)
+    assert all(r['odds'] and r['outcome'] for r in rows)
+
+
+def test_priced_markets_cached_per_version_margin_and_seed(monkeypatch):
+    from services.sim_context import SimulationContext
+
+    calls = []
+    triple = round_markets.first_last_overall_probs
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return triple(*args, **kwargs)
+    monkeypatch.setattr(round_markets, 'first_last_overall_probs', counting)
+    players = [dict(p, mean_score=p['mean_score'] + 2.0) for p in PLAYERS]
+    first = round_markets.round_count_specials(players=players)
+    assert all(round_markets.round_count_specials(players=players) == first for _ in range(20))
+    assert len(calls) == 1
+    round_markets.round_count_markets(players=players, margin_bps=500)
+    round_markets.round_count_markets(players=players, ctx=SimulationContext(seed=7))
+    assert len(calls) == 3
+    # a roster change prices afresh
+    round_markets.round_count_specials(players=[dict(p, mean_score=p['mean_score'] + 3.0) for p in PLAYERS])
+    assert len(calls) == 4
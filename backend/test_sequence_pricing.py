@@ -0,0 +1,40 @@
+import numpy as np
+
+from services import sequence_pricing, specials_pricing
+
+
+WEIGHTS = {'Europe': 0.35, 'Asia': 0.2, 'Africa': 0.1, 'North America': 0.15, 'South America': 0.1, 'Oceania': 0.1}
+
+
+def _enumerate(cond):
+    return specials_pricing._exact_continent_event(cond, WEIGHTS, ordered=True)
+
+
+def _has_run(draws, k, continent=None):
+    run = 0
+    for i, d in enumerate(draws):
+        run = run + 1 if i and d == draws[i - 1] else 1
+        if run >= k and (continent is None or d == continent):
+            return True
+    return False
+
+
+def test_runs_match_full_enumeration():
+    assert np.isclose(sequence_pricing.run_probability(WEIGHTS, 2, 'Asia'), _enumerate(lambda d: _has_run(d, 2, 'Asia')))
+    assert np.isclose(sequence_pricing.run_probability(WEIGHTS, 3), _enumerate(lambda d: _has_run(d, 3)))
+    assert np.isclose(sequence_pricing.run_probability(WEIGHTS, 1, 'Europe'), 1 - 0.65 ** 5)
+
+
+def test_absent_until_and_longest_run():
+    assert np.isclose(sequence_pricing.absent_until_probability(WEIGHTS, 'Europe', 4), 0.65 ** 3)
+    dist = sequence_pricing.longest_run_distribution(WEIGHTS)
+    assert len(dist) == 5 and np.isclose(sum(dist), 1.0)
+    assert np.isclose(dist[-1], sum(p ** 5 for p in WEIGHTS.values()))
+
+
+def test_sequence_markets_are_priced():
+    conts = [{'continent': c, 'p': p} for c, p in WEIGHTS.items()]
+    rows = sequence_pricing.sequence_markets(conts)
+    assert len(rows) == 2 * len(WEIGHTS) + 1
+    b2b = next(r for r in rows if r['key'] == 'back_to_back:Asia')
+    assert b2b['prob'] > b2b['fairProb'] and b2b['oddsAmerican'].startswith('+')
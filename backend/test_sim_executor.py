@@ -0,0 +1,55 @@
+import numpy as np
+
+from services import sim_executor
+from services.sim_context import SimulationContext
+from services.simulation import build_round_models
+from test_duel_pricing import PLAYERS as DUEL_PLAYERS
+from test_simulation import PLAYERS
+
+
+def test_split_sims_covers_every_simulation():
+    assert sim_executor.split_sims(10, 3) == [4, 3, 3]
+    assert sim_executor.split_sims(2, 8) == [1, 1]
+
+
+def test_pool_matches_in_process_shards_for_any_worker_count():
+    models = build_round_models(PLAYERS)
+    ctx = SimulationContext(seed=11)
+    pooled = sim_executor.parallel_moneyline_counts(models, 6000, ctx, workers=2)
+    serial = sim_executor.parallel_moneyline_counts(models, 6000, ctx, workers=5, parallel=False)
+    for key in ('classic', 'firstRound', 'lastRound'):
+        assert pooled[key].tolist() == serial[key].tolist()
+        assert pooled[key].sum() >= 6000
+
+
+def test_parallel_duels_reduce_counts():
+    from services.duel_pricing import round_params
+
+    mu, sd = round_params(DUEL_PLAYERS)
+    counts = sim_executor.parallel_duel_counts(mu, sd, [[0], [0]], [[1], [2]], 4000, SimulationContext(seed=3),
+                                               'duels', workers=2)
+    total = counts['left'] + counts['right'] + counts['unfinished']
+    assert total.tolist() == [4000, 4000]
+    assert counts['rounds'].sum(axis=1).tolist() == [4000, 4000]
+    assert np.all(counts['left'] > counts['right'])
+
+
+def test_pools_are_kept_per_worker_count():
+    small = sim_executor.get_executor(1)
+    other = sim_executor.get_executor(2)
+    assert other is not small and sim_executor.get_executor(1) is small
+    # asking for another size leaves the first pool accepting work
+    assert small.submit(sum, [1, 2]).result() == 3
+
+
+def test_pooled_and_in_process_prices_agree(monkeypatch):
+    import database.geo_repo as geo_repo
+    from services.duel_pricing import price_duels
+    from services.pricing_service import price_moneylines
+
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: [dict(p) for p in PLAYERS])
+    ctx = SimulationContext(seed=5)
+    assert price_moneylines(simulations=4000, ctx=ctx, parallel=True, workers=2) == \
+        price_moneylines(simulations=4000, ctx=ctx, parallel=False)
+    assert price_duels(simulations=3000, players=DUEL_PLAYERS, ctx=ctx, parallel=True, workers=2) == \
+        price_duels(simulations=3000, players=DUEL_PLAYERS, ctx=ctx, parallel=False)
@@ -0,0 +1,108 @@
+import time
+
+import numpy as np
+
+from services import simulation
+
+
+PLAYERS = [
+    {'player_id': 1, 'name': 'Pam', 'mean_score': 14880.0, 'stddev_score': 2400.0},
+    {'player_id': 2, 'name': 'Sohan', 'mean_score': 16500.0, 'stddev_score': 2092.0},
+    {'player_id': 3, 'name': 'Pritesh', 'mean_score': 15111.0, 'stddev_score': 2900.0},
+    {'player_id': 4, 'name': 'Naresh', 'mean_score': 12400.0, 'stddev_score': 4800.0},
+]
+
+
+def test_score_tensor_shape_and_bounds():
+    models = simulation.build_round_models(PLAYERS)
+    scores = simulation.sample_round_scores(models, 2000, rng=np.random.default_rng(1))
+    assert scores.shape == (2000, 5, 4)
+    assert scores.min() >= 0.0 and scores.max() <= 5000.0
+    # per-round means should land near the player's game mean / 5
+    means = scores.mean(axis=(0, 1))
+    assert abs(means[1] - means[3]) > 500
+
+
+def test_count_winners_counts_ties_for_every_player():
+    scores = np.array([[[10.0, 10.0], [3.0, 1.0]]])
+    counts = simulation.count_winners(scores)
+    assert counts['firstRound'].tolist() == [1, 1]
+    assert counts['lastRound'].tolist() == [1, 0]
+    assert counts['classic'].tolist() == [1, 0]
+
+
+def test_moneyline_counts_favor_stronger_player():
+    models = simulation.build_round_models(PLAYERS)
+    counts = simulation.simulate_moneyline_counts(models, 20000, rng=np.random.default_rng(7), batch_size=6000)
+    assert int(counts['classic'].sum()) >= 20000
+    assert int(np.argmax(counts['classic'])) == 1
+
+
+def test_price_moneylines_keeps_output_shape(monkeypatch):
+    import database.geo_repo as geo_repo
+    from services.pricing_service import price_moneylines
+
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: PLAYERS)
+    res = price_moneylines(simulations=4000, margin_bps=800)
+    assert set(res.keys()) == {'classic', 'firstRound', 'lastRound'}
+    for entries in res.values():
+        assert len(entries) == 4
+        assert {'player_id', 'player', 'prob', 'decimal', 'american'} <= set(entries[0].keys())
+        assert abs(sum(e['prob'] for e in entries) - 1.08) < 0.02
+
+
+def test_100k_sims_fit_request_budget():
+    models = simulation.build_round_models(PLAYERS)
+    start = time.perf_counter()
+    simulation.simulate_moneyline_counts(models, 100000, rng=np.random.default_rng(3))
+    assert time.perf_counter() - start < 2.0
+
+
+def test_context_streams_are_reproducible_and_independent():
+    from services.sim_context import SimulationContext
+
+    ctx = SimulationContext(seed=11)
+    a = ctx.stream('moneyline').random(5)
+    b = SimulationContext(seed=11).stream('moneyline').random(5)
+    c = ctx.stream('specials').random(5)
+    assert np.array_equal(a, b)
+    assert not np.array_equal(a, c)
+    shards = [g.random(3) for g in ctx.spawn('moneyline', 3)]
+    assert not np.array_equal(shards[0], shards[1])
+
+
+def test_price_moneylines_is_deterministic_for_a_seed(monkeypatch):
+    import database.geo_repo as geo_repo
+    from services.pricing_service import price_moneylines
+    from services.sim_context import SimulationContext
+
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: PLAYERS)
+    first = price_moneylines(simulations=3000, ctx=SimulationContext(seed=5))
+    second = price_moneylines(simulations=3000, ctx=SimulationContext(seed=5))
+    assert first == second
+
+
+def test_common_random_numbers_only_move_by_model_delta():
+    from services.sim_context import SimulationContext
+
+    ctx = SimulationContext(seed=2, crn=True)
+    base = simulation.build_round_models(PLAYERS)
+    bumped_rows = [dict(p) for p in PLAYERS]
+    bumped_rows[0]['mean_score'] += 100.0
+    bumped = simulation.build_round_models(bumped_rows)
+
+    s0 = simulation.sample_round_scores(base, 5000, rng=ctx.stream('moneyline'), inverse=True)
+    s1 = simulation.sample_round_scores(bumped, 5000, rng=ctx.stream('moneyline'), inverse=True)
+    # untouched players draw identical scores; the bumped player only moves up
+    assert np.array_equal(s0[:, :, 1:], s1[:, :, 1:])
+    assert np.all(s1[:, :, 0] >= s0[:, :, 0] - 1e-6)
+
+
+def test_sobol_sampler_is_seeded_and_accurate():
+    from services.analytic_pricing import analytic_moneyline_probs
+    models = simulation.build_round_models(PLAYERS)
+    a = simulation.simulate_moneyline_counts(models, 8192, rng=np.random.default_rng(4), sampler='sobol', batch_size=3000)
+    b = simulation.simulate_moneyline_counts(models, 8192, rng=np.random.default_rng(4), sampler='sobol', batch_size=3000)
+    assert a['classic'].tolist() == b['classic'].tolist()
+    exact = analytic_moneyline_probs(models)
+    assert np.max(np.abs(a['classic'] / 8192.0 - exact['classic'])) < 0.015
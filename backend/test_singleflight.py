@@ -0,0 +1,96 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from utils.singleflight import SingleFlight, singleflight
+
+
+def _run_concurrently(fn, n=8):
+    start = threading.Barrier(n)
+    results, errors = [None] * n, [None] * n
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    group = SingleFlight()
+    calls = []
+
+    @singleflight(group=group)
+    def price(simulations=5000, margin_bps=850):
+        calls.append(1)
+        time.sleep(0.2)
+        return {'sims': simulations, 'calls': len(calls)}
+
+    results, errors = _run_concurrently(lambda: price(5000, margin_bps=850))
+    assert errors == [None] * 8
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert group.stats() == {'executed': 1, 'shared': 7, 'in_flight': 0}
+    # positional / keyword / default spellings are the same input, but nothing is cached
+    assert price(simulations=5000)['calls'] == 2
+    assert price(1000)['sims'] == 1000
+
+
+def test_errors_are_shared_and_not_remembered():
+    group = SingleFlight()
+    calls = []
+
+    @singleflight(group=group)
+    def flaky():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError('db down')
+
+    _, errors = _run_concurrently(flaky, n=4)
+    assert len(calls) == 1
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    with pytest.raises(RuntimeError):
+        flaky()
+    assert len(calls) == 2
+
+
+def test_unhashable_arguments_run_uncoalesced():
+    group = SingleFlight()
+
+    @singleflight(group=group)
+    def total(values, scale=1.0):
+        return float(np.sum(values)) * scale
+
+    assert total([1, 2, {'a': 3}.get('a')]) == 6.0
+    assert total(np.arange(4)) == 6.0
+    assert group.stats()['executed'] == 1
+
+
+def test_geo_cache_misses_share_one_fetch(monkeypatch):
+    from database import geo_repo
+
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        time.sleep(0.2)
+        return [{'player_id': 1, 'mean_score': 15000.0}]
+    monkeypatch.setattr(geo_repo, '_fetch_geo_players', fetch)
+    geo_repo.invalidate_geo_cache('geo_players')
+    version = geo_repo.get_data_version('geo_players')
+
+    results, errors = _run_concurrently(geo_repo.get_geo_players)
+    assert errors == [None] * 8 and len(fetches) == 1
+    assert all(r == [{'player_id': 1, 'mean_score': 15000.0}] for r in results)
+    assert len({id(r) for r in results}) == 8
+    assert geo_repo.get_data_version('geo_players') == version + 1
+    geo_repo.invalidate_geo_cache('geo_players')
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from services import specials_dsl, specials_pricing
+
+
+COUNTRIES = [
+    {'country': 'France', 'continent': 'Europe', 'freq': 15.0},
+    {'country': 'Germany', 'continent': 'Europe', 'freq': 20.0},
+    {'country': 'Japan', 'continent': 'Asia', 'freq': 20.0},
+    {'country': 'Kenya', 'continent': 'Africa', 'freq': 10.0},
+    {'country': 'Mexico', 'continent': 'North America', 'freq': 15.0},
+    {'country': 'Brazil', 'continent': 'South America', 'freq': 10.0},
+    {'country': 'Australia', 'continent': 'Oceania', 'freq': 10.0},
+]
+WEIGHTS = {'Europe': 0.35, 'Asia': 0.2, 'Africa': 0.1, 'North America': 0.15, 'South America': 0.1, 'Oceania': 0.1}
+
+
+def _prob(text, **kwargs):
+    res = specials_dsl.evaluate_formulas([text], rows=COUNTRIES, **kwargs)[0]
+    assert 'error' not in res, res
+    return res
+
+
+def test_formula_matches_hand_written_special():
+    res = _prob('count(Europe) == 0 and count(Oceania) >= 2')
+    assert res['exact']
+    expected = specials_pricing._exact_continent_event(
+        lambda d: 'Europe' not in d and d.count('Oceania') >= 2, WEIGHTS)
+    assert np.isclose(res['prob'], expected)
+
+
+def test_sequences_and_rounds():
+    pa = WEIGHTS['Asia']
+    # P(no two consecutive Asia rounds) over 5 rounds via a two-state recursion
+    # (last round not Asia, last round Asia) mass after round 1
+    no_run = [1.0 - pa, pa]
+    for _ in range(4):
+        no_run = [(no_run[0] + no_run[1]) * (1 - pa), no_run[0] * pa]
+    assert np.isclose(_prob('streak(Asia, 2)')['prob'], 1.0 - sum(no_run))
+    assert np.isclose(_prob('at(1, Europe) and at(-1, Europe)')['prob'], WEIGHTS['Europe'] ** 2)
+    assert np.isclose(_prob("none('North America') and none('South America')")['prob'], 0.75 ** 5)
+
+
+def test_country_conditions_split_their_continent():
+    assert np.isclose(_prob('any(France)')['prob'], 1 - 0.85 ** 5)
+    assert np.isclose(_prob('count(France) + count(Germany) == count(Europe)')['prob'], 1.0)
+
+
+def test_player_formula_uses_simulation():
+    from test_simulation import PLAYERS
+    res = _prob('total(Sohan) > total(Naresh)', players=PLAYERS, sims=20000, rng=np.random.default_rng(2))
+    assert not res['exact']
+    assert 0.6 < res['prob'] < 0.95
+
+
+@pytest.mark.parametrize('text', [
+    '__import__("os").system("true")',
+    'count(Europe)',
+    'count(Atlantis) > 1',
+    'at(6, Europe)',
+    'count(Europe) ** 2 > 1',
+    '',
+])
+def test_bad_formulas_are_rejected(text):
+    res = specials_dsl.evaluate_formulas([text], rows=COUNTRIES)[0]
+    assert 'error' in res
+
+
+def test_price_special_rows_prices_only_formula_rows():
+    rows = [
+        {'betid': 1, 'outcome': 'Static', 'odds': '+400'},
+        {'betid': 2, 'outcome': 'B2B Asia', 'odds': '+999', 'formula': 'streak(Asia, 2)'},
+        {'betid': 3, 'outcome': 'Broken', 'odds': '+250', 'formula': 'count(('},
+    ]
+    out = specials_pricing.price_special_rows(rows, countries=COUNTRIES)
+    assert out[0] == rows[0]
+    assert out[1]['odds'] != '+999' and out[1]['priced'] == 'exact'
+    assert out[2]['odds'] == '+250' and 'formula_error' in out[2]
+
+
+def test_price_special_rows_keeps_stored_odds_when_pricing_fails(monkeypatch):
+    from database import geo_repo
+
+    monkeypatch.setattr(geo_repo, 'get_geo_countries', lambda: [])
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: [])
+    rows = [
+        {'betid': 1, 'outcome': 'Static', 'odds': '+400'},
+        {'betid': 2, 'outcome': 'B2B Asia', 'odds': '+999', 'formula': 'streak(Asia, 2)'},
+    ]
+    out = specials_pricing.price_special_rows(rows)
+    assert out[0] == rows[0]
+    assert out[1]['odds'] == '+999' and out[1]['formula_error'] == 'no location frequencies available'
+
+
+def test_formula_results_cached_per_geo_data_version(monkeypatch):
+    from database import geo_repo
+
+    calls = []
+    evaluate = specials_dsl.evaluate_formulas
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return evaluate(*args, **kwargs)
+    state = {'version': 41}
+    monkeypatch.setattr(specials_dsl, 'evaluate_formulas', counting)
+    monkeypatch.setattr(geo_repo, 'get_geo_countries', lambda: [dict(c) for c in COUNTRIES])
+    monkeypatch.setattr(geo_repo, 'get_geo_players', lambda: [])
+    monkeypatch.setattr(geo_repo, 'get_data_version', lambda table=None: state['version'])
+    rows = [{'betid': 2, 'outcome': 'B2B Asia', 'odds': '+999', 'formula': 'streak(Asia, 2)'}]
+
+    first = specials_pricing.price_special_rows(rows)
+    assert specials_pricing.price_special_rows(rows) == first and len(calls) == 1
+    state['version'] = 42
+    assert specials_pricing.price_special_rows(rows) == first and len(calls) == 2
+
+
+def test_player_formulas_see_expired_geo_players(monkeypatch):
+    from database import geo_repo
+    from test_simulation import PLAYERS
+
+    players = [dict(p) for p in PLAYERS]
+    monkeypatch.setattr(geo_repo, '_fetch_geo_countries', lambda: [dict(c) for c in COUNTRIES])
+    monkeypatch.setattr(geo_repo, '_fetch_geo_players', lambda: [dict(p) for p in players])
+    monkeypatch.setattr(geo_repo, 'GEO_CACHE_TTL', 0.0)
+    geo_repo.invalidate_geo_cache()
+    rows = [{'betid': 5, 'outcome': 'Sohan beats Naresh', 'odds': '+100', 'formula': 'total(Sohan) > total(Naresh)'}]
+
+    first = specials_pricing.price_special_rows(rows)[0]
+    assert specials_pricing.price_special_rows(rows)[0] == first
+    # only geo_players changes; the countries version stays put
+    for p in players:
+        if p['name'] == 'Naresh':
+            p['mean_score'] += 6000
+    again = specials_pricing.price_special_rows(rows)[0]
+    assert again['fair_prob'] < first['fair_prob']
+    geo_repo.invalidate_geo_cache()
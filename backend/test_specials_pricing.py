@@ -0,0 +1,40 @@
+import time
+
+import numpy as np
+
+from services import specials_pricing
+
+
+WEIGHTS = {'Europe': 0.35, 'Asia': 0.2, 'Africa': 0.1, 'North America': 0.15, 'South America': 0.1, 'Oceania': 0.1}
+
+
+def _three_europe(draws):
+    return draws.count('Europe') == 3 and draws.count('Asia') == 1 and draws.count('Africa') == 1
+
+
+def _no_europe_two_oceania(draws):
+    return 'Europe' not in draws and draws.count('Oceania') >= 2
+
+
+def test_exact_event_matches_closed_form():
+    pe, pa, pf, po = WEIGHTS['Europe'], WEIGHTS['Asia'], WEIGHTS['Africa'], WEIGHTS['Oceania']
+    assert np.isclose(specials_pricing._exact_continent_event(_three_europe, WEIGHTS), 20 * pe ** 3 * pa * pf)
+    rest = 1.0 - pe - po
+    expected = (1 - pe) ** 5 - rest ** 5 - 5 * po * rest ** 4
+    assert np.isclose(specials_pricing._exact_continent_event(_no_europe_two_oceania, WEIGHTS), expected)
+
+
+def test_ordered_enumeration_agrees_and_handles_order():
+    unordered = specials_pricing._exact_continent_event(_three_europe, WEIGHTS)
+    ordered = specials_pricing._exact_continent_event(_three_europe, WEIGHTS, ordered=True)
+    assert np.isclose(unordered, ordered)
+    first_and_last_europe = specials_pricing._exact_continent_event(lambda d: d[0] == d[-1] == 'Europe', WEIGHTS, ordered=True)
+    assert np.isclose(first_and_last_europe, WEIGHTS['Europe'] ** 2)
+
+
+def test_exact_specials_are_fast_and_close_to_sampling():
+    start = time.perf_counter()
+    exact = specials_pricing.no_europe_and_two_plus_oceania(weights=WEIGHTS)
+    assert time.perf_counter() - start < 0.05
+    sampled = specials_pricing.no_europe_and_two_plus_oceania(weights=WEIGHTS, iterations=200000, exact=False)
+    assert abs(exact['fair_prob'] - sampled['fair_prob']) < 0.003
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from utils.swr_cache import SWRCache
+
+
+def test_serves_last_good_value_while_refreshing():
+    state = {'version': 1, 'calls': 0}
+    release = threading.Event()
+
+    def compute():
+        state['calls'] += 1
+        if state['calls'] > 1:
+            release.wait(5)
+        return {'run': state['calls']}
+
+    cache = SWRCache(soft_ttl=60, version=lambda: state['version'])
+    value, meta = cache.get('ml', compute)
+    assert value == {'run': 1} and meta['version'] == 1 and not meta['stale']
+
+    # a data version change is served stale at once and refreshed in the background
+    state['version'] = 2
+    start = time.perf_counter()
+    value, meta = cache.get('ml', compute)
+    assert time.perf_counter() - start < 0.5
+    assert value == {'run': 1} and meta['stale'] and meta['refreshing'] and meta['version'] == 1
+    # only one refresh per key
+    cache.get('ml', compute)
+    release.set()
+    cache.wait('ml', 5)
+    value, meta = cache.get('ml', compute)
+    assert value == {'run': 2} and meta['version'] == 2 and not meta['stale']
+    assert state['calls'] == 2
+
+
+def test_soft_ttl_and_failed_refresh_keep_last_good():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError('sim failed')
+        return 'good'
+
+    cache = SWRCache(soft_ttl=0.0)
+    assert cache.get('k', compute)[0] == 'good'
+    cache.wait('k', 5)
+    value, meta = cache.get('k', compute)
+    assert value == 'good' and meta['error'] == 'sim failed' and meta['stale']
+    cache.wait('k', 5)
+
+
+def test_entry_keeps_the_version_read_before_computing():
+    state = {'version': 1}
+
+    def compute():
+        # the data changes while the board is being priced
+        state['version'] = 2
+        return 'priced from v1'
+
+    cache = SWRCache(soft_ttl=60, version=lambda: state['version'])
+    value, meta = cache.get('ml', compute)
+    assert value == 'priced from v1' and meta['version'] == 1 and meta['stale']
+    cache.wait('ml', 5)
+
+
+def test_moneyline_route_reports_age_and_version(monkeypatch):
+    from api import routes
+    from app import create_app
+    from services import pricing_service
+
+    calls = []
+
+    def fake_price_moneylines(**kwargs):
+        calls.append(kwargs)
+        return {'classic': [{'player': 'Pam', 'run': len(calls)}], 'firstRound': [], 'lastRound': []}
+    monkeypatch.setattr(pricing_service, 'price_moneylines', fake_price_moneylines)
+    monkeypatch.setattr(routes, '_moneyline_cache', SWRCache(soft_ttl=60, version=lambda: 7))
+
+    client = create_app().test_client()
+    first = client.get('/api/pricing/moneyline?method=analytic').get_json()
+    again = client.get('/api/pricing/moneyline?method=analytic').get_json()
+    assert len(calls) == 1 and calls[0]['method'] == 'analytic'
+    assert first['classic'] == again['classic']
+    assert again['cache']['version'] == 7 and again['cache']['age'] >= 0 and not again['cache']['stale']
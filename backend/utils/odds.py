@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import List, Optional
 import math
 
+import numpy as np
+
 
 def _floor_to(x: int, base: int) -> int:
     """Floor x to nearest multiple of base toward -infinity (works for negatives)."""
@@ -157,3 +159,107 @@ def decimal_to_american_rounded(d: float, prob: Optional[float] = None) -> str:
     if rounded >= 0:
         return f"+{rounded}"
     return str(int(rounded))
+
+
+### Array-native conversions (same rules as the scalar helpers above) ###
+
+UNDERDOG_MAX = 5000
+MAX_AMERICAN = 500000
+
+
+def format_american_odds_array(o) -> np.ndarray:
+    """Vectorized format_american_odds over an integer array of American odds."""
+    raw = np.asarray(o, dtype=np.int64)
+    mag = np.abs(raw)
+    rounded = np.where(
+        mag >= 3000, (mag // 100) * 100,
+        np.where(mag >= 1000, (mag // 10) * 10,
+                 np.where(mag >= 400, (mag // 5) * 5, mag)))
+    return np.where(raw >= 0, rounded, -rounded)
+
+
+def american_tier_array(a) -> np.ndarray:
+    """Rounding step format_american_odds applies at each price (1, 5, 10 or 100)."""
+    mag = np.abs(np.asarray(a, dtype=np.int64))
+    return np.where(mag >= 3000, 100, np.where(mag >= 1000, 10, np.where(mag >= 400, 5, 1)))
+
+
+def american_distance_array(a, b) -> np.ndarray:
+    """Distance in price points between American odds, treating -100 and +100 as equal."""
+    def line(x):
+        x = np.asarray(x, dtype=np.int64)
+        return np.where(x > 0, x - 100, x + 100)
+    return np.abs(line(a) - line(b))
+
+
+def decimal_to_american_array(d, prob=None) -> np.ndarray:
+    """Vectorized decimal_to_american_rounded returning integer American odds.
+
+    Applies the same asymmetric guardrails when `prob` is given (+5000 underdog
+    cap, -200000 favorite floor, -100000/-200000/-500000 overshoot tiers) and
+    the same book-favoring rounding. Invalid decimals (<= 0 or NaN) map to 0,
+    mirroring the scalar "0".
+    """
+    dec = np.array(d, dtype=float, copy=True)
+    valid = dec > 0
+    overshoot = None
+    if prob is not None:
+        p = np.broadcast_to(np.asarray(prob, dtype=float), dec.shape)
+        dec = np.where((p < 0.02) & (dec > 51.0), 51.0, dec)
+        dec = np.where((p > 0.9995) & (dec < 1.0005), 1.0005, dec)
+        overshoot = p > 1.0
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        raw = np.where(
+            np.isinf(dec), 1e9,
+            np.where(dec >= 2.0, np.rint((dec - 1.0) * 100.0),
+                     np.where(dec <= 1.0 + 1e-12, -1e9, np.rint(-100.0 / (dec - 1.0)))))
+    raw = np.nan_to_num(raw, nan=0.0)
+    raw = np.where(raw > UNDERDOG_MAX, UNDERDOG_MAX, raw)
+    raw = np.clip(raw, -MAX_AMERICAN, MAX_AMERICAN).astype(np.int64)
+
+    rounded = format_american_odds_array(raw)
+    if overshoot is not None:
+        tiers = np.where(p <= 1.08, -100000, np.where(p <= 1.15, -200000, -500000))
+        rounded = np.where(overshoot, tiers, rounded)
+    return np.where(valid, rounded, 0)
+
+
+_AMERICAN_TO_DECIMAL_LUT: Optional[np.ndarray] = None
+
+
+def _american_lut() -> np.ndarray:
+    """Decimal odds for every integer American price in [-MAX_AMERICAN, UNDERDOG_MAX].
+
+    Every price the book can emit lies in this range, so the round trip from a
+    rounded American int back to its decimal is a single fancy-index.
+    """
+    global _AMERICAN_TO_DECIMAL_LUT
+    if _AMERICAN_TO_DECIMAL_LUT is None:
+        a = np.arange(-MAX_AMERICAN, UNDERDOG_MAX + 1, dtype=float)
+        with np.errstate(divide='ignore'):
+            lut = np.where(a > 0, 1.0 + a / 100.0, 1.0 + 100.0 / np.abs(a))
+        lut[MAX_AMERICAN] = 1.0  # a == 0
+        _AMERICAN_TO_DECIMAL_LUT = lut
+    return _AMERICAN_TO_DECIMAL_LUT
+
+
+def american_to_decimal_array(a) -> np.ndarray:
+    """Vectorized american_to_decimal for integer American odds (0 maps to 1.0)."""
+    a = np.asarray(a, dtype=np.int64)
+    in_range = (a >= -MAX_AMERICAN) & (a <= UNDERDOG_MAX)
+    if in_range.all():
+        return _american_lut()[a + MAX_AMERICAN]
+    # out-of-range inputs never come from decimal_to_american_array; compute directly
+    af = a.astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        direct = np.where(af > 0, 1.0 + af / 100.0, np.where(af < 0, 1.0 + 100.0 / np.abs(af), 1.0))
+    return np.where(in_range, _american_lut()[np.clip(a, -MAX_AMERICAN, UNDERDOG_MAX) + MAX_AMERICAN], direct)
+
+
+def american_strings(a) -> List[str]:
+    """Signed display strings ('+480', '-1290') for an array of American odds.
+
+    0 only comes from invalid decimals and renders as "0", like the scalar path.
+    """
+    return [f"+{v}" if v > 0 else str(v) for v in np.asarray(a, dtype=np.int64).ravel().tolist()]
@@ -0,0 +1,123 @@
+"""Request coalescing ("single-flight") for identical concurrent calls.
+
+When several threads ask for the same thing at once (a page load fanning out to
+every gunicorn thread, a cache entry expiring under load), only the first caller
+runs the computation. The others wait for it and get the same result, or the
+same exception. Nothing is cached: once the call returns, the next caller starts
+a new flight. Load during a spike is therefore one computation per distinct
+input instead of one per request.
+
+Results are shared between callers, so callers must treat them as read-only
+(as they already do with board snapshots).
+
+    @singleflight
+    def price_moneylines(simulations=5000, margin_bps=800): ...
+
+    rows = do(('specials',), read_specials, client)
+"""
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Group of in-flight calls keyed by a hashable key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) unless a call with `key` is already in flight, then share its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'executed': self.executed, 'shared': self.shared, 'in_flight': len(self._calls)}
+
+
+_default = SingleFlight()
+
+
+def do(key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+    """SingleFlight.do on the process-wide group."""
+    return _default.do(key, fn, *args, **kwargs)
+
+
+def stats() -> Dict[str, int]:
+    return _default.stats()
+
+
+def _freeze(value):
+    """Hashable stand-in for list/dict/set arguments (tuple / frozenset of items)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def singleflight(fn: Callable = None, *, group: SingleFlight = None):
+    """Decorator coalescing concurrent calls of `fn` with equal arguments.
+
+    Arguments are bound to the signature with defaults applied, so
+    f(5000) and f(simulations=5000) share a flight. Calls whose arguments are
+    not hashable (e.g. NumPy arrays) simply run uncoalesced.
+    """
+    def wrap(f: Callable) -> Callable:
+        flights = group or _default
+        name = f"{f.__module__}.{f.__qualname__}"
+        sig = inspect.signature(f)
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            try:
+                bound = sig.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = (name, _freeze(tuple(bound.arguments.items())))
+                hash(key)
+            except TypeError:
+                return f(*args, **kwargs)
+            return flights.do(key, f, *args, **kwargs)
+        return wrapper
+    return wrap(fn) if fn is not None else wrap
@@ -0,0 +1,112 @@
+"""Stale-while-revalidate cache for simulation-priced markets.
+
+A Monte Carlo board takes long enough that blocking a request on it is
+noticeable. SWRCache always answers from the last good result and refreshes in
+the background when that result is:
+
+  - older than `soft_ttl` seconds, or
+  - priced from an older data version (`version()` no longer matches).
+
+Only the very first request for a key computes inline. At most one background
+refresh runs per key. A refresh that fails keeps the previous result and
+records the error in the metadata. Every hit returns metadata so the response
+can state how old the price is and which data version it was built from:
+
+    { 'age': seconds, 'version': data version, 'stale': bool,
+      'refreshing': bool, 'error': last refresh error or None }
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+SOFT_TTL = float(os.getenv('SWR_SOFT_TTL', '30'))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _Entry:
+    value: Any
+    version: Hashable
+    built_at: float
+
+
+class SWRCache:
+    """Last good value per key, refreshed asynchronously once stale."""
+
+    def __init__(self, soft_ttl: float = SOFT_TTL, version: Callable[[], Hashable] = None):
+        self.soft_ttl = float(soft_ttl)
+        self.version = version or (lambda: None)
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._refreshing: Dict[Hashable, threading.Thread] = {}
+        self._errors: Dict[Hashable, str] = {}
+
+    def _build(self, key: Hashable, compute: Callable[[], Any]) -> _Entry:
+        # read before computing: if the data moves meanwhile (including a refresh
+        # done by the pricing call itself) the entry is marked stale, never newer
+        version = self.version()
+        entry = _Entry(value=compute(), version=version, built_at=time.time())
+        with self._lock:
+            self._entries[key] = entry
+            self._errors.pop(key, None)
+        return entry
+
+    def _refresh(self, key: Hashable, compute: Callable[[], Any]) -> None:
+        try:
+            self._build(key, compute)
+        except Exception as e:
+            logger.exception('swr cache: refresh of %r failed', key)
+            with self._lock:
+                self._errors[key] = str(e)
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def _schedule(self, key: Hashable, compute: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            thread = threading.Thread(target=self._refresh, args=(key, compute), name='swr-refresh', daemon=True)
+            self._refreshing[key] = thread
+        thread.start()
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, Dict]:
+        """(value, metadata) for `key`; computes inline only when nothing is cached yet."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            entry = self._build(key, compute)
+        age = time.time() - entry.built_at
+        stale = age >= self.soft_ttl or self.version() != entry.version
+        if stale:
+            self._schedule(key, compute)
+        refreshing = stale or self.is_refreshing(key)
+        with self._lock:
+            error = self._errors.get(key)
+        return entry.value, {'age': round(age, 3), 'version': entry.version, 'stale': stale,
+                             'refreshing': refreshing, 'error': error}
+
+    def is_refreshing(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._refreshing
+
+    def wait(self, key: Hashable, timeout: Optional[float] = None) -> None:
+        """Block until the background refresh of `key` (if any) finishes."""
+        with self._lock:
+            thread = self._refreshing.get(key)
+        if thread is not None:
+            thread.join(timeout)
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Drop `key` (or everything); the next get computes inline again."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._errors.clear()
+            else:
+                self._entries.pop(key, None)
+                self._errors.pop(key, None)